@@ -10,12 +10,14 @@ T = TypeVar("T")
 ListOrArray = TypeVar("ListOrArray", ArrayList[T], ArrayR[T])
 
 
-def merge(list1: ListOrArray, list2: ListOrArray, key=lambda x: x) -> ListOrArray:
+def merge(list1: ListOrArray, list2: ListOrArray, key=None) -> ListOrArray:
     """
     Merges two sorted lists into one larger sorted list,
     containing all elements from the smaller lists.
 
     The `key` kwarg allows you to define a custom sorting order.
+    When it is omitted the elements are compared directly, and when it is given
+    each element's key is computed once rather than once per comparison.
 
     returns:
     The sorted list in the same type as the input lists.
@@ -31,13 +33,28 @@ def merge(list1: ListOrArray, list2: ListOrArray, key=lambda x: x) -> ListOrArra
     new_list = []
     cur_left = 0
     cur_right = 0
-    while cur_left < len(list1) and cur_right < len(list2):
-        if key(list1[cur_left]) <= key(list2[cur_right]):
-            new_list.append(list1[cur_left])
-            cur_left += 1
-        else:
-            new_list.append(list2[cur_right])
-            cur_right += 1
+    len1 = len(list1)
+    len2 = len(list2)
+    if cur_left < len1 and cur_right < len2:
+        left = list1[cur_left]
+        right = list2[cur_right]
+        left_key = left if key is None else key(left)
+        right_key = right if key is None else key(right)
+        while True:
+            if left_key <= right_key:
+                new_list.append(left)
+                cur_left += 1
+                if cur_left == len1:
+                    break
+                left = list1[cur_left]
+                left_key = left if key is None else key(left)
+            else:
+                new_list.append(right)
+                cur_right += 1
+                if cur_right == len2:
+                    break
+                right = list2[cur_right]
+                right_key = right if key is None else key(right)
     
     # Append any remaining elements from list1 or list2
     for i in range(cur_left, len(list1)):
@@ -59,10 +76,15 @@ def merge(list1: ListOrArray, list2: ListOrArray, key=lambda x: x) -> ListOrArra
         raise TypeError("Unsupported type for list1 and list2. Must be ArrayR or ArrayList.")
 
 
-def mergesort(my_list: ListOrArray, key=lambda x: x) -> ListOrArray:
+def mergesort(my_list: ListOrArray, key=None) -> ListOrArray:
     """
     Sort a list using the mergesort operation.
 
+    The sort is stable and runs bottom-up: runs of width 1, 2, 4, ... are merged
+    back and forth between two workspaces, so no halves are allocated per level.
+    When a `key` is given it is computed once per element rather than once per
+    comparison, and elements are compared by key only.
+
     complexity:
     Best/Worst Case: O(NlogN) where N is the length of the list.
 
@@ -72,40 +94,111 @@ def mergesort(my_list: ListOrArray, key=lambda x: x) -> ListOrArray:
     """
     if len(my_list) <= 1:
         return my_list
-    
-    # Split the list into two halves
-    break_index = (len(my_list)+1) // 2
-    
-    # Create two new lists to hold the two halves. Create them
-    # with the same type as the original list
-    if isinstance(my_list, ArrayR):
-        left_half = ArrayR(break_index)
-        right_half = ArrayR(len(my_list) - break_index)
-    elif isinstance(my_list, ArrayList):
-        left_half = ArrayList(break_index)
-        right_half = ArrayList(len(my_list) - break_index)
-    else:
+
+    if not isinstance(my_list, (ArrayR, ArrayList)):
         raise TypeError("Unsupported type for my_list. Must be ArrayR or ArrayList.")
-    
-    # Now fill the two halves with the elements from the original list
-    # If it's an ArrayR, we can set the elements directly
-    # If it's an ArrayList, we need to append the elements
-    
-    # Left half
-    for i in range(break_index):
-        if isinstance(left_half, ArrayR):
-            left_half[i] = my_list[i]
-        else:
-            left_half.append(my_list[i])
-    
-    # Right half
-    for i in range(break_index, len(my_list)):
-        if isinstance(right_half, ArrayR):
-            right_half[i - break_index] = my_list[i]
-        else:
-            right_half.append(my_list[i])
-    
-    # Recursively sort the two halves and merge them
-    list1 = mergesort(left_half, key)
-    list2 = mergesort(right_half, key)
-    return merge(list1, list2, key)
+
+    if key is None:
+        values = [my_list[i] for i in range(len(my_list))]
+        values = _sort_runs(values, _merge_run)
+    else:
+        values = [(key(my_list[i]), my_list[i]) for i in range(len(my_list))]
+        values = _sort_runs(values, _merge_keyed_run)
+        for i in range(len(values)):
+            values[i] = values[i][1]
+
+    # Create the result list based on the type of the input list
+    if isinstance(my_list, ArrayR):
+        return ArrayR.from_list(values)
+    result = ArrayList(len(values))
+    for i in range(len(values)):
+        result.append(values[i])
+    return result
+
+
+def _sort_runs(values: list, merge_run) -> list:
+    """
+    Bottom-up mergesort of a python list, doubling the run width on each pass.
+
+    complexity:
+    Best/Worst Case: O(NlogN) where N is the length of the list.
+    """
+    length = len(values)
+    source = values
+    target = [None] * length
+    width = 1
+    while width < length:
+        for low in range(0, length, 2 * width):
+            mid = min(low + width, length)
+            high = min(low + 2 * width, length)
+            merge_run(source, target, low, mid, high)
+        source, target = target, source
+        width *= 2
+    return source
+
+
+def _merge_run(source: list, target: list, low: int, mid: int, high: int) -> None:
+    """
+    Merge source[low:mid] and source[mid:high] into target[low:high].
+    Ties are taken from the left run, which keeps the sort stable.
+
+    complexity:
+    Best/Worst Case: O(n) where n = high - low.
+    """
+    i, j, k = low, mid, low
+    if mid < high:
+        left = source[i]
+        right = source[j]
+        while True:
+            if right < left:
+                target[k] = right
+                j += 1
+                k += 1
+                if j == high:
+                    break
+                right = source[j]
+            else:
+                target[k] = left
+                i += 1
+                k += 1
+                if i == mid:
+                    break
+                left = source[i]
+    target[k:k + mid - i] = source[i:mid]
+    k += mid - i
+    target[k:k + high - j] = source[j:high]
+
+
+def _merge_keyed_run(source: list, target: list, low: int, mid: int, high: int) -> None:
+    """
+    Same as _merge_run, for (key, element) pairs compared on the key only.
+
+    complexity:
+    Best/Worst Case: O(n) where n = high - low.
+    """
+    i, j, k = low, mid, low
+    if mid < high:
+        left = source[i]
+        right = source[j]
+        left_key = left[0]
+        right_key = right[0]
+        while True:
+            if right_key < left_key:
+                target[k] = right
+                j += 1
+                k += 1
+                if j == high:
+                    break
+                right = source[j]
+                right_key = right[0]
+            else:
+                target[k] = left
+                i += 1
+                k += 1
+                if i == mid:
+                    break
+                left = source[i]
+                left_key = left[0]
+    target[k:k + mid - i] = source[i:mid]
+    k += mid - i
+    target[k:k + high - j] = source[j:high]
@@ -0,0 +1,65 @@
+"""
+Benchmark for range aggregates over an AugmentedBetterBinarySearchTree.
+
+Orders keyed by timestamp, summed over random time ranges with aggregate_range, against summing
+the items range_query returns from a BetterBinarySearchTree; and the maximum rating over
+random block ranges, the same way.
+
+Run from the repository root:
+    python -m benchmarks.bench_aggregate_range
+"""
+import operator
+import random
+import time
+
+from better_bst import AugmentedBetterBinarySearchTree, BetterBinarySearchTree
+from data_structures import ArrayR
+
+SIZE = 50000
+QUERIES = 20
+
+
+def load(tree, pairs):
+    tree.load_sorted(pairs, len(pairs))
+    return tree
+
+
+def timed(function, ranges):
+    start = time.perf_counter()
+    results = tuple(function(low, high) for low, high in ranges)
+    return time.perf_counter() - start, results
+
+
+def scan_sum(tree, low, high):
+    items = tree.range_query(low, high)
+    return sum(items[i] for i in range(len(items)))
+
+
+def scan_max(tree, low, high):
+    items = tree.range_query(low, high)
+    return max((items[i] for i in range(len(items))), default=None)
+
+
+def main():
+    rng = random.Random(SIZE)
+    keys = sorted(rng.sample(range(10 * SIZE), SIZE))
+    orders = ArrayR(SIZE)
+    ratings = ArrayR(SIZE)
+    for i, key in enumerate(keys):
+        orders[i] = (key, rng.randint(1, 20))
+        ratings[i] = (key, rng.randint(1, 50) / 10)
+    ranges = [tuple(sorted((rng.randrange(10 * SIZE), rng.randrange(10 * SIZE)))) for _ in range(QUERIES)]
+
+    print(f"{QUERIES} random ranges over {SIZE} keys   {'range_query (s)':>15} {'aggregate_range (s)':>20}")
+    for label, pairs, combine, identity, scan in (("sum of orders", orders, operator.add, 0, scan_sum),
+                                                  ("max rating", ratings, max, None, scan_max)):
+        plain = load(BetterBinarySearchTree(), pairs)
+        augmented = load(AugmentedBetterBinarySearchTree(combine, identity=identity), pairs)
+        scan_time, expected = timed(lambda low, high: scan(plain, low, high), ranges)
+        aggregate_time, results = timed(augmented.aggregate_range, ranges)
+        assert results == expected
+        print(f"  {label:38} {scan_time:>15.3f} {aggregate_time:>20.4f}")
+
+
+if __name__ == "__main__":
+    main()
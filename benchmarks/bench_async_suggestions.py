@@ -0,0 +1,81 @@
+"""
+Benchmark for event loop latency while serving meal suggestions concurrently.
+
+Runs CONCURRENT_REQUESTS wide-window suggestion requests at once on one event loop
+(latencies are measured from the moment they are all started),
+alongside a heartbeat task which sleeps for HEARTBEAT_INTERVAL and records how late it
+wakes up. Draining the synchronous meal_suggestions inside a coroutine blocks the loop
+for a whole request; ameal_suggestions hands control back every `yield_every` items.
+
+Run from the repository root:
+    python -m benchmarks.bench_async_suggestions
+"""
+import asyncio
+import random
+import time
+
+from data_structures import ArrayR
+from restaurants import FoodFlight, MenuItem, Restaurant
+
+RESTAURANTS = 500
+ITEMS_PER_MENU = 40
+CONCURRENT_REQUESTS = 8
+HEARTBEAT_INTERVAL = 0.001
+
+
+def build_catalog() -> FoodFlight:
+    rng = random.Random(RESTAURANTS)
+    ff = FoodFlight()
+    for r in range(RESTAURANTS):
+        menu = ArrayR(ITEMS_PER_MENU)
+        for i in range(ITEMS_PER_MENU):
+            menu[i] = MenuItem(f"dish-{r}-{i}", rng.randint(1, 50) / 10)
+        ff.add_restaurant(Restaurant(f"restaurant-{rng.random():.12f}", rng.randrange(20), menu))
+    return ff
+
+
+async def blocking_request(ff: FoodFlight, start: float) -> float:
+    for _ in ff.meal_suggestions(10, 10):
+        pass
+    return time.perf_counter() - start
+
+
+async def async_request(ff: FoodFlight, start: float, yield_every: int) -> float:
+    async for _ in ff.ameal_suggestions(10, 10, yield_every=yield_every):
+        pass
+    return time.perf_counter() - start
+
+
+async def heartbeat(lags, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+        lags.append(time.perf_counter() - start - HEARTBEAT_INTERVAL)
+
+
+async def serve(make_request) -> tuple:
+    lags = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(heartbeat(lags, stop))
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(make_request(start) for _ in range(CONCURRENT_REQUESTS)))
+    stop.set()
+    await monitor
+    return sorted(latencies), max(lags)
+
+
+def main():
+    ff = build_catalog()
+    print(f"{CONCURRENT_REQUESTS} concurrent requests over {RESTAURANTS} restaurants x {ITEMS_PER_MENU} items")
+    print(f"  {'mode':28} {'first done (s)':>14} {'last done (s)':>14} {'max loop lag (ms)':>18}")
+    modes = [("meal_suggestions (blocking)", lambda start: blocking_request(ff, start))]
+    for yield_every in (16, 64, 256):
+        modes.append((f"ameal_suggestions every {yield_every}", lambda start, n=yield_every: async_request(ff, start, n)))
+    for name, make_request in modes:
+        latencies, lag = asyncio.run(serve(make_request))
+        print(f"  {name:28} {latencies[0]:>14.3f} {latencies[-1]:>14.3f} {lag * 1000:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
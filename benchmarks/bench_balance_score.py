@@ -0,0 +1,76 @@
+"""
+Benchmark for polling the balance score of a BetterBinarySearchTree.
+
+Builds a tree from random keys followed by a run of sorted keys (which leaves one long spine),
+then times balance_score, which reads the height stored at the root, against walking every node
+to measure the height as balance_score used to. Then rebuilds only the most unbalanced subtree
+along the longest path, against rebuilding the whole tree.
+
+Run from the repository root:
+    python -m benchmarks.bench_balance_score
+"""
+import math
+import random
+import time
+
+from better_bst import BetterBinarySearchTree
+
+RANDOM_KEYS = 50000
+SORTED_KEYS = 500
+POLLS = 20
+
+
+def build_tree() -> BetterBinarySearchTree:
+    rng = random.Random(RANDOM_KEYS)
+    tree = BetterBinarySearchTree()
+    for _ in range(RANDOM_KEYS):
+        key = rng.randrange(10 * RANDOM_KEYS)
+        tree[key] = key
+    for key in range(10 * RANDOM_KEYS, 10 * RANDOM_KEYS + SORTED_KEYS):
+        tree[key] = key
+    return tree
+
+
+def walked_balance_score(tree: BetterBinarySearchTree) -> int:
+    """ The balance score from a walk over every node, as balance_score used to compute it. """
+    height = -1
+    stack = ((tree._BinarySearchTree__root, 0), None)
+    while stack is not None:
+        (current, depth), stack = stack
+        if depth > height:
+            height = depth
+        if current.left is not None:
+            stack = ((current.left, depth + 1), stack)
+        if current.right is not None:
+            stack = ((current.right, depth + 1), stack)
+    return height - math.floor(math.log2(len(tree)))
+
+
+def timed(function, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    tree = build_tree()
+    assert tree.balance_score() == walked_balance_score(tree)
+    print(f"{len(tree)} keys, balance score {tree.balance_score()}")
+    print(f"  balance_score per poll: walk {timed(lambda: walked_balance_score(tree), POLLS) * 1e3:.2f}ms,"
+          f" stored heights {timed(tree.balance_score, POLLS) * 1e6:.2f}us")
+
+    start = time.perf_counter()
+    key = tree.most_unbalanced_subtree()
+    subtree_score = tree.subtree_balance_score(key)
+    tree.rebalance_subtree(key)
+    targeted = time.perf_counter() - start
+    print(f"  targeted rebuild of the subtree at {key} (score {subtree_score}): {targeted:.3f}s,"
+          f" balance score now {tree.balance_score()}")
+    start = time.perf_counter()
+    tree.rebalance()
+    print(f"  full rebalance: {time.perf_counter() - start:.3f}s, balance score now {tree.balance_score()}")
+
+
+if __name__ == "__main__":
+    main()
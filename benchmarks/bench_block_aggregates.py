@@ -0,0 +1,86 @@
+"""
+Benchmark for rating aggregates and top-K queries over block ranges.
+
+Compares FoodFlight.rating_summary and FoodFlight.top_rated_items, answered from the
+augmented block index, with scanning every registered menu for the same answers.
+Also times the incremental upkeep of the index by add_to_menu.
+
+Run from the repository root:
+    python -m benchmarks.bench_block_aggregates
+"""
+import random
+import time
+
+from data_structures import ArrayR
+from restaurants import FoodFlight, MenuItem, Restaurant
+
+RESTAURANTS = 20000
+ITEMS_PER_MENU = 5
+BLOCKS = 5000
+QUERIES = 10
+TOP = 10
+
+
+def build_catalog() -> FoodFlight:
+    rng = random.Random(RESTAURANTS)
+    restaurants = ArrayR(RESTAURANTS)
+    for r in range(RESTAURANTS):
+        menu = ArrayR(ITEMS_PER_MENU)
+        for i in range(ITEMS_PER_MENU):
+            menu[i] = MenuItem(f"dish-{i}", rng.randint(1, 50) / 10)
+        restaurants[r] = Restaurant(f"restaurant-{r:05d}", rng.randrange(BLOCKS), menu)
+    ff = FoodFlight()
+    ff.bulk_load(restaurants)
+    return ff
+
+
+def scan_summary(ff: FoodFlight, low: int, high: int):
+    count = 0
+    total = 0
+    for _, restaurant in ff.restaurants:
+        if low <= restaurant.block_number <= high:
+            for i in range(len(restaurant.menu)):
+                count += 1
+                total += restaurant.menu[i].rating
+    return count, total
+
+
+def scan_top(ff: FoodFlight, k: int, low: int, high: int):
+    items = [item for _, restaurant in ff.restaurants if low <= restaurant.block_number <= high for item in restaurant.menu]
+    return sorted(items)[:k]
+
+
+def timed(query, ranges) -> float:
+    start = time.perf_counter()
+    for low, high in ranges:
+        query(low, high)
+    return time.perf_counter() - start
+
+
+def main():
+    ff = build_catalog()
+    rng = random.Random(QUERIES)
+
+    start = time.perf_counter()
+    ff.rating_summary()
+    print(f"{RESTAURANTS} restaurants x {ITEMS_PER_MENU} items over {BLOCKS} blocks, index built in {time.perf_counter() - start:.3f}s")
+    print(f"{QUERIES} queries  {'blocks':>6} {'scan summary':>13} {'index summary':>14} {'scan top-' + str(TOP):>12} {'index top-' + str(TOP):>13}")
+    for width in (10, 500, BLOCKS):
+        ranges = []
+        for _ in range(QUERIES):
+            low = rng.randrange(BLOCKS - width + 1)
+            ranges.append((low, low + width - 1))
+        scan_time = timed(lambda low, high: scan_summary(ff, low, high), ranges)
+        index_time = timed(ff.rating_summary, ranges)
+        scan_top_time = timed(lambda low, high: scan_top(ff, TOP, low, high), ranges)
+        index_top_time = timed(lambda low, high: ff.top_rated_items(TOP, low, high), ranges)
+        print(f"{'':13}{width:>6} {scan_time:>13.3f} {index_time:>14.4f} {scan_top_time:>12.3f} {index_top_time:>13.4f}")
+
+    start = time.perf_counter()
+    for i in range(1000):
+        ff.add_to_menu(f"restaurant-{rng.randrange(RESTAURANTS):05d}", ArrayR.from_list([MenuItem(f"special-{i}", rng.randint(1, 50) / 10)]))
+    print(f"1000 add_to_menu calls with the index kept up to date: {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
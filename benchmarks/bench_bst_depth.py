@@ -0,0 +1,89 @@
+"""
+Benchmark for lookups in deep binary search trees.
+
+Looks up random keys of trees of depth 10 (a complete tree) and of depths 1000 and 100000
+(sticks, as sorted inserts leave an unbalanced tree), with BinarySearchTree.__getitem__,
+which walks down iteratively, and with the recursive walk it replaced, which runs out of
+stack frames around depth 1000. Both read the root of the same nodes once per lookup.
+
+Run from the repository root:
+    python -m benchmarks.bench_bst_depth
+"""
+import random
+import time
+
+from data_structures import BinaryNode, BinarySearchTree
+
+DEPTHS = (10, 1000, 100000)
+LOOKUPS = 200
+
+
+class RecursiveBinarySearchTree(BinarySearchTree):
+    """ BinarySearchTree with the recursive lookup that __getitem__ used to do. """
+
+    def __getitem__(self, key):
+        def get_tree_node_by_key(current, key):
+            if current is None:
+                raise KeyError(f'Key not found: {key}')
+            elif key == current.key:
+                return current
+            elif key < current.key:
+                return get_tree_node_by_key(current.left, key)
+            else:
+                return get_tree_node_by_key(current.right, key)
+
+        return get_tree_node_by_key(self.__root, key).item
+
+
+def complete_tree(depth: int) -> BinaryNode:
+    def build(start: int, end: int):
+        if start > end:
+            return None
+        mid = (start + end) // 2
+        node = BinaryNode(mid, mid, end - start + 1)
+        node.left = build(start, mid - 1)
+        node.right = build(mid + 1, end)
+        return node
+
+    return build(0, (1 << (depth + 1)) - 2)
+
+
+def stick(depth: int) -> BinaryNode:
+    # Built bottom-up: inserting sorted keys one at a time would take O(depth^2).
+    root = None
+    for key in range(depth, -1, -1):
+        node = BinaryNode(key, key, depth - key + 1)
+        node.right = root
+        root = node
+    return root
+
+
+def lookups_per_second(get, keys) -> float:
+    start = time.perf_counter()
+    for key in keys:
+        get(key)
+    return len(keys) / (time.perf_counter() - start)
+
+
+def main():
+    rng = random.Random(LOOKUPS)
+    print(f"{LOOKUPS} lookups of random keys")
+    print(f"  {'depth':>7} {'nodes':>7} {'iterative (lookups/s)':>22} {'recursive (lookups/s)':>22}")
+    for depth in DEPTHS:
+        if depth <= 10:
+            root, size = complete_tree(depth), (1 << (depth + 1)) - 1
+        else:
+            root, size = stick(depth), depth + 1
+        tree = BinarySearchTree.from_node(root, size)
+        recursive_tree = RecursiveBinarySearchTree()
+        recursive_tree._BinarySearchTree__root = root
+        keys = [rng.randrange(len(tree)) for _ in range(LOOKUPS)]
+        iterative = lookups_per_second(tree.__getitem__, keys)
+        try:
+            recursive = f"{lookups_per_second(recursive_tree.__getitem__, keys):>22.0f}"
+        except RecursionError:
+            recursive = f"{'RecursionError':>22}"
+        print(f"  {depth:>7} {len(tree):>7} {iterative:>22.0f} {recursive}")
+
+if __name__ == "__main__":
+    main()
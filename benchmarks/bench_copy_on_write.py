@@ -0,0 +1,95 @@
+"""
+Benchmark for suggestion reads under concurrent menu writes.
+
+READERS threads drain meal_suggestions over the whole catalog in a loop while one
+writer thread keeps changing ratings (update_rating) and adding items (add_to_menu).
+Each read is checked for consistency: every item exactly once, in sorted order.
+Runs with in-place updates and with copy_on_write.
+
+Run from the repository root:
+    python -m benchmarks.bench_copy_on_write
+"""
+import random
+import threading
+import time
+
+from data_structures import ArrayR
+from restaurants import FoodFlight, MenuItem, Restaurant
+
+RESTAURANTS = 50
+ITEMS_PER_MENU = 40
+READERS = 4
+DURATION = 5.0
+
+
+def build_catalog(copy_on_write: bool) -> FoodFlight:
+    rng = random.Random(RESTAURANTS)
+    ff = FoodFlight(copy_on_write=copy_on_write)
+    for r in range(RESTAURANTS):
+        menu = ArrayR(ITEMS_PER_MENU)
+        for i in range(ITEMS_PER_MENU):
+            menu[i] = MenuItem(f"dish-{i}", rng.randint(1, 50) / 10)
+        ff.add_restaurant(Restaurant(f"restaurant-{r:03d}", 0, menu))
+    return ff
+
+
+def reader(ff: FoodFlight, stop: threading.Event, results) -> None:
+    reads = 0
+    torn = 0
+    while not stop.is_set():
+        seen = set()
+        previous = None
+        consistent = True
+        for item in ff.meal_suggestions(0, 0):
+            if id(item) in seen or (previous is not None and item.sort_key < previous):
+                consistent = False
+            seen.add(id(item))
+            previous = item.sort_key
+        reads += 1
+        torn += not consistent
+    results.append((reads, torn))
+
+
+def writer(ff: FoodFlight, stop: threading.Event, results) -> None:
+    rng = random.Random(0)
+    writes = 0
+    while not stop.is_set():
+        name = f"restaurant-{rng.randrange(RESTAURANTS):03d}"
+        if rng.random() < 0.9:
+            ff.update_rating(name, f"dish-{rng.randrange(ITEMS_PER_MENU)}", rng.randint(1, 50) / 10)
+        else:
+            ff.add_to_menu(name, ArrayR.from_list([MenuItem(f"special-{writes}", rng.randint(1, 50) / 10)]))
+        writes += 1
+        time.sleep(0)
+    results.append(writes)
+
+
+def run(copy_on_write: bool):
+    ff = build_catalog(copy_on_write)
+    stop = threading.Event()
+    read_results = []
+    write_results = []
+    threads = [threading.Thread(target=reader, args=(ff, stop, read_results)) for _ in range(READERS)]
+    threads.append(threading.Thread(target=writer, args=(ff, stop, write_results)))
+    for thread in threads:
+        thread.start()
+    time.sleep(DURATION)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    reads = sum(r for r, _ in read_results)
+    torn = sum(t for _, t in read_results)
+    return reads / DURATION, write_results[0] / DURATION, torn, reads
+
+
+def main():
+    print(f"{READERS} readers and 1 writer for {DURATION:.0f}s over {RESTAURANTS} restaurants x {ITEMS_PER_MENU} items")
+    print(f"  {'mode':16} {'reads/s':>8} {'writes/s':>9} {'torn reads':>16}")
+    for copy_on_write in (False, True):
+        reads_per_second, writes_per_second, torn, reads = run(copy_on_write)
+        mode = "copy on write" if copy_on_write else "in place"
+        print(f"  {mode:16} {reads_per_second:>8.1f} {writes_per_second:>9.1f} {torn:>7} of {reads:<7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark for streaming feed imports.
+
+Generates JSON-lines and CSV feeds of increasing size (restaurants spread through
+the whole feed), imports each into a fresh FoodFlight, and reports throughput and
+the memory the import needed on top of the catalog it built (peak traced memory
+minus the memory still held once the import returns). Then times feeds where every
+chunk brings in new restaurants, which are registered once per import.
+
+Run from the repository root:
+    python -m benchmarks.bench_import
+"""
+import csv
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from catalog_import import import_catalog, import_records
+from restaurants import FoodFlight
+
+RESTAURANTS = 2000
+FEED_SIZES = (25000, 100000, 400000)
+CHUNK_SIZE = 10000
+# Records per restaurant in the feeds of new restaurants, which come in name order.
+ITEMS_PER_NEW_RESTAURANT = 4
+NEW_RESTAURANT_FEED_SIZES = (50000, 200000)
+
+
+def write_feeds(directory: str, records: int):
+    rng = random.Random(records)
+    jsonl_path = os.path.join(directory, f"feed-{records}.jsonl")
+    csv_path = os.path.join(directory, f"feed-{records}.csv")
+    with open(jsonl_path, "w", encoding="utf-8") as jsonl_file, \
+            open(csv_path, "w", newline="", encoding="utf-8") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(("restaurant", "block", "item", "rating"))
+        for i in range(records):
+            restaurant = rng.randrange(RESTAURANTS)
+            record = (f"restaurant-{restaurant}", restaurant % 100, f"dish-{i}", rng.randint(1, 50) / 10)
+            jsonl_file.write(json.dumps(dict(zip(("restaurant", "block", "item", "rating"), record))) + "\n")
+            writer.writerow(record)
+    return jsonl_path, csv_path
+
+
+def measure(path: str):
+    tracemalloc.start()
+    ff = FoodFlight()
+    stats = import_catalog(ff, path, CHUNK_SIZE)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return stats, peak - current, current
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    print(f"{RESTAURANTS} restaurants, chunks of {CHUNK_SIZE} records (timings under tracemalloc)")
+    for records in FEED_SIZES:
+        for path in write_feeds(directory, records):
+            stats, overhead, catalog = measure(path)
+            size = os.path.getsize(path) / 2 ** 20
+            print(
+                f"  {os.path.basename(path):18} {size:6.1f} MiB  {stats.records_per_second:8.0f} records/s"
+                f"  catalog {catalog / 2 ** 20:6.1f} MiB  import overhead {overhead / 2 ** 20:5.1f} MiB"
+            )
+            os.remove(path)
+    os.rmdir(directory)
+
+    print(f"feeds of new restaurants, {ITEMS_PER_NEW_RESTAURANT} records each, chunks of {CHUNK_SIZE} records")
+    for records in NEW_RESTAURANT_FEED_SIZES:
+        feed = [
+            (f"restaurant-{i // ITEMS_PER_NEW_RESTAURANT:07d}", i % 100, f"dish-{i}", (i % 50) / 10)
+            for i in range(records)
+        ]
+        start = time.perf_counter()
+        stats = import_records(FoodFlight(), iter(feed), CHUNK_SIZE)
+        print(f"  {records:7} records  {stats.restaurants_added:6} restaurants  {time.perf_counter() - start:7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark for lazily sorted menus.
+
+Builds a catalog of RESTAURANTS restaurants with ITEMS_PER_MENU unsorted items each,
+registered with bulk_load, with eagerly sorted and with lazily sorted menus, then
+reads the menus of a TOUCHED fraction of the restaurants through get_menu.
+Lazy construction only pays for sorting the menus that are read.
+
+Run from the repository root:
+    python -m benchmarks.bench_lazy_menus
+"""
+import random
+import time
+
+from data_structures import ArrayR
+from restaurants import FoodFlight, MenuItem, Restaurant
+
+RESTAURANTS = 5000
+ITEMS_PER_MENU = 40
+
+
+def build_menus():
+    rng = random.Random(RESTAURANTS)
+    menus = []
+    for _ in range(RESTAURANTS):
+        menu = ArrayR(ITEMS_PER_MENU)
+        for i in range(ITEMS_PER_MENU):
+            menu[i] = MenuItem(f"dish-{i}", rng.randint(1, 50) / 10)
+        menus.append(menu)
+    return menus
+
+
+def run(menus, lazy_sort: bool, touched: float):
+    start = time.perf_counter()
+    restaurants = ArrayR(RESTAURANTS)
+    for r in range(RESTAURANTS):
+        restaurants[r] = Restaurant(f"restaurant-{r:05d}", 0, menus[r], lazy_sort=lazy_sort)
+    ff = FoodFlight()
+    ff.bulk_load(restaurants)
+    built = time.perf_counter() - start
+
+    rng = random.Random(0)
+    for r in rng.sample(range(RESTAURANTS), int(RESTAURANTS * touched)):
+        ff.get_menu(f"restaurant-{r:05d}")
+    return built, time.perf_counter() - start
+
+
+def main():
+    menus = build_menus()
+    print(f"{RESTAURANTS} restaurants x {ITEMS_PER_MENU} items")
+    print(f"  {'touched':>7} {'eager build (s)':>16} {'eager total (s)':>16} {'lazy build (s)':>15} {'lazy total (s)':>15}")
+    for touched in (0.0, 0.1, 0.5, 1.0):
+        eager_built, eager_total = run(menus, False, touched)
+        lazy_built, lazy_total = run(menus, True, touched)
+        print(f"  {touched:>7.0%} {eager_built:>16.3f} {eager_total:>16.3f} {lazy_built:>15.3f} {lazy_total:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
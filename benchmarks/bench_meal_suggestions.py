@@ -0,0 +1,93 @@
+"""
+Benchmark for the k-way merge behind FoodFlight.meal_suggestions.
+
+Compares the loser tree backend against the previous ArrayMaxHeap merge,
+which wrapped every item in a reversed-comparison object before adding it to the heap,
+then times a wide window with and without a limit.
+
+Run from the repository root:
+    python -m benchmarks.bench_meal_suggestions
+"""
+import random
+import time
+from functools import total_ordering
+
+from data_structures import ArrayMaxHeap, ArrayR
+from restaurants import FoodFlight, MenuItem, Restaurant
+
+ITEMS_PER_MENU = 50
+WIDE_RESTAURANTS = 5000
+
+
+@total_ordering
+class ComparableMenuItem:
+    """ The max-heap wrapper used by the previous merge. """
+    def __init__(self, menu_item):
+        self.menu_item = menu_item
+
+    def __eq__(self, other):
+        return self.menu_item == other.menu_item
+
+    def __lt__(self, other):
+        return self.menu_item > other.menu_item
+
+
+def heap_meal_suggestions(ff: FoodFlight, user_block_number: int, max_walk: int):
+    """ The previous ArrayMaxHeap based merge, kept as a reference point. """
+    candidates = ArrayR(len(ff.restaurants))
+    count = 0
+    for _, restaurant in ff.restaurants:
+        if abs(restaurant.block_number - user_block_number) <= max_walk and len(restaurant.menu) > 0:
+            candidates[count] = restaurant.menu
+            count += 1
+
+    heap = ArrayMaxHeap(count)
+    for i in range(count):
+        heap.add((ComparableMenuItem(candidates[i][0]), i, 0))
+
+    while len(heap) > 0:
+        wrapped_item, rest_i, index_in_menu = heap.extract_max()
+        yield wrapped_item.menu_item
+        menu = candidates[rest_i]
+        next_index = index_in_menu + 1
+        if next_index < len(menu):
+            heap.add((ComparableMenuItem(menu[next_index]), rest_i, next_index))
+
+
+def build_catalog(restaurant_count: int) -> FoodFlight:
+    rng = random.Random(restaurant_count)
+    ff = FoodFlight()
+    for r in range(restaurant_count):
+        menu = ArrayR(ITEMS_PER_MENU)
+        for i in range(ITEMS_PER_MENU):
+            menu[i] = MenuItem(f"dish-{r}-{i}", rng.randint(1, 50) / 10)
+        ff.add_restaurant(Restaurant(f"restaurant-{rng.random():.12f}", 0, menu))
+    return ff
+
+
+def time_drain(iterator) -> float:
+    start = time.perf_counter()
+    for _ in iterator:
+        pass
+    return time.perf_counter() - start
+
+
+def main():
+    print(f"{'R':>6} {'items':>8} {'heap (s)':>10} {'loser (s)':>10} {'speedup':>8}")
+    for restaurant_count in (10, 100, 1000):
+        ff = build_catalog(restaurant_count)
+        heap_time = time_drain(heap_meal_suggestions(ff, 0, 0))
+        loser_time = time_drain(ff.meal_suggestions(0, 0))
+        print(f"{restaurant_count:>6} {restaurant_count * ITEMS_PER_MENU:>8} "
+              f"{heap_time:>10.4f} {loser_time:>10.4f} {heap_time / loser_time:>7.2f}x")
+
+    ff = build_catalog(WIDE_RESTAURANTS)
+    print(f"\n{WIDE_RESTAURANTS} restaurants")
+    print(f"{'limit':>6} {'time (s)':>10}")
+    for limit in (None, 100):
+        elapsed = time_drain(ff.meal_suggestions(0, 0, limit))
+        print(f"{str(limit):>6} {elapsed:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark for merging two restaurant trees.
+
+Merges a tree of OTHER_SIZE regional names into a tree of SIZE names, either by inserting every
+(key, item) pair of the other tree, in its order, into a BetterBinarySearchTree or an
+AVLBetterBinarySearchTree, or with BetterBinarySearchTree.merge. Run with names interleaved
+between the two regions, and with the other region's names all sorting after this one's, which
+turns the one-at-a-time inserts into a stick.
+
+Run from the repository root:
+    python -m benchmarks.bench_merge
+"""
+import random
+import time
+
+from better_bst import AVLBetterBinarySearchTree, BetterBinarySearchTree
+from data_structures import ArrayR
+
+SIZE = 20000
+OTHER_SIZE = 5000
+
+
+def balanced_tree(tree_class, names):
+    names = sorted(names)
+    pairs = ArrayR(len(names))
+    for i, name in enumerate(names):
+        pairs[i] = (name, name)
+    tree = tree_class()
+    tree.load_sorted(pairs, len(names))
+    return tree
+
+
+def insert_all(tree, other) -> None:
+    for key, item in other:
+        tree[key] = item
+
+
+def run(names, other_names):
+    print(f"  {'method':36} {'time (s)':>9} {'balance score':>14}")
+    for label, tree_class, merge in (("insert into BetterBinarySearchTree", BetterBinarySearchTree, insert_all),
+                                     ("insert into AVLBetterBinarySearchTree", AVLBetterBinarySearchTree, insert_all),
+                                     ("BetterBinarySearchTree.merge", BetterBinarySearchTree, BetterBinarySearchTree.merge)):
+        tree = balanced_tree(tree_class, names)
+        other = balanced_tree(BetterBinarySearchTree, other_names)
+        start = time.perf_counter()
+        merge(tree, other)
+        elapsed = time.perf_counter() - start
+        assert len(tree) == len(set(names) | set(other_names))
+        print(f"  {label:36} {elapsed:>9.3f} {tree.balance_score():>14}")
+
+
+def main():
+    rng = random.Random(SIZE)
+    names = [f"restaurant-{rng.randrange(10 ** 8):08d}" for _ in range(SIZE)]
+    other_names = [f"restaurant-{rng.randrange(10 ** 8):08d}" for _ in range(OTHER_SIZE)]
+    print(f"{OTHER_SIZE} names merged into {SIZE}, interleaved:")
+    run(names, other_names)
+    print(f"{OTHER_SIZE} names merged into {SIZE}, all sorting after them:")
+    run(names, [f"zone-b-{name}" for name in other_names])
+
+
+if __name__ == "__main__":
+    main()
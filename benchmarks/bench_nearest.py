@@ -0,0 +1,59 @@
+"""
+Benchmark for nearest-key queries on a BetterBinarySearchTree.
+
+Finds the registered block closest to random block numbers with nearest, against
+scanning every key of the tree in order, and times floor, ceiling, predecessor and successor.
+
+Run from the repository root:
+    python -m benchmarks.bench_nearest
+"""
+import random
+import time
+
+from better_bst import BetterBinarySearchTree
+from data_structures import ArrayR
+
+SIZE = 50000
+QUERIES = 20
+
+
+def build_tree(keys) -> BetterBinarySearchTree:
+    pairs = ArrayR(len(keys))
+    for i, key in enumerate(keys):
+        pairs[i] = (key, f"block-{key}")
+    tree = BetterBinarySearchTree()
+    tree.load_sorted(pairs, len(keys))
+    return tree
+
+
+def scan_nearest(tree, block):
+    best = None
+    for key, item in tree:
+        if best is None or abs(key - block) < abs(best[0] - block):
+            best = (key, item)
+    return best
+
+
+def timed(function, blocks):
+    start = time.perf_counter()
+    results = tuple(function(block) for block in blocks)
+    return time.perf_counter() - start, results
+
+
+def main():
+    rng = random.Random(SIZE)
+    tree = build_tree(sorted(rng.sample(range(10 * SIZE), SIZE)))
+    blocks = [rng.randrange(10 * SIZE) for _ in range(QUERIES)]
+
+    scan_time, expected = timed(lambda block: scan_nearest(tree, block), blocks)
+    nearest_time, results = timed(tree.nearest, blocks)
+    assert tuple(abs(key - block) for (key, _), block in zip(results, blocks)) == \
+        tuple(abs(key - block) for (key, _), block in zip(expected, blocks))
+    print(f"{QUERIES} nearest blocks among {SIZE}: scan {scan_time:.3f}s, nearest {nearest_time:.4f}s")
+    for method in (tree.floor, tree.ceiling, tree.predecessor, tree.successor):
+        elapsed, _ = timed(method, blocks)
+        print(f"  {method.__name__:12} {elapsed:.4f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark for counting and paginating over a balanced BetterBinarySearchTree.
+
+Counts the keys in random ranges with count_range, against materializing them with range_query,
+and reads a page of PAGE_SIZE pairs at a random offset with select followed by irange, against
+iterating from the smallest key up to the offset.
+
+Run from the repository root:
+    python -m benchmarks.bench_order_statistics
+"""
+import itertools
+import random
+import time
+
+from better_bst import BetterBinarySearchTree
+from data_structures import ArrayR
+
+SIZE = 100000
+QUERIES = 10
+PAGE_SIZE = 20
+
+
+def build_tree() -> BetterBinarySearchTree:
+    pairs = ArrayR(SIZE)
+    for i in range(SIZE):
+        pairs[i] = (f"restaurant-{i:06d}", i)
+    tree = BetterBinarySearchTree()
+    tree.load_sorted(pairs, SIZE)
+    return tree
+
+
+def timed(function, arguments) -> float:
+    start = time.perf_counter()
+    for argument in arguments:
+        function(*argument)
+    return time.perf_counter() - start
+
+
+def page_by_select(tree, offset):
+    key, _ = tree.select(offset)
+    return tuple(itertools.islice(tree.irange(key, "restaurant-999999"), PAGE_SIZE))
+
+
+def page_by_scan(tree, offset):
+    return tuple(itertools.islice(iter(tree), offset, offset + PAGE_SIZE))
+
+
+def main():
+    tree = build_tree()
+    rng = random.Random(QUERIES)
+    ranges = []
+    for _ in range(QUERIES):
+        low, high = sorted((rng.randrange(SIZE), rng.randrange(SIZE)))
+        ranges.append((f"restaurant-{low:06d}", f"restaurant-{high:06d}"))
+    offsets = [(rng.randrange(SIZE - PAGE_SIZE),) for _ in range(QUERIES)]
+
+    for (low, high), (offset,) in zip(ranges[:3], offsets[:3]):
+        assert tree.count_range(low, high) == len(tree.range_query(low, high))
+        assert page_by_select(tree, offset) == page_by_scan(tree, offset)
+
+    print(f"{QUERIES} queries over {SIZE} keys   {'scan (s)':>9} {'order statistics (s)':>21}")
+    count_scan = timed(lambda low, high: len(tree.range_query(low, high)), ranges)
+    count_fast = timed(tree.count_range, ranges)
+    print(f"  {'count keys in range':32} {count_scan:>9.3f} {count_fast:>21.4f}")
+    page_scan = timed(lambda offset: page_by_scan(tree, offset), offsets)
+    page_fast = timed(lambda offset: page_by_select(tree, offset), offsets)
+    print(f"  {f'page of {PAGE_SIZE} at a random offset':32} {page_scan:>9.3f} {page_fast:>21.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark for rebalancing a BetterBinarySearchTree.
+
+Rebalances trees built from random keys, and sticks built from sorted keys, with rebalance,
+which copies every pair into an ArrayR and builds new nodes, and with rebalance_in_place,
+which rotates the existing nodes (Day-Stout-Warren). Times are measured on their own, then
+peak memory allocated during the call is measured with tracemalloc on a fresh tree.
+
+Run from the repository root:
+    python -m benchmarks.bench_rebalance
+"""
+import random
+import time
+import tracemalloc
+
+from better_bst import BetterBinarySearchTree
+from data_structures import BinaryNode
+
+SIZES = (10000, 100000)
+
+
+def random_tree(size: int) -> BetterBinarySearchTree:
+    rng = random.Random(size)
+    tree = BetterBinarySearchTree()
+    for key in rng.sample(range(10 * size), size):
+        tree[key] = key
+    return tree
+
+
+def stick(size: int) -> BetterBinarySearchTree:
+    # Built bottom-up: inserting sorted keys one at a time would take O(size^2).
+    root = None
+    for key in range(size - 1, -1, -1):
+        node = BinaryNode(key, key, size - key)
+        node.height = size - key
+        node.right = root
+        root = node
+    tree = BetterBinarySearchTree()
+    tree._BinarySearchTree__root = root
+    tree._BinarySearchTree__length = size
+    return tree
+
+
+def measure(build, size: int, method: str):
+    tree = build(size)
+    start = time.perf_counter()
+    getattr(tree, method)()
+    elapsed = time.perf_counter() - start
+    assert tree.balance_score() == 0
+
+    tree = build(size)
+    tracemalloc.start()
+    getattr(tree, method)()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    print(f"  {'tree':7} {'keys':>7} {'method':19} {'time (s)':>9} {'peak memory (KiB)':>18}")
+    for label, build in (("random", random_tree), ("stick", stick)):
+        for size in SIZES:
+            for method in ("rebalance", "rebalance_in_place"):
+                elapsed, peak = measure(build, size, method)
+                print(f"  {label:7} {size:>7} {method:19} {elapsed:>9.3f} {peak / 1024:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark for cold start from a catalog snapshot.
+
+Compares rebuilding FoodFlight from raw menus (constructing and sorting every
+Restaurant, then inserting it into the tree) with loading a snapshot, both
+before and after every menu has been materialized.
+
+Run from the repository root:
+    python -m benchmarks.bench_snapshot
+"""
+import os
+import random
+import tempfile
+import time
+
+from catalog_snapshot import CatalogSnapshot, save_catalog
+from data_structures import ArrayR
+from restaurants import FoodFlight, MenuItem, Restaurant
+
+RESTAURANTS = 5000
+ITEMS_PER_MENU = 40
+
+
+def raw_catalog():
+    rng = random.Random(RESTAURANTS)
+    catalog = ArrayR(RESTAURANTS)
+    for r in range(RESTAURANTS):
+        menu = ArrayR(ITEMS_PER_MENU)
+        # Dish names repeat across menus, but never within one.
+        dishes = rng.sample(range(2000), ITEMS_PER_MENU)
+        for i in range(ITEMS_PER_MENU):
+            menu[i] = MenuItem(f"dish-{dishes[i]}", rng.randint(1, 50) / 10)
+        catalog[r] = (f"restaurant-{rng.random():.12f}", rng.randrange(1000), menu)
+    return catalog
+
+
+def rebuild(catalog) -> FoodFlight:
+    ff = FoodFlight()
+    for i in range(len(catalog)):
+        name, block_number, menu = catalog[i]
+        ff.add_restaurant(Restaurant(name, block_number, menu))
+    return ff
+
+
+def touch_menus(ff: FoodFlight) -> None:
+    for _, restaurant in ff.restaurants:
+        len(restaurant.menu)
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main():
+    catalog = raw_catalog()
+    ff, rebuild_time = timed(lambda: rebuild(catalog))
+
+    path = os.path.join(tempfile.mkdtemp(), "catalog.snapshot")
+    _, save_time = timed(lambda: save_catalog(ff, path))
+    snapshot = CatalogSnapshot(path)
+    loaded, load_time = timed(snapshot.load)
+    _, touch_time = timed(lambda: touch_menus(loaded))
+    assert snapshot.closed
+
+    print(f"{RESTAURANTS} restaurants x {ITEMS_PER_MENU} items, snapshot {os.path.getsize(path) / 1024:.0f} KiB")
+    print(f"  rebuild from raw menus      {rebuild_time:8.3f}s")
+    print(f"  save snapshot               {save_time:8.3f}s")
+    print(f"  load snapshot (lazy menus)  {load_time:8.3f}s")
+    print(f"  then materialize all menus  {touch_time:8.3f}s")
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
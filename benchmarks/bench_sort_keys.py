@@ -0,0 +1,118 @@
+"""
+Benchmark for comparisons of menu items in mergesort and the suggestion merge.
+
+Compares the previous MenuItem (rich comparisons generated by total_ordering,
+branching on rating and then name) and the previous recursive mergesort, which
+called its key function twice per comparison, with the cached (-rating, name)
+sort key and the bottom-up mergesort that computes each key once.
+
+Run from the repository root:
+    python -m benchmarks.bench_sort_keys
+"""
+import random
+import time
+from functools import total_ordering
+
+from algorithms import mergesort
+from data_structures import ArrayR, LoserTree
+from restaurants import MenuItem, menu_item_key
+
+MENU_SIZE = 10 ** 5
+RUNS = 100
+
+
+@total_ordering
+class LegacyMenuItem:
+    """ MenuItem as it was before sort keys were cached. """
+    def __init__(self, name: str, rating: float):
+        self.name = name
+        self.rating = rating
+
+    def __eq__(self, other):
+        return self.rating == other.rating and self.name == other.name
+
+    def __lt__(self, other):
+        if self.rating != other.rating:
+            return self.rating > other.rating
+        return self.name < other.name
+
+
+def legacy_mergesort(my_list: ArrayR, key=lambda x: x) -> ArrayR:
+    """ The previous recursive mergesort, restricted to ArrayR. """
+    if len(my_list) <= 1:
+        return my_list
+    break_index = (len(my_list) + 1) // 2
+    left_half = ArrayR(break_index)
+    right_half = ArrayR(len(my_list) - break_index)
+    for i in range(break_index):
+        left_half[i] = my_list[i]
+    for i in range(break_index, len(my_list)):
+        right_half[i - break_index] = my_list[i]
+    list1 = legacy_mergesort(left_half, key)
+    list2 = legacy_mergesort(right_half, key)
+    merged = ArrayR(len(list1) + len(list2))
+    cur_left = cur_right = 0
+    while cur_left < len(list1) and cur_right < len(list2):
+        if key(list1[cur_left]) <= key(list2[cur_right]):
+            merged[cur_left + cur_right] = list1[cur_left]
+            cur_left += 1
+        else:
+            merged[cur_left + cur_right] = list2[cur_right]
+            cur_right += 1
+    for i in range(cur_left, len(list1)):
+        merged[i + cur_right] = list1[i]
+    for i in range(cur_right, len(list2)):
+        merged[cur_left + i] = list2[i]
+    return merged
+
+
+def make_menu(item_type) -> ArrayR:
+    rng = random.Random(MENU_SIZE)
+    menu = ArrayR(MENU_SIZE)
+    for i in range(MENU_SIZE):
+        menu[i] = item_type(f"dish-{rng.randrange(MENU_SIZE)}", rng.randint(1, 50) / 10)
+    return menu
+
+
+def make_runs(menu: ArrayR, key) -> ArrayR:
+    runs = ArrayR(RUNS)
+    size = MENU_SIZE // RUNS
+    for r in range(RUNS):
+        run = ArrayR(size)
+        for i in range(size):
+            run[i] = menu[r * size + i]
+        runs[r] = mergesort(run, key=key)
+    return runs
+
+
+def timed(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def drain(iterator) -> None:
+    for _ in iterator:
+        pass
+
+
+def main():
+    legacy_menu = make_menu(LegacyMenuItem)
+    keyed_menu = make_menu(MenuItem)
+
+    print(f"mergesort of {MENU_SIZE} items")
+    print(f"  previous mergesort, legacy items    {timed(lambda: legacy_mergesort(legacy_menu)):8.3f}s")
+    print(f"  legacy items, natural order         {timed(lambda: mergesort(legacy_menu)):8.3f}s")
+    print(f"  keyed items, natural order          {timed(lambda: mergesort(keyed_menu)):8.3f}s")
+    print(f"  keyed items, key=sort_key           {timed(lambda: mergesort(keyed_menu, key=menu_item_key)):8.3f}s")
+
+    legacy_runs = make_runs(legacy_menu, None)
+    keyed_runs = make_runs(keyed_menu, menu_item_key)
+    print(f"loser tree merge of {RUNS} runs, {MENU_SIZE} items")
+    print(f"  legacy items, natural order         {timed(lambda: drain(LoserTree(legacy_runs))):8.3f}s")
+    print(f"  keyed items, natural order          {timed(lambda: drain(LoserTree(keyed_runs))):8.3f}s")
+    print(f"  keyed items, key=sort_key           {timed(lambda: drain(LoserTree(keyed_runs, key=menu_item_key))):8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark for sorted-insert workloads on the restaurant tree.
+
+Inserts keys in increasing order, as restaurant names arriving sorted would, into a plain
+BetterBinarySearchTree (which degenerates into a stick, so every insert and lookup walks
+the whole tree), into an AVLBetterBinarySearchTree and into a ScapegoatBetterBinarySearchTree, then looks
+every key up once. Also registers sorted restaurant names with FoodFlight.add_restaurant.
+
+Run from the repository root:
+    python -m benchmarks.bench_sorted_inserts
+"""
+import time
+
+from better_bst import AVLBetterBinarySearchTree, BetterBinarySearchTree, ScapegoatBetterBinarySearchTree
+from data_structures import ArrayR
+from restaurants import FoodFlight, MenuItem, Restaurant
+
+PLAIN_SIZES = (250, 500, 900)
+AVL_SIZES = (250, 500, 900, 10000, 100000)
+RESTAURANTS = 900
+
+
+def height(tree) -> int:
+    """ Number of edges on the longest path from the root. """
+    return tree.balance_score() + (len(tree).bit_length() - 1)
+
+
+def run(tree_class, size: int):
+    tree = tree_class()
+    start = time.perf_counter()
+    for k in range(size):
+        tree[k] = k
+    insert_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for k in range(size):
+        tree[k]
+    lookup_time = time.perf_counter() - start
+    return insert_time, lookup_time, height(tree)
+
+
+def register(balanced: bool) -> float:
+    ff = FoodFlight(balanced=balanced)
+    start = time.perf_counter()
+    for r in range(RESTAURANTS):
+        ff.add_restaurant(Restaurant(f"restaurant-{r:05d}", 0, ArrayR.from_list([MenuItem("dish", 1)])))
+    for r in range(RESTAURANTS):
+        ff.get_menu(f"restaurant-{r:05d}")
+    return time.perf_counter() - start
+
+
+def main():
+    print("sorted inserts, then one lookup per key")
+    print(f"  {'tree':32} {'keys':>7} {'insert (s)':>11} {'lookup (s)':>11} {'height':>7}")
+    for tree_class, sizes in ((BetterBinarySearchTree, PLAIN_SIZES), (AVLBetterBinarySearchTree, AVL_SIZES),
+                             (ScapegoatBetterBinarySearchTree, AVL_SIZES)):
+        for size in sizes:
+            insert_time, lookup_time, tree_height = run(tree_class, size)
+            print(f"  {tree_class.__name__:32} {size:>7} {insert_time:>11.3f} {lookup_time:>11.3f} {tree_height:>7}")
+    print(f"FoodFlight.add_restaurant of {RESTAURANTS} sorted names, then get_menu of each:")
+    print(f"  unbalanced {register(False):.3f}s, balanced {register(True):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark for radius queries over restaurant locations.
+
+Compares FoodFlight.meal_suggestions_near, which finds its candidates in a k-d tree,
+with scanning every restaurant for its distance before the same loser tree merge.
+
+Run from the repository root:
+    python -m benchmarks.bench_suggestions_near
+"""
+import math
+import random
+import time
+
+from data_structures import ArrayR, LoserTree
+from restaurants import FoodFlight, MenuItem, Restaurant, menu_item_key
+
+RESTAURANTS = 20000
+ITEMS_PER_MENU = 5
+CITY_SIZE = 1000
+QUERIES = 20
+
+
+def build_catalog() -> FoodFlight:
+    rng = random.Random(RESTAURANTS)
+    restaurants = ArrayR(RESTAURANTS)
+    for r in range(RESTAURANTS):
+        menu = ArrayR(ITEMS_PER_MENU)
+        for i in range(ITEMS_PER_MENU):
+            menu[i] = MenuItem(f"dish-{i}", rng.randint(1, 50) / 10)
+        location = (rng.uniform(0, CITY_SIZE), rng.uniform(0, CITY_SIZE))
+        restaurants[r] = Restaurant(f"restaurant-{r:05d}", 0, menu, location=location)
+    ff = FoodFlight()
+    ff.bulk_load(restaurants)
+    return ff
+
+
+def scan_suggestions_near(ff: FoodFlight, point, radius):
+    """ The same query without a spatial index: every restaurant is checked. """
+    candidates = ArrayR(len(ff.restaurants))
+    count = 0
+    for _, restaurant in ff.restaurants:
+        if math.dist(restaurant.location, point) <= radius:
+            candidates[count] = restaurant.menu
+            count += 1
+    exact = ArrayR(count)
+    for i in range(count):
+        exact[i] = candidates[i]
+    yield from LoserTree(exact, key=menu_item_key)
+
+
+def run_queries(suggest, points, radius) -> float:
+    start = time.perf_counter()
+    for point in points:
+        for _ in suggest(point, radius):
+            pass
+    return time.perf_counter() - start
+
+
+def main():
+    ff = build_catalog()
+    rng = random.Random(QUERIES)
+    points = [(rng.uniform(0, CITY_SIZE), rng.uniform(0, CITY_SIZE)) for _ in range(QUERIES)]
+
+    start = time.perf_counter()
+    next(ff.meal_suggestions_near((0, 0), 0), None)
+    print(f"{RESTAURANTS} restaurants, k-d tree built in {time.perf_counter() - start:.3f}s")
+    print(f"{QUERIES} queries    {'radius':>6} {'scan (s)':>10} {'k-d tree (s)':>13}")
+    for radius in (10, 50, 200):
+        scan_time = run_queries(lambda p, r: scan_suggestions_near(ff, p, r), points, radius)
+        tree_time = run_queries(ff.meal_suggestions_near, points, radius)
+        print(f"{'':15}{radius:>6} {scan_time:>10.3f} {tree_time:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
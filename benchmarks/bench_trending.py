@@ -0,0 +1,90 @@
+"""
+Benchmark for trending-dish tracking over a skewed demand stream.
+
+Feeds EVENTS (block, dish) demand events, with dish popularity following a Zipf law,
+to TrendingDishes and to exact counting in a dict, and compares their update time,
+peak memory, and the top-TOP dishes they report over the whole city and over a block range.
+
+Run from the repository root:
+    python -m benchmarks.bench_trending
+"""
+import random
+import time
+import tracemalloc
+
+from trending import TrendingDishes
+
+EVENTS = 200000
+DISHES = 50000
+BLOCKS = 100
+TOP = 10
+
+
+def demand_stream():
+    rng = random.Random(EVENTS)
+    weights = [1 / (rank + 1) for rank in range(DISHES)]
+    dishes = rng.choices(range(DISHES), weights=weights, k=EVENTS)
+    return [(rng.randrange(BLOCKS), f"dish-{dish}") for dish in dishes]
+
+
+def exact_top(counts, low, high):
+    totals = {}
+    for (block, dish), count in counts.items():
+        if low <= block <= high:
+            totals[dish] = totals.get(dish, 0) + count
+    return sorted(totals.items(), key=lambda pair: -pair[1])[:TOP]
+
+
+def measure(make_record, events):
+    """ Time a pass over the events, then measure peak memory over another pass (tracemalloc slows it down). """
+    record, _ = make_record()
+    start = time.perf_counter()
+    for block, dish in events:
+        record(block, dish)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    record, state = make_record()
+    for block, dish in events:
+        record(block, dish)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, state
+
+
+def exact_counter():
+    counts = {}
+
+    def record(block, dish):
+        counts[(block, dish)] = counts.get((block, dish), 0) + 1
+    return record, counts
+
+
+def sketch_counter():
+    trending = TrendingDishes()
+    return trending.record, trending
+
+
+def main():
+    events = demand_stream()
+    exact_time, exact_peak, counts = measure(exact_counter, events)
+    sketch_time, sketch_peak, trending = measure(sketch_counter, events)
+
+    print(f"{EVENTS} events over {DISHES} dishes (Zipf) and {BLOCKS} blocks, {len(counts)} distinct (block, dish) pairs")
+    print(f"  {'':16} {'update (us)':>11} {'peak memory (KiB)':>18}")
+    print(f"  {'exact dict':16} {exact_time / EVENTS * 1e6:>11.2f} {exact_peak / 1024:>18.0f}")
+    print(f"  {'TrendingDishes':16} {sketch_time / EVENTS * 1e6:>11.2f} {sketch_peak / 1024:>18.0f}")
+
+    for low, high in ((0, BLOCKS - 1), (20, 29), (0, 0)):
+        exact = exact_top(counts, low, high)
+        start = time.perf_counter()
+        approximate = list(trending.top(TOP, low, high))
+        query_time = time.perf_counter() - start
+        found = len({dish for dish, _ in exact} & {dish for dish, _ in approximate})
+        error = max(abs(estimate - count) / count for (_, count), (_, estimate) in zip(exact[:3], approximate[:3]))
+        print(f"  blocks {low}-{high}: {found}/{TOP} of the exact top {TOP} found, "
+              f"largest relative error of the top 3 counts {error:.1%}, query {query_time * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
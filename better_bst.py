@@ -1,15 +1,130 @@
 # You're welcome to use this decorator
 # See: https://www.geeksforgeeks.org/python/python-functools-total_ordering/
+from __future__ import annotations
 from functools import total_ordering
 import math
 
 
-from typing import Union
+from typing import Callable, Tuple, TypeVar, Union
 from data_structures import ArrayList, ArrayR
-from data_structures.node import BinaryNode
-from data_structures.binary_search_tree import BinarySearchTree, K, V
+from data_structures.avl_tree import AVLNode, AVLTree, rebalance_node
+from data_structures.linked_stack import LinkedStack
+from data_structures.node import BinaryNode, Generic, Node, path_push
+from data_structures.binary_search_tree import BinarySearchTree, K, V, node_height, node_size, update_height
+
+A = TypeVar('A')
+
+
+class BSTRangeIterator(Generic[K, V]):
+    """ Lazy in-order iterator over the keys of a BST in the (inclusive) range [low, high].
+        Performs stack-based BST traversal, starting from the lower bound
+        and stopping as soon as a key passes the upper bound.
+        With `reverse`, goes in decreasing order instead, from the upper bound down to the lower bound.
+    """
+
+    def __init__(self, root: BinaryNode[K, V] | None, low: K, high: K, reverse: bool = False) -> None:
+        """ Iterator initialiser. """
+        self.__stack = LinkedStack[BinaryNode[K, V]]()
+        self.__current = root
+        self.__low = low
+        self.__high = high
+        self.__reverse = reverse
+
+    def __iter__(self) -> BSTRangeIterator:
+        """ Standard __iter__() method for initialisers. Returns itself. """
+        return self
+
+    def __next__(self) -> Tuple[K, V]:
+        """ The main body of the iterator.
+            Returns the (key, item) pairs in range one by one respecting the in-order.
+        """
+        if self.__reverse:
+            return self.__next_reversed()
+
+        # Walk down the leftmost path of the current subtree, skipping keys below low
+        # together with their left subtrees.
+        while self.__current:
+            if self.__current.key < self.__low:
+                self.__current = self.__current.right
+            else:
+                self.__stack.push(self.__current)
+                self.__current = self.__current.left
+
+        if self.__stack.is_empty():
+            raise StopIteration
+
+        result = self.__stack.pop()
+        if result.key > self.__high:
+            self.__stack.clear()
+            raise StopIteration
+        self.__current = result.right
+
+        return result.key, result.item
+
+    def __next_reversed(self) -> Tuple[K, V]:
+        """ __next__ in decreasing order: the mirror image of the walk above. """
+        # Walk down the rightmost path of the current subtree, skipping keys above high
+        # together with their right subtrees.
+        while self.__current:
+            if self.__current.key > self.__high:
+                self.__current = self.__current.left
+            else:
+                self.__stack.push(self.__current)
+                self.__current = self.__current.right
+
+        if self.__stack.is_empty():
+            raise StopIteration
+
+        result = self.__stack.pop()
+        if result.key < self.__low:
+            self.__stack.clear()
+            raise StopIteration
+        self.__current = result.left
+
+        return result.key, result.item
+
+
+class BSTPathInOrderIterator(Generic[K, V]):
+    """ In-order iterator over every (key, item) pair of a BST, like BSTInOrderIterator, keeping its stack
+        as a chain of linked nodes (see path_push). Every node is pushed and popped once per iteration,
+        which a LinkedStack would make dominate full walks of the tree.
+    """
+
+    def __init__(self, root: BinaryNode[K, V] | None) -> None:
+        """ Iterator initialiser. """
+        self.__stack: Node[BinaryNode[K, V]] | None = None
+        self.__current = root
+
+    def __iter__(self) -> BSTPathInOrderIterator:
+        """ Standard __iter__() method for initialisers. Returns itself. """
+        return self
+
+    def __next__(self) -> Tuple[K, V]:
+        """ The main body of the iterator.
+            Returns the (key, item) pairs of the BST one by one respecting the in-order.
+        """
+        while self.__current:
+            self.__stack = path_push(self.__stack, self.__current)
+            self.__current = self.__current.left
+
+        if self.__stack is None:
+            raise StopIteration
+
+        result, self.__stack = self.__stack.item, self.__stack.link
+        self.__current = result.right
+
+        return result.key, result.item
+
 
 class BetterBinarySearchTree(BinarySearchTree[K, V]):
+    def __iter__(self) -> BSTPathInOrderIterator[K, V]:
+        """
+            Create an in-order iterator.
+
+            Complexity Analysis: Best and worst case is O(N) across all __next__ calls, where N is the number of nodes in the BST.
+        """
+        return BSTPathInOrderIterator(self.__root)
+
     def range_query(self, low: K, high: K) -> Union[ArrayR[V], ArrayList[V]]:
         """
             Return all items from the BST with keys,
@@ -28,18 +143,186 @@ class BetterBinarySearchTree(BinarySearchTree[K, V]):
             
         """
         result = ArrayList() 
-        self.recursive_search(self.__root, low, high, result)
+        self.range_search(self.__root, low, high, result)
         return result
     
-    def recursive_search(self, node: BinaryNode[K,V] | None, low: K, high: K, result: ArrayList[V]) -> None:
-        if node is None:
-            return
-        if node.key > low:
-            self.recursive_search(node.left, low, high, result)
-        if low <= node.key <= high:
-            result.append(node.item)
-        if node.key < high:
-            self.recursive_search(node.right, low, high, result)
+    def irange(self, low: K, high: K, reverse: bool = False) -> BSTRangeIterator[K, V]:
+        """
+            Lazily iterate over the (key, item) pairs of the BST with keys
+            in the (inclusive) range of [low, high], in increasing order of key,
+            or in decreasing order of key, from high down to low, with `reverse`.
+
+            Complexity Analysis (across all __next__ calls): Best case is O(log N + K), where N is the number of nodes
+            in the BST and K is the number of keys consumed from the range. The best case occurs when the BST is balanced,
+            as the iterator descends O(log N) levels to the lower (or upper) bound and then visits each key in range once.
+            Iteration can stop early, in which case only the keys consumed so far are visited.
+
+            Worst case is O(N), where N is the number of nodes in the BST, when the BST is a stick and the starting bound
+            sits at its bottom, or when the range covers every key.
+        """
+        return BSTRangeIterator(self.__root, low, high, reverse)
+
+    def select(self, index: int) -> Tuple[K, V]:
+        """
+            Return the (key, item) pair with the `index`-th smallest key of the BST, counting from 0.
+            :raises IndexError: if index is not in [0, len(self)).
+
+            Complexity Analysis: Best case is O(1), when the pair is at the root. Worst case is O(D), where D is the depth
+            of the BST, O(log N) when it is balanced, as each step down skips a whole subtree by its size.
+        """
+        if not 0 <= index < len(self):
+            raise IndexError(f"Index out of range: {index}")
+        current = self.__root
+        while True:
+            left_size = node_size(current.left)
+            if index < left_size:
+                current = current.left
+            elif index > left_size:
+                index -= left_size + 1
+                current = current.right
+            else:
+                return current.key, current.item
+
+    def rank(self, key: K) -> int:
+        """
+            Return the number of keys of the BST smaller than `key`, which need not be in the BST.
+            For a key in the BST, this is its index in increasing order of key, as select takes it.
+
+            Complexity Analysis: Best and worst case is O(CompK * D), where D is the depth of the BST,
+            O(log N) when it is balanced. CompK is the complexity of comparing the keys.
+        """
+        return self.__count_below(key, False)
+
+    def count_range(self, low: K, high: K) -> int:
+        """
+            Return the number of keys of the BST in the (inclusive) range of [low, high], without visiting them.
+
+            Complexity Analysis: Best and worst case is O(CompK * D), where D is the depth of the BST,
+            O(log N) when it is balanced, whatever the number of keys in range, as range_query would take O(log N + K).
+            CompK is the complexity of comparing the keys.
+        """
+        if high < low:
+            return 0
+        return self.__count_below(high, True) - self.__count_below(low, False)
+
+    def floor(self, key: K) -> Tuple[K, V] | None:
+        """
+            Return the (key, item) pair with the largest key of the BST not larger than `key`, or None if there is none.
+            `key` need not be in the BST.
+
+            Complexity Analysis: Best case is O(CompK), when `key` is at the root. Worst case is O(CompK * D),
+            where D is the depth of the BST, O(log N) when it is balanced. CompK is the complexity of comparing the keys.
+        """
+        return self.__closest(key, True, True)
+
+    def ceiling(self, key: K) -> Tuple[K, V] | None:
+        """
+            Return the (key, item) pair with the smallest key of the BST not smaller than `key`, or None if there is none.
+            `key` need not be in the BST.
+
+            Complexity Analysis: Best case is O(CompK), when `key` is at the root. Worst case is O(CompK * D),
+            where D is the depth of the BST, O(log N) when it is balanced. CompK is the complexity of comparing the keys.
+        """
+        return self.__closest(key, False, True)
+
+    def predecessor(self, key: K) -> Tuple[K, V] | None:
+        """
+            Return the (key, item) pair with the largest key of the BST smaller than `key`, or None if there is none.
+            `key` need not be in the BST.
+
+            Complexity Analysis: Best and worst case is O(CompK * D), where D is the depth of the BST,
+            O(log N) when it is balanced. CompK is the complexity of comparing the keys.
+        """
+        return self.__closest(key, True, False)
+
+    def successor(self, key: K) -> Tuple[K, V] | None:
+        """
+            Return the (key, item) pair with the smallest key of the BST larger than `key`, or None if there is none.
+            `key` need not be in the BST.
+
+            Complexity Analysis: Best and worst case is O(CompK * D), where D is the depth of the BST,
+            O(log N) when it is balanced. CompK is the complexity of comparing the keys.
+        """
+        return self.__closest(key, False, False)
+
+    def nearest(self, key: K) -> Tuple[K, V] | None:
+        """
+            Return the (key, item) pair whose key is the closest to `key`, the smaller one on ties,
+            or None if the BST is empty. Keys must support subtraction, as block numbers do.
+
+            Complexity Analysis: Best case is O(CompK), when `key` is at the root. Worst case is O(CompK * D),
+            where D is the depth of the BST, O(log N) when it is balanced, as the floor and ceiling of `key`
+            are both found on its search path. CompK is the complexity of comparing the keys.
+        """
+        below = None
+        above = None
+        current = self.__root
+        while current is not None:
+            if key < current.key:
+                above = current
+                current = current.left
+            elif key > current.key:
+                below = current
+                current = current.right
+            else:
+                return current.key, current.item
+        if below is None and above is None:
+            return None
+        if above is None or (below is not None and key - below.key <= above.key - key):
+            return below.key, below.item
+        return above.key, above.item
+
+    def __closest(self, key: K, below: bool, inclusive: bool) -> Tuple[K, V] | None:
+        """
+            (key, item) pair with the closest key to `key` below it (above it unless `below`),
+            which may be `key` itself when `inclusive`, or None if there is none.
+        """
+        closest = None
+        current = self.__root
+        while current is not None:
+            if inclusive and current.key == key:
+                return current.key, current.item
+            if (current.key < key) if below else (key < current.key):
+                closest = current
+                current = current.right if below else current.left
+            else:
+                current = current.left if below else current.right
+        return (closest.key, closest.item) if closest is not None else None
+
+    def __count_below(self, key: K, inclusive: bool) -> int:
+        """ Number of keys smaller than `key`, or not larger than it when `inclusive`. """
+        count = 0
+        current = self.__root
+        while current is not None:
+            if current.key < key or (inclusive and current.key == key):
+                count += node_size(current.left) + 1
+                current = current.right
+            else:
+                current = current.left
+        return count
+
+    def range_search(self, node: BinaryNode[K,V] | None, low: K, high: K, result: ArrayList[V]) -> None:
+        """
+            Append the items of the subtree of `node` with keys in [low, high] to `result`, in increasing order of key.
+            Walks the tree with an explicit stack (a chain of linked nodes, see path_push), so the depth
+            of the tree is not bound by the recursion limit. Subtrees entirely outside the range are skipped.
+
+            Complexity Analysis: Best case is O(log N + K), where N is the number of nodes below `node` and K the number
+            of keys in range, when the subtree is balanced. Worst case is O(N), when it is a stick or the range covers it.
+        """
+        stack = None
+        current = node
+        while current is not None or stack is not None:
+            while current is not None:
+                stack = path_push(stack, current)
+                current = current.left if current.key > low else None
+            current, stack = stack.item, stack.link
+            if low <= current.key <= high:
+                result.append(current.item)
+            current = current.right if current.key < high else None
+
+    # Former name of range_search, from when it recursed, kept for existing callers.
+    recursive_search = range_search
 
     def balance_score(self):
         """
@@ -47,24 +330,10 @@ class BetterBinarySearchTree(BinarySearchTree[K, V]):
             difference between the ideal (balanced) height of the tree (achievable with a complete tree),
             and the actual height of the tree.
 
-            Complexity Analysis: Best case is O(N), where N is the number of nodes in the BST. The best case happens when
-            the BST is perfectly balanced. In this case, the method still has to call the recursive height function and check
-            every node atleast once to calculate the height, resulting in O(N) time.
-
-            Worst case is O(N), where N is the number of nodes, The worst case happens when the BST is completely unbalanced like
-            a stick. Regardless, the method still calls the recursive height function to check every node atleast once to calculate 
-            the height. 
-            
+            Complexity Analysis: Best and worst case is O(1), as every node stores the height of its subtree,
+            kept up to date by insertions and deletions, so the height of the tree is read from the root.
         """
-        
-        def subtree_height(node: BinaryNode[K,V] | None):
-            if node is None:
-                return -1
-            left_height = subtree_height(node.left)
-            right_height = subtree_height(node.right)
-            return 1 + max(left_height, right_height)
-        
-        tree_height = subtree_height(self.__root)
+        tree_height = node_height(self.__root) - 1
         total_nodes = len(self)
 
         if total_nodes > 0:
@@ -73,6 +342,109 @@ class BetterBinarySearchTree(BinarySearchTree[K, V]):
             ideal_height = 0
 
         return tree_height - ideal_height
+
+    def subtree_balance_score(self, key: K) -> int:
+        """
+            Returns the balance score of the subtree rooted at the node of `key`, defined as for the whole BST.
+            :raises KeyError: if the key is not in the BST.
+
+            Complexity Analysis: Best case is O(CompK), when `key` is at the root. Worst case is O(CompK * D),
+            where D is the depth of the BST, to find the node, whose size and height are then read directly.
+            CompK is the complexity of comparing the keys.
+        """
+        node, _ = self.__find_with_path(key)
+        return self.__node_balance_score(node)
+
+    def most_unbalanced_subtree(self) -> K | None:
+        """
+            Returns the key at the root of the most unbalanced subtree along the longest path of the BST, or None when
+            the BST is empty. A subtree is as unbalanced as the difference between the heights of its two children,
+            and the smallest one wins ties. Unlike the balance score of a subtree, which includes that of its
+            descendants, this singles out where the imbalance arises; and only subtrees on the longest path can make
+            the BST taller than it needs to be, so this is the subtree to pass to rebalance_subtree.
+
+            Complexity Analysis: Best case is O(1), when the BST has a single node. Worst case is O(D), where D is the depth
+            of the BST, as the longest path is followed from the root by always moving to the taller child.
+        """
+        worst = None
+        worst_imbalance = -1
+        current = self.__root
+        while current is not None:
+            left_height = node_height(current.left)
+            right_height = node_height(current.right)
+            imbalance = abs(left_height - right_height)
+            if imbalance >= worst_imbalance:
+                worst = current
+                worst_imbalance = imbalance
+            current = current.left if left_height >= right_height else current.right
+        return worst.key if worst is not None else None
+
+    def rebalance_subtree(self, key: K) -> None:
+        """
+            Restructure the subtree rooted at the node of `key` such that it is balanced, leaving the rest of the BST as it is.
+            :raises KeyError: if the key is not in the BST.
+
+            Complexity Analysis: Best and worst case is O(CompK * D + S), where D is the depth of the BST and S the number
+            of nodes in the subtree: the node is found, the S pairs of its subtree are rebuilt balanced, and the heights
+            of the nodes above it are updated. CompK is the complexity of comparing the keys.
+        """
+        node, path = self.__find_with_path(key)
+        self.__rebuild_subtree(node, path)
+
+    def __node_balance_score(self, node: BinaryNode[K, V]) -> int:
+        """ Balance score of the subtree of `node`, from its stored height and size. """
+        return node.height - 1 - math.floor(math.log2(node.size))
+
+    def __find_with_path(self, key: K) -> Tuple[BinaryNode[K, V], Node | None]:
+        """
+            Return the node of `key`, and the path above it: a chain of linked nodes (see path_push)
+            from its parent up to the root, or None for the root.
+            :raises KeyError: if the key is not in the BST.
+        """
+        path = None
+        current = self.__root
+        while current is not None:
+            if key < current.key:
+                path = path_push(path, current)
+                current = current.left
+            elif key > current.key:
+                path = path_push(path, current)
+                current = current.right
+            else:
+                return current, path
+        raise KeyError(f'Key not found: {key}')
+
+    def __rebuild_subtree(self, node: BinaryNode[K, V], path: Node | None) -> None:
+        """
+            Replace the subtree of `node`, below the nodes of `path` (from its parent up to the root, or None),
+            by a balanced copy made of new nodes, then update the heights along `path`.
+            The nodes of the old subtree are left unchanged.
+        """
+        size = node.size
+        pairs = ArrayR(size)
+        count = 0
+        stack = None
+        current = node
+        while current is not None or stack is not None:
+            while current is not None:
+                stack = path_push(stack, current)
+                current = current.left
+            current, stack = stack.item, stack.link
+            pairs[count] = (current.key, current.item)
+            count += 1
+            current = current.right
+        rebuilt = self.build_balanced_bst(pairs, 0, size - 1)
+
+        if path is None:
+            self.__root = rebuilt
+        elif path.item.left is node:
+            path.item.left = rebuilt
+        else:
+            path.item.right = rebuilt
+        update_node = self.update_node
+        while path is not None:
+            ancestor, path = path.item, path.link
+            update_node(ancestor)
     
     
     
@@ -101,7 +473,181 @@ class BetterBinarySearchTree(BinarySearchTree[K, V]):
         for i, (key, item) in enumerate(self):  
             inorder_items[i] = (key, item)
 
-        self._BetterBinarySearchTree__root = self.build_balanced_bst(inorder_items, 0, bst_size - 1)
+        self.load_sorted(inorder_items, bst_size)
+
+
+    def rebalance_in_place(self) -> None:
+        """
+            Restructure the BST such that it is balanced, as rebalance does, but by rotating the existing nodes
+            (Day-Stout-Warren) instead of copying every pair out and building new nodes.
+            Right rotations first straighten the tree into a vine, a chain of right children in increasing order of key,
+            which a series of left rotations along the vine then compresses into a complete tree: the deepest level
+            is filled first, then every pass halves the vine, leaving a tree of height floor(log2 N).
+            Only a pseudo-root node is allocated; sizes and heights are refreshed afterwards by a walk with
+            an explicit stack, which never holds more than O(log N) nodes on the balanced tree.
+            As the nodes are changed in place, this must not be called on a BST sharing nodes with versions
+            made by with_item, which rebalance leaves untouched.
+
+            Complexity Analysis: Best and worst case is O(N), where N is the number of nodes in the BST.
+            Straightening takes at most N - 1 rotations, as each one puts a node on the vine for good,
+            and the passes of the compression do N / 2 + N / 4 + ... < N rotations.
+        """
+        size = len(self)
+        if size == 0:
+            return
+
+        pseudo_root = BinaryNode()
+        pseudo_root.right = self.__root
+
+        # Tree to vine: rotate right at every node with a left child, until no node has one.
+        tail = pseudo_root
+        rest = tail.right
+        while rest is not None:
+            if rest.left is None:
+                tail = rest
+                rest = rest.right
+            else:
+                left = rest.left
+                rest.left = left.right
+                left.right = rest
+                rest = left
+                tail.right = left
+
+        # Vine to tree: first turn the nodes beyond the largest complete tree into leaves, then halve the vine.
+        leaves = size + 1 - (1 << ((size + 1).bit_length() - 1))
+        self.__compress(pseudo_root, leaves)
+        size -= leaves
+        while size > 1:
+            size //= 2
+            self.__compress(pseudo_root, size)
+        self.__root = pseudo_root.right
+
+        # Post-order walk, with a stack (see path_push) of the ancestors of `current`. A node on top of the stack is
+        # updated once its right subtree is done, which is when that subtree's root was the last node updated.
+        update_node = self.update_node
+        stack = None
+        current = self.__root
+        last = None
+        while stack is not None or current is not None:
+            if current is not None:
+                stack = path_push(stack, current)
+                current = current.left
+                continue
+            top = stack.item
+            if top.right is not None and top.right is not last:
+                current = top.right
+            else:
+                update_node(top)
+                last = top
+                stack = stack.link
+
+    def __compress(self, pseudo_root: BinaryNode[K, V], count: int) -> None:
+        """ Rotate left at every other node of the vine below `pseudo_root`, `count` times from the top. """
+        scanner = pseudo_root
+        for _ in range(count):
+            child = scanner.right
+            scanner.right = child.right
+            scanner = scanner.right
+            child.right = scanner.left
+            scanner.left = child
+
+    def merge(self, other: BinarySearchTree[K, V]) -> None:
+        """
+            Add every (key, item) pair of `other` to this BST, taking the item of `other` for keys in both,
+            and restructure it such that it is balanced. `other` is left unchanged.
+
+            Do *not* return a new instance; as rebalance does, this method modifies the tree it is called on.
+
+            Complexity Analysis: Best and worst case is O((N + M) * CompK), where N and M are the number of nodes
+            in this BST and in `other`: both are walked once in order by their iterators, the two sorted streams
+            are merged in a single pass comparing O(N + M) keys, and the result is rebuilt with build_balanced_bst
+            in O(N + M), whatever the keys. Inserting the keys of `other` one at a time would take O(M log(N + M))
+            on a tree kept balanced, and could leave an unbalanced one otherwise.
+            CompK is the complexity of comparing the keys.
+        """
+        merged = ArrayR(len(self) + len(other))
+        count = 0
+        mine = iter(self)
+        theirs = iter(other)
+        mine_pair = next(mine, None)
+        their_pair = next(theirs, None)
+        while mine_pair is not None or their_pair is not None:
+            if their_pair is None or (mine_pair is not None and mine_pair[0] < their_pair[0]):
+                merged[count] = mine_pair
+                mine_pair = next(mine, None)
+            else:
+                if mine_pair is not None and mine_pair[0] == their_pair[0]:
+                    mine_pair = next(mine, None)
+                merged[count] = their_pair
+                their_pair = next(theirs, None)
+            count += 1
+
+        self.load_sorted(merged, count)
+
+
+    def with_item(self, key: K, item: V) -> BetterBinarySearchTree[K, V]:
+        """
+            Return a new BST holding every pair of this one, with `key` mapped to `item`.
+            This BST is left unchanged: only the nodes on the path to `key` are copied (path copying),
+            and every other node is shared between the two trees. As long as shared nodes are never
+            modified in place, a reader iterating over this BST is unaffected by the new one.
+
+            Complexity Analysis: Best case is O(CompK), when `key` is at the root, and only the root is copied.
+            Worst case is O(CompK * D), where D is the depth of the tree, when `key` is inserted at the bottom
+            of the tree and D nodes are copied. CompK is the complexity of comparing the keys.
+        """
+        tree = BetterBinarySearchTree()
+        tree.__length = len(self)
+        path = None
+        current = self.__root
+        while current is not None:
+            copy = BinaryNode(current.item, current.key, current.size)
+            copy.left = current.left
+            copy.right = current.right
+            copy.height = current.height
+            if path is None:
+                tree.__root = copy
+            elif copy.key < path.item.key:
+                path.item.left = copy
+            else:
+                path.item.right = copy
+            path = path_push(path, copy)
+            if key < current.key:
+                current = current.left
+            elif key > current.key:
+                current = current.right
+            else:  # key == current.key
+                copy.item = item
+                return tree
+
+        node = BinaryNode(item, key, 1)
+        if path is None:
+            tree.__root = node
+        elif key < path.item.key:
+            path.item.left = node
+        else:
+            path.item.right = node
+        tree.__length += 1
+
+        # Only the sizes and heights of the copies on the path change, deepest first.
+        update_node = tree.update_node
+        update_node(node)
+        while path is not None:
+            update_node(path.item)
+            path = path.link
+        return tree
+
+
+    def load_sorted(self, items: ArrayR, count: int) -> None:
+        """
+            Replace the contents of the BST with the first `count` (key, item) pairs of `items`,
+            which must be sorted by key with no duplicate keys. The BST is built balanced.
+
+            Complexity Analysis: Best and Worst case is O(count), as build_balanced_bst creates
+            one node per pair, regardless of the keys.
+        """
+        self.__root = self.build_balanced_bst(items, 0, count - 1)
+        self.__length = count
 
 
     def build_balanced_bst(self, nodes: ArrayR, start: int, end: int) -> BinaryNode[K, V] | None:
@@ -115,11 +661,380 @@ class BetterBinarySearchTree(BinarySearchTree[K, V]):
         
         root.left = self.build_balanced_bst(nodes, start, mid - 1)
         root.right = self.build_balanced_bst(nodes, mid + 1, end)
+        self.update_node(root)
         
         return root
     
 
-            
+
+
+class AVLBetterBinarySearchTree(BetterBinarySearchTree[K, V], AVLTree[K, V]):
+    """
+        BetterBinarySearchTree on an AVL tree: insertions and deletions (from AVLTree) keep its height O(log N),
+        whatever order the keys arrive in, and range_query, irange, rebalance and load_sorted work on it unchanged.
+    """
+
+    def with_item(self, key: K, item: V) -> AVLBetterBinarySearchTree[K, V]:
+        """
+            Return a new BST holding every pair of this one, with `key` mapped to `item`, rebalanced as an AVL tree.
+            This BST is left unchanged: only the nodes on the path to `key` are copied, and the rotations
+            rebalancing the new tree only ever move those copies.
+
+            Complexity Analysis: Best and worst case is O(CompK * log N), where N is the number of nodes in the BST,
+            as the path to `key` is O(log N) nodes long and each copied node is rebalanced in O(1).
+            CompK is the complexity of comparing the keys.
+        """
+        def insert_aux(current: AVLNode[K, V] | None) -> Tuple[AVLNode[K, V], bool]:
+            if current is None:
+                return AVLNode(item, key, 1), True
+
+            copy = AVLNode(current.item, current.key, current.size)
+            copy.left = current.left
+            copy.right = current.right
+            copy.height = current.height
+            added = False
+            if key < current.key:
+                copy.left, added = insert_aux(current.left)
+            elif key > current.key:
+                copy.right, added = insert_aux(current.right)
+            else:
+                copy.item = item
+                return copy, added
+            return rebalance_node(copy), added
+
+        tree = AVLBetterBinarySearchTree()
+        tree.__root, added = insert_aux(self.__root)
+        tree.__length = len(self) + added
+        return tree
+
+    def build_balanced_bst(self, nodes: ArrayR, start: int, end: int) -> AVLNode[K, V] | None:
+        """
+            Build AVL nodes, with their heights, for the pairs nodes[start..end] from the middle outwards.
+
+            Complexity Analysis: Best and worst case is O(end - start), one node per pair.
+        """
+        if start > end:
+            return None
+
+        mid = (start + end) // 2
+        key, item = nodes[mid]
+
+        root = AVLNode(item, key)
+        root.left = self.build_balanced_bst(nodes, start, mid - 1)
+        root.right = self.build_balanced_bst(nodes, mid + 1, end)
+        update_height(root)
+        return root
+
+
+
+class ScapegoatBetterBinarySearchTree(BetterBinarySearchTree[K, V]):
+    """
+        BetterBinarySearchTree which rebalances itself, as a scapegoat tree, from the subtree sizes its nodes already store.
+        An insertion which lands deeper than log N / log(1 / alpha) (about 1.71 log2 N for the default alpha of 2/3)
+        rebuilds the smallest subtree on its path where one child holds more than `alpha` of the nodes, and deletions
+        rebuild the whole tree once it has shrunk below `alpha` of its size at the last full rebuild.
+    """
+
+    def __init__(self, alpha: float = 2 / 3) -> None:
+        """
+            :raises ValueError: if alpha is not strictly between 0.5 and 1.
+            Complexity Analysis: Best and worst case is O(1).
+        """
+        if not 0.5 < alpha < 1:
+            raise ValueError("alpha must be strictly between 0.5 and 1")
+        super().__init__()
+        self.alpha = alpha
+        self.__depth_factor = 1 / math.log2(1 / alpha)
+        self.__max_size = 0
+
+    def __setitem__(self, key: K, item: V) -> None:
+        """
+            Insert `item` at `key`, replacing the item already there, if any, then rebuild the scapegoat
+            subtree if the new node is too deep.
+
+            Complexity Analysis: Best case is O(CompK), when `key` is at the root. Worst case is O(CompK * log N) amortised,
+            where N is the number of nodes in the BST, as the depth is kept O(log N) and a rebuild of a subtree of
+            S nodes, O(S), only happens after Omega(S) insertions into it. CompK is the complexity of comparing the keys.
+        """
+        path = None
+        current = self.__root
+        depth = 0
+        while current is not None:
+            if key < current.key:
+                path = path_push(path, current)
+                current = current.left
+            elif key > current.key:
+                path = path_push(path, current)
+                current = current.right
+            else:  # key == current.key
+                current.item = item
+                return
+            depth += 1
+
+        node = BinaryNode(item, key, 1)
+        if path is None:
+            self.__root = node
+        elif key < path.item.key:
+            path.item.left = node
+        else:
+            path.item.right = node
+        self.__length += 1
+        self.__inserted(node, path, depth)
+
+    def __delitem__(self, key: K) -> None:
+        """
+            Remove `key` and its item, rebuilding the whole tree once it has shrunk below `alpha` of its size at the last full rebuild.
+            :raises KeyError: if the key is not in the tree.
+
+            Complexity Analysis: Best case is O(CompK), when `key` is at the root. Worst case is O(CompK * log N) amortised,
+            as a full rebuild, O(N), only happens after Omega(N) deletions. CompK is the complexity of comparing the keys.
+        """
+        super().__delitem__(key)
+        if len(self) < self.alpha * self.__max_size:
+            self.rebalance()
+
+    def with_item(self, key: K, item: V) -> ScapegoatBetterBinarySearchTree[K, V]:
+        """
+            Return a new BST holding every pair of this one, with `key` mapped to `item`, with the same `alpha`.
+            This BST is left unchanged: only the nodes on the path to `key` are copied, and a rebuilt scapegoat
+            subtree is made of new nodes, linked to a copied parent.
+
+            Complexity Analysis: Best case is O(CompK), when `key` is at the root. Worst case is O(CompK * log N)
+            amortised over the versions derived from each other, plus O(S) when a scapegoat subtree of S nodes is rebuilt.
+            CompK is the complexity of comparing the keys.
+        """
+        tree = ScapegoatBetterBinarySearchTree(self.alpha)
+        tree.__max_size = self.__max_size
+        tree.__length = len(self)
+        path = None
+        current = self.__root
+        depth = 0
+        while current is not None:
+            copy = BinaryNode(current.item, current.key, current.size)
+            copy.left = current.left
+            copy.right = current.right
+            copy.height = current.height
+            if path is None:
+                tree.__root = copy
+            elif copy.key < path.item.key:
+                path.item.left = copy
+            else:
+                path.item.right = copy
+            if key < current.key:
+                current = current.left
+            elif key > current.key:
+                current = current.right
+            else:  # key == current.key
+                copy.item = item
+                return tree
+            path = path_push(path, copy)
+            depth += 1
+
+        node = BinaryNode(item, key, 1)
+        if path is None:
+            tree.__root = node
+        elif key < path.item.key:
+            path.item.left = node
+        else:
+            path.item.right = node
+        tree.__length += 1
+        tree.__inserted(node, path, depth)
+        return tree
+
+    def rebalance_in_place(self) -> None:
+        """
+            Restructure the BST such that it is balanced by rotating its nodes, recording the size of this full rebuild.
+
+            Complexity Analysis: Best and Worst case is O(N), where N is the number of nodes in the BST.
+        """
+        super().rebalance_in_place()
+        self.__max_size = len(self)
+
+    def load_sorted(self, items: ArrayR, count: int) -> None:
+        """
+            Replace the contents of the BST with the first `count` (key, item) pairs of `items`, built balanced.
+            As rebalance goes through here, this is also where the size of the last full rebuild is recorded.
+
+            Complexity Analysis: Best and Worst case is O(count).
+        """
+        super().load_sorted(items, count)
+        self.__max_size = count
+
+    def __inserted(self, node: BinaryNode[K, V], path, depth: int) -> None:
+        """
+            Update the sizes and heights of the nodes of `path` (a chain of linked nodes from the parent of `node`
+            up to the root, or None), then rebuild the scapegoat subtree of `node`, just inserted at `depth`, if it is too deep.
+        """
+        update_node = self.update_node
+        ancestors = path
+        while ancestors is not None:
+            ancestor, ancestors = ancestors.item, ancestors.link
+            update_node(ancestor)
+        size = len(self)
+        if size > self.__max_size:
+            self.__max_size = size
+        if depth <= math.log2(size) * self.__depth_factor:
+            return
+
+        # Walk back up until an ancestor is unbalanced: as the node is too deep, there is one.
+        child = node
+        while path is not None:
+            parent, path = path.item, path.link
+            if child.size > self.alpha * parent.size:
+                self.__rebuild_subtree(parent, path)
+                return
+            child = parent
+
+
+class AugmentedBetterBinarySearchTree(BetterBinarySearchTree[K, V]):
+    """
+        BetterBinarySearchTree which stores in every node, as its `aggregate`, the combination of the values
+        of every pair of its subtree, in increasing order of key, so that aggregate_range answers in O(log N).
+        The value of a pair is `value(key, item)`, the item itself by default, and `combine` must be associative,
+        such as a sum, a min, a max, or a sum of 1s for a count. Values and aggregates must not be None.
+        Aggregates are kept through insertions, deletions, with_item, rebalance, rebalance_in_place and merge,
+        as every node whose subtree changes goes through update_node.
+    """
+
+    def __init__(self, combine: Callable[..., A], value: Callable[..., A] | None = None, identity: A | None = None) -> None:
+        """
+            `combine(a, b)` joins the aggregates of two runs of pairs, `a` before `b`, and `value(key, item)` is the value
+            of a single pair. `identity` is what aggregate_range returns for a range holding no keys.
+            Complexity Analysis: Best and worst case is O(1).
+        """
+        super().__init__()
+        self.combine = combine
+        self.value = value if value is not None else (lambda key, item: item)
+        self.identity = identity
+
+    def update_node(self, node: BinaryNode[K, V]) -> None:
+        """
+            Recompute the size, height and aggregate of `node` from its children.
+            Complexity Analysis: Best and worst case is O(Combine), where Combine is the complexity of `combine` and `value`.
+        """
+        update_height(node)
+        aggregate = self.value(node.key, node.item)
+        if node.left is not None:
+            aggregate = self.combine(node.left.aggregate, aggregate)
+        if node.right is not None:
+            aggregate = self.combine(aggregate, node.right.aggregate)
+        node.aggregate = aggregate
+
+    def __setitem__(self, key: K, item: V) -> None:
+        """
+            Insert `item` at `key`, replacing the item already there, if any, and update the aggregates above it.
+
+            Complexity Analysis: Best case is O(CompK + Combine), when `key` is at the root. Worst case is
+            O((CompK + Combine) * D), where D is the depth of the tree, twice when an item is replaced:
+            once to find it, once to update the aggregates on its path.
+            CompK is the complexity of comparing the keys, Combine that of `combine` and `value`.
+        """
+        length = len(self)
+        super().__setitem__(key, item)
+        if len(self) == length:
+            # Replaced in place, so the aggregates of the path were not updated.
+            path = None
+            current = self.__root
+            while current is not None:
+                path = path_push(path, current)
+                if key < current.key:
+                    current = current.left
+                elif key > current.key:
+                    current = current.right
+                else:
+                    break
+            update_node = self.update_node
+            while path is not None:
+                node, path = path.item, path.link
+                update_node(node)
+
+    def with_item(self, key: K, item: V) -> AugmentedBetterBinarySearchTree[K, V]:
+        """
+            Return a new BST holding every pair of this one, with `key` mapped to `item`, with the same aggregate.
+            This BST is left unchanged: only the nodes on the path to `key` are copied, and only their aggregates recomputed.
+
+            Complexity Analysis: Best case is O(CompK + Combine), when `key` is at the root. Worst case is
+            O((CompK + Combine) * D), where D is the depth of the tree.
+            CompK is the complexity of comparing the keys, Combine that of `combine` and `value`.
+        """
+        tree = AugmentedBetterBinarySearchTree(self.combine, self.value, self.identity)
+        tree.__length = len(self)
+        path = None
+        current = self.__root
+        while current is not None:
+            copy = BinaryNode(current.item, current.key, current.size)
+            copy.left = current.left
+            copy.right = current.right
+            if path is None:
+                tree.__root = copy
+            elif copy.key < path.item.key:
+                path.item.left = copy
+            else:
+                path.item.right = copy
+            path = path_push(path, copy)
+            if key < current.key:
+                current = current.left
+            elif key > current.key:
+                current = current.right
+            else:  # key == current.key
+                copy.item = item
+                break
+        else:
+            node = BinaryNode(item, key, 1)
+            if path is None:
+                tree.__root = node
+            elif key < path.item.key:
+                path.item.left = node
+            else:
+                path.item.right = node
+            path = path_push(path, node)
+            tree.__length += 1
+
+        update_node = tree.update_node
+        while path is not None:
+            node, path = path.item, path.link
+            update_node(node)
+        return tree
+
+    def aggregate_range(self, low: K, high: K) -> A | None:
+        """
+            Return the combination of the values of the pairs with keys in the (inclusive) range of [low, high],
+            in increasing order of key, or `identity` if there are none, without visiting them.
+
+            Complexity Analysis: Best and worst case is O((CompK + Combine) * D), where D is the depth of the BST,
+            O(log N) when it is balanced, whatever the number of keys in range: below the first node in range,
+            the paths to the two bounds are followed, and every subtree hanging inside them is read from its aggregate.
+            CompK is the complexity of comparing the keys, Combine that of `combine` and `value`.
+        """
+        split = self.__root
+        while split is not None and not low <= split.key <= high:
+            split = split.left if high < split.key else split.right
+        if split is None:
+            return self.identity
+
+        result = self.value(split.key, split.item)
+        # Keys >= low in the left subtree, combined from the right, as each node is before those found above it.
+        current = split.left
+        while current is not None:
+            if current.key < low:
+                current = current.right
+                continue
+            if current.right is not None:
+                result = self.combine(current.right.aggregate, result)
+            result = self.combine(self.value(current.key, current.item), result)
+            current = current.left
+        # Keys <= high in the right subtree, combined from the left.
+        current = split.right
+        while current is not None:
+            if current.key > high:
+                current = current.left
+                continue
+            if current.left is not None:
+                result = self.combine(result, current.left.aggregate)
+            result = self.combine(result, self.value(current.key, current.item))
+            current = current.right
+        return result
+
 
 if __name__ == "__main__":
     # Test your code here.
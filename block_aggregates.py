@@ -0,0 +1,396 @@
+"""
+Rating aggregates of menu items per block number.
+
+BlockRatingTree is a BST keyed by block number. Each node holds the (restaurant, item)
+postings of every menu item at its block, sorted by MenuItem.sort_key, and is augmented
+with the count, total rating and best sort key of the postings in its whole subtree.
+The tree is kept balanced as an AVL tree, so a range of blocks decomposes
+into O(log B) whole subtrees and single nodes, which
+answers rating summaries directly from the subtree aggregates, and top-K queries by
+a best-first search that only opens subtrees able to contribute.
+"""
+from __future__ import annotations
+
+from operator import itemgetter
+from typing import TYPE_CHECKING, Iterator, Tuple
+
+from algorithms import merge, mergesort
+from data_structures import ArrayList, ArrayMinHeap, ArrayR
+from data_structures.avl_tree import rebalance_node
+from data_structures.binary_search_tree import update_height
+from data_structures.node import path_push
+
+if TYPE_CHECKING:
+    from restaurants import MenuItem, Restaurant
+
+Posting = Tuple["Restaurant", "MenuItem"]
+
+
+def posting_sort_key(posting: Posting) -> tuple:
+    """ Key function over the item of a (restaurant, item) posting. """
+    return posting[1].sort_key
+
+
+class RatingSummary:
+    """
+    Count, total and maximum of the ratings of a set of menu items.
+    """
+
+    def __init__(self, count: int = 0, total: float = 0, maximum: float | None = None) -> None:
+        self.count = count
+        self.total = total
+        self.maximum = maximum
+
+    @property
+    def average(self) -> float | None:
+        """
+        :complexity: O(1)
+        """
+        if self.count == 0:
+            return None
+        return self.total / self.count
+
+    def add(self, count: int, total: float, maximum: float | None) -> None:
+        """
+        Fold another summary, given by its fields, into this one.
+        :complexity: O(1)
+        """
+        self.count += count
+        self.total += total
+        if maximum is not None and (self.maximum is None or maximum > self.maximum):
+            self.maximum = maximum
+
+    def __str__(self) -> str:
+        return f"RatingSummary <count: {self.count}, total: {self.total}, maximum: {self.maximum}>"
+
+
+class BlockNode:
+    """
+    Node of a BlockRatingTree: the postings of one block, their own aggregates, and the aggregates of its subtree.
+    `height` and `size` are kept as in an AVL node, so the AVL rotations apply to it.
+    """
+
+    def __init__(self, block_number: int, postings: ArrayR[Posting]) -> None:
+        self.block_number = block_number
+        self.left: BlockNode | None = None
+        self.right: BlockNode | None = None
+        self.height = 1
+        self.size = 1
+        self.set_postings(postings)
+        self.update()
+
+    def set_postings(self, postings: ArrayR[Posting]) -> None:
+        """
+        Replace the postings of this block, which must be sorted, and recompute their own aggregates.
+        The subtree aggregates of this node and its ancestors must then be updated.
+        :complexity: O(P) where P is len(postings).
+        """
+        self.postings = postings
+        self.total = 0
+        for i in range(len(postings)):
+            self.total += postings[i][1].rating
+        self.count = len(postings)
+        self.best_key = postings[0][1].sort_key if len(postings) > 0 else None
+
+    def update(self) -> None:
+        """
+        Recompute the height, size and subtree aggregates of this node from its own aggregates and its children's.
+        :complexity: O(1)
+        """
+        update_height(self)
+        self.subtree_count = self.count
+        self.subtree_total = self.total
+        self.subtree_best_key = self.best_key
+        for child in (self.left, self.right):
+            if child is not None:
+                self.subtree_count += child.subtree_count
+                self.subtree_total += child.subtree_total
+                if child.subtree_best_key is not None and (
+                    self.subtree_best_key is None or child.subtree_best_key < self.subtree_best_key
+                ):
+                    self.subtree_best_key = child.subtree_best_key
+
+    @property
+    def maximum(self) -> float | None:
+        return None if self.best_key is None else -self.best_key[0]
+
+    @property
+    def subtree_maximum(self) -> float | None:
+        return None if self.subtree_best_key is None else -self.subtree_best_key[0]
+
+
+def rebalance_block(node: BlockNode) -> BlockNode:
+    """
+    Restore the AVL invariant at `node`, whose children are balanced and up to date, returning the new root of its subtree
+    with every aggregate up to date. The rotations only move `node` and up to two of its descendants,
+    which end up as the new root and its children.
+    :complexity: O(1)
+    """
+    root = rebalance_node(node)
+    for child in (root.left, root.right):
+        if child is not None:
+            child.update()
+    root.update()
+    return root
+
+
+class BlockRatingTree:
+    """
+    Menu item ratings by block number, supporting block range summaries and top-K queries.
+    The tree is built balanced, and blocks first seen afterwards are added as AVL insertions, so that its depth stays O(log B),
+    where B is the number of distinct block numbers. P below is the number of postings of the block concerned.
+    """
+
+    def __init__(self) -> None:
+        self.__root: BlockNode | None = None
+        self.__blocks = 0
+
+    @classmethod
+    def build(cls, restaurants: ArrayR[Restaurant]) -> BlockRatingTree:
+        """
+        Build a balanced tree over the menus of `restaurants`, which must be sorted.
+        :complexity: O(n log n) where n is the total number of menu items, for sorting the postings by block and rating.
+        """
+        item_count = 0
+        for i in range(len(restaurants)):
+            item_count += len(restaurants[i].menu)
+
+        postings = ArrayR(item_count)
+        count = 0
+        for i in range(len(restaurants)):
+            menu = restaurants[i].menu
+            for j in range(len(menu)):
+                postings[count] = (restaurants[i].block_number, menu[j].sort_key, restaurants[i], menu[j])
+                count += 1
+        postings = mergesort(postings, key=itemgetter(0, 1))
+
+        block_count = 0
+        for i in range(item_count):
+            if i == 0 or postings[i][0] != postings[i - 1][0]:
+                block_count += 1
+        blocks = ArrayR(block_count)
+        block_count = 0
+        start = 0
+        while start < item_count:
+            end = start
+            while end < item_count and postings[end][0] == postings[start][0]:
+                end += 1
+            block_postings = ArrayR(end - start)
+            for i in range(start, end):
+                block_postings[i - start] = (postings[i][2], postings[i][3])
+            blocks[block_count] = (postings[start][0], block_postings)
+            block_count += 1
+            start = end
+
+        tree = cls()
+        tree.__root = cls.__build_aux(blocks, 0, block_count - 1)
+        tree.__blocks = block_count
+        return tree
+
+    @classmethod
+    def __build_aux(cls, blocks: ArrayR[Tuple[int, ArrayR[Posting]]], start: int, end: int) -> BlockNode | None:
+        if start > end:
+            return None
+        mid = (start + end) // 2
+        block_number, postings = blocks[mid]
+        node = BlockNode(block_number, postings)
+        node.left = cls.__build_aux(blocks, start, mid - 1)
+        node.right = cls.__build_aux(blocks, mid + 1, end)
+        node.update()
+        return node
+
+    def __len__(self) -> int:
+        """ Number of distinct blocks in the tree. """
+        return self.__blocks
+
+    def add_items(self, restaurant: Restaurant, items: ArrayR[MenuItem]) -> None:
+        """
+        Add a posting for each of `items` at the block of `restaurant`, inserting the block if it is new.
+        :complexity: O(log B + m log m + P) where m is len(items), to sort the items and merge them into the block.
+        """
+        new_postings = ArrayR(len(items))
+        for i in range(len(items)):
+            new_postings[i] = (restaurant, items[i])
+        new_postings = mergesort(new_postings, key=posting_sort_key)
+
+        block_number = restaurant.block_number
+        path = None
+        current = self.__root
+        while current is not None and current.block_number != block_number:
+            path = path_push(path, current)
+            current = current.left if block_number < current.block_number else current.right
+
+        if current is not None:
+            current.set_postings(merge(current.postings, new_postings, key=posting_sort_key))
+            current.update()
+            # The shape is unchanged, so only the aggregates of the ancestors need updating.
+            while path is not None:
+                path.item.update()
+                path = path.link
+            return
+
+        # Link the new leaf, then rebalance each ancestor on the way back up, relinking the subtree it now roots.
+        subtree = BlockNode(block_number, new_postings)
+        self.__blocks += 1
+        while path is not None:
+            parent, path = path.item, path.link
+            if block_number < parent.block_number:
+                parent.left = subtree
+            else:
+                parent.right = subtree
+            subtree = rebalance_block(parent)
+        self.__root = subtree
+
+    def remove_items(self, restaurant: Restaurant, items: ArrayR[MenuItem] | None = None) -> None:
+        """
+        Remove the postings of `items` at `restaurant`, or of every item of `restaurant` when items is None.
+        The block itself stays in the tree, even once it has no postings left. Nothing happens when the block
+        is not in the tree, as it then has no postings to remove (build only creates blocks with postings).
+        :complexity: O(log B + P * m) where m is len(items), or O(log B + P) when items is None.
+        """
+        def keep(posting: Posting) -> bool:
+            if posting[0] is not restaurant:
+                return True
+            if items is None:
+                return False
+            for i in range(len(items)):
+                if posting[1] is items[i]:
+                    return False
+            return True
+
+        block_number = restaurant.block_number
+        path = None
+        current = self.__root
+        while current is not None and current.block_number != block_number:
+            path = path_push(path, current)
+            current = current.left if block_number < current.block_number else current.right
+        if current is None:
+            return
+
+        kept = ArrayR(len(current.postings))
+        count = 0
+        for i in range(len(current.postings)):
+            if keep(current.postings[i]):
+                kept[count] = current.postings[i]
+                count += 1
+        postings = ArrayR(count)
+        for i in range(count):
+            postings[i] = kept[i]
+        current.set_postings(postings)
+        current.update()
+        while path is not None:
+            path.item.update()
+            path = path.link
+
+    def __pieces(self, low: int | None, high: int | None) -> ArrayList[Tuple[BlockNode, bool]]:
+        """
+        Decompose the blocks in [low, high] into (node, whole subtree) pairs: either the whole subtree of the
+        node lies in the range, or only the node itself does. None bounds are unbounded.
+        :complexity: O(log B), giving O(log B) pieces.
+        """
+        pieces = ArrayList()
+
+        def pieces_aux(node: BlockNode | None, lower_inside: bool, upper_inside: bool) -> None:
+            # lower_inside/upper_inside: every key of this subtree is known to be >= low / <= high.
+            if node is None:
+                return
+            if lower_inside and upper_inside:
+                pieces.append((node, True))
+                return
+            above_low = low is None or node.block_number >= low
+            below_high = high is None or node.block_number <= high
+            if above_low and below_high:
+                pieces.append((node, False))
+            if above_low:
+                pieces_aux(node.left, lower_inside, upper_inside or below_high)
+            if below_high:
+                pieces_aux(node.right, lower_inside or above_low, upper_inside)
+
+        pieces_aux(self.__root, low is None, high is None)
+        return pieces
+
+    def summary(self, low: int | None = None, high: int | None = None) -> RatingSummary:
+        """
+        Summarise the ratings of every item at blocks in [low, high]. None bounds are unbounded.
+        :complexity: O(log B)
+        """
+        summary = RatingSummary()
+        pieces = self.__pieces(low, high)
+        for i in range(len(pieces)):
+            node, whole = pieces[i]
+            if whole:
+                summary.add(node.subtree_count, node.subtree_total, node.subtree_maximum)
+            else:
+                summary.add(node.count, node.total, node.maximum)
+        return summary
+
+    def block_summaries(self, low: int | None = None, high: int | None = None) -> Iterator[Tuple[int, RatingSummary]]:
+        """
+        Yield (block number, summary) for every block in [low, high] with at least one item, in block order.
+        :complexity: O(log B + K) across all __next__ calls, where K is the number of blocks in the range.
+        """
+        def blocks_aux(node: BlockNode | None) -> Iterator[Tuple[int, RatingSummary]]:
+            if node is None:
+                return
+            if low is None or node.block_number > low:
+                yield from blocks_aux(node.left)
+            if (low is None or node.block_number >= low) and (high is None or node.block_number <= high) and node.count > 0:
+                yield node.block_number, RatingSummary(node.count, node.total, node.maximum)
+            if high is None or node.block_number < high:
+                yield from blocks_aux(node.right)
+
+        yield from blocks_aux(self.__root)
+
+    def top_items(self, k: int, low: int | None = None, high: int | None = None) -> ArrayList[Posting]:
+        """
+        Return the k best (restaurant, item) postings at blocks in [low, high], in MenuItem order
+        (decreasing rating, then name). None bounds are unbounded.
+        Subtrees are opened best-first on their best sort key, so only subtrees holding one of the k results,
+        or tied with them, are opened.
+        :complexity: O(k log^2 B) worst case, as each result opens at most O(log B) subtrees above it.
+            O((log B + k) log(log B + k)) when the best items are spread over few subtrees.
+        """
+        result = ArrayList()
+        if k <= 0:
+            return result
+
+        pieces = self.__pieces(low, high)
+        # Entries are (sort key, order, node, position): the smallest sort key is opened first and, amongst equal keys,
+        # the entry pushed first. Position is the index of the next posting of the node, or -1 for its whole subtree.
+        frontier = ArrayMinHeap(max(2 * (len(pieces) + k), 1))
+        order = 0
+
+        def push(entry: Tuple[tuple, int, BlockNode, int]) -> None:
+            nonlocal frontier
+            if frontier.is_full():
+                grown = ArrayMinHeap(2 * len(frontier))
+                values = frontier.values()
+                for i in range(len(values)):
+                    grown.add(values[i])
+                frontier = grown
+            frontier.add(entry)
+
+        for i in range(len(pieces)):
+            node, whole = pieces[i]
+            if whole and node.subtree_best_key is not None:
+                push((node.subtree_best_key, order, node, -1))
+            elif not whole and node.best_key is not None:
+                push((node.best_key, order, node, 0))
+            order += 1
+
+        while len(result) < k and len(frontier) > 0:
+            _, _, node, position = frontier.extract_min()
+            if position < 0:
+                if node.best_key is not None:
+                    push((node.best_key, order, node, 0))
+                    order += 1
+                for child in (node.left, node.right):
+                    if child is not None and child.subtree_best_key is not None:
+                        push((child.subtree_best_key, order, child, -1))
+                        order += 1
+            else:
+                result.append(node.postings[position])
+                if position + 1 < len(node.postings):
+                    push((node.postings[position + 1][1].sort_key, order, node, position + 1))
+                    order += 1
+        return result
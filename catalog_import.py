@@ -0,0 +1,260 @@
+"""
+Streaming import of menu feeds into a FoodFlight catalog.
+
+A feed is a CSV file with a `restaurant,block,item,rating` header, or a JSON-lines file
+with one `{"restaurant": ..., "block": ..., "item": ..., "rating": ...}` object per line.
+Every record is one menu item of one restaurant; a restaurant's items may be spread
+anywhere through the feed.
+
+Records are parsed lazily, one line at a time, and buffered in chunks of at most
+`chunk_size` records. Each chunk is grouped by restaurant: the groups of restaurants
+already registered go through add_to_menu, and those of new restaurants become a
+name-sorted run of new restaurants. Once the feed is exhausted, the runs are merged
+(folding together the groups of a restaurant spread over several chunks) and
+registered by a single bulk_load, so the restaurant tree is rebuilt once per import
+rather than once per chunk. Apart from the catalog it builds, the import holds at
+most one chunk of records in memory, whatever the size of the feed.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import time
+from operator import itemgetter
+from typing import Iterable, Iterator, Tuple
+
+from algorithms import mergesort
+from data_structures import ArrayList, ArrayR, LoserTree
+from restaurants import FoodFlight, MenuItem, Restaurant, restaurant_name_key
+
+# (restaurant name, block number, item name, rating)
+FeedRecord = Tuple[str, int, str, float]
+
+FEED_COLUMNS = ("restaurant", "block", "item", "rating")
+DEFAULT_CHUNK_SIZE = 10000
+
+record_restaurant_key = itemgetter(0)
+
+
+class ImportStats:
+    """
+    Counters of a feed import, and its throughput.
+    """
+
+    def __init__(self) -> None:
+        self.records = 0
+        self.restaurants_added = 0
+        self.menus_extended = 0
+        self.chunks = 0
+        self.seconds = 0.0
+
+    @property
+    def records_per_second(self) -> float:
+        """
+        :complexity: O(1)
+        """
+        if self.seconds == 0:
+            return 0.0
+        return self.records / self.seconds
+
+    def __str__(self) -> str:
+        return (
+            f"ImportStats <{self.records} records in {self.chunks} chunks, "
+            f"{self.restaurants_added} restaurants added, {self.menus_extended} menus extended, "
+            f"{self.seconds:.3f}s, {self.records_per_second:.0f} records/s>"
+        )
+
+
+def parse_rating(rating: str) -> float:
+    """
+    Parse a rating from text, keeping whole ratings as ints.
+    :complexity: O(L) where L is the length of the text.
+    """
+    try:
+        return int(rating)
+    except ValueError:
+        return float(rating)
+
+
+def read_csv_records(path: str) -> Iterator[FeedRecord]:
+    """
+    Yield the records of a CSV feed, one row at a time. Columns may be in any order.
+    :raises ValueError: if a column is missing from the header or a row is malformed.
+    :complexity: O(L) per record, where L is the length of its row.
+    """
+    with open(path, newline="", encoding="utf-8") as file:
+        reader = csv.reader(file)
+        header = next(reader, None)
+        if header is None:
+            return
+        positions = ArrayR(len(FEED_COLUMNS))
+        for i in range(len(FEED_COLUMNS)):
+            if FEED_COLUMNS[i] not in header:
+                raise ValueError(f"{path}: missing column {FEED_COLUMNS[i]!r}")
+            positions[i] = header.index(FEED_COLUMNS[i])
+
+        for row in reader:
+            if not row:
+                continue
+            try:
+                yield (
+                    row[positions[0]],
+                    int(row[positions[1]]),
+                    row[positions[2]],
+                    parse_rating(row[positions[3]]),
+                )
+            except (IndexError, ValueError) as e:
+                raise ValueError(f"{path}:{reader.line_num}: malformed record: {e}") from e
+
+
+def read_jsonl_records(path: str) -> Iterator[FeedRecord]:
+    """
+    Yield the records of a JSON-lines feed, one line at a time. Blank lines are skipped.
+    :raises ValueError: if a line is not a JSON object with every feed field.
+    :complexity: O(L) per record, where L is the length of its line.
+    """
+    with open(path, encoding="utf-8") as file:
+        for line_number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                yield (
+                    record["restaurant"],
+                    int(record["block"]),
+                    record["item"],
+                    record["rating"],
+                )
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"{path}:{line_number}: malformed record: {e}") from e
+
+
+def read_feed_records(path: str) -> Iterator[FeedRecord]:
+    """
+    Yield the records of a feed, picking the parser from the file extension (.csv, or .jsonl/.ndjson/.json).
+    :raises ValueError: if the extension is not recognised.
+    """
+    lower = path.lower()
+    if lower.endswith(".csv"):
+        return read_csv_records(path)
+    if lower.endswith((".jsonl", ".ndjson", ".json")):
+        return read_jsonl_records(path)
+    raise ValueError(f"{path}: unknown feed format")
+
+
+def import_records(ff: FoodFlight, records: Iterable[FeedRecord], chunk_size: int = DEFAULT_CHUNK_SIZE) -> ImportStats:
+    """
+    Import `records` into `ff`, at most `chunk_size` records at a time.
+    The block number of a restaurant is taken from its first record, when the restaurant is new.
+    :raises ValueError: if chunk_size is not positive.
+    :complexity: O(N log C * M + G log(N / C) * M + T log T * M + R * M) plus the menu updates, where N is the number
+        of records, C the chunk size, M the length of the longest restaurant name, G the number of groups of new
+        restaurants over all chunks, T the number of new restaurants and R the number of restaurants registered before.
+        See _flush_chunk and _register_new_restaurants.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+
+    stats = ImportStats()
+    start = time.perf_counter()
+    chunk = ArrayR(chunk_size)
+    # One name-sorted run of new restaurants per chunk.
+    new_runs = ArrayList()
+    count = 0
+    for record in records:
+        chunk[count] = record
+        count += 1
+        if count == chunk_size:
+            _flush_chunk(ff, chunk, count, new_runs, stats)
+            count = 0
+    if count > 0:
+        _flush_chunk(ff, chunk, count, new_runs, stats)
+    if len(new_runs) > 0:
+        _register_new_restaurants(ff, new_runs, stats)
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def import_catalog(ff: FoodFlight, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> ImportStats:
+    """
+    Stream the feed at `path` into `ff`. See read_feed_records and import_records.
+    """
+    return import_records(ff, read_feed_records(path), chunk_size)
+
+
+def _flush_chunk(ff: FoodFlight, chunk: ArrayR[FeedRecord], count: int, new_runs: ArrayList[ArrayR[Restaurant]],
+                 stats: ImportStats) -> None:
+    """
+    Group the first `count` records of `chunk` by restaurant. Each group of a known restaurant is added to its
+    menu in one call, and the groups of restaurants new to `ff` are appended to `new_runs` as one run of
+    new restaurants, in name order. The chunk is cleared so that it does not keep the records alive.
+    :complexity: O(C log C * M + G log R * M) plus the menu updates, where C is count, M the length of the longest
+        restaurant name, G the number of groups and R the number of registered restaurants.
+    """
+    records = ArrayR(count)
+    for i in range(count):
+        records[i] = chunk[i]
+        chunk[i] = None
+    records = mergesort(records, key=record_restaurant_key)
+
+    new_restaurants = ArrayR(count)
+    new_count = 0
+    start = 0
+    while start < count:
+        name, block_number = records[start][0], records[start][1]
+        end = start + 1
+        while end < count and records[end][0] == name:
+            end += 1
+
+        items = ArrayR(end - start)
+        for i in range(start, end):
+            items[i - start] = MenuItem(records[i][2], records[i][3])
+
+        if name in ff.restaurants:
+            ff.add_to_menu(name, items)
+            stats.menus_extended += 1
+        else:
+            new_restaurants[new_count] = Restaurant(name, block_number, items)
+            new_count += 1
+        start = end
+
+    if new_count > 0:
+        run = ArrayR(new_count)
+        for i in range(new_count):
+            run[i] = new_restaurants[i]
+        new_runs.append(run)
+    stats.records += count
+    stats.chunks += 1
+
+
+def _register_new_restaurants(ff: FoodFlight, new_runs: ArrayList[ArrayR[Restaurant]], stats: ImportStats) -> None:
+    """
+    Merge the runs of new restaurants by name with a loser tree, and register them all through one bulk_load.
+    A restaurant with groups in several chunks appears once per chunk; the menus of its later appearances are added
+    to the first one, which keeps the block number of its first record, as the merge is stable.
+    :complexity: O(G log K * M + T log T * M + R * M) plus the menu updates, where G is the number of restaurants over
+        all runs, K the number of runs, M the length of the longest restaurant name, T the number of distinct new
+        restaurants and R the number of registered restaurants. See FoodFlight.bulk_load.
+    """
+    runs = ArrayR(len(new_runs))
+    total = 0
+    for i in range(len(new_runs)):
+        runs[i] = new_runs[i]
+        total += len(runs[i])
+
+    merged = ArrayR(total)
+    count = 0
+    for restaurant in LoserTree(runs, key=restaurant_name_key):
+        if count > 0 and merged[count - 1].name == restaurant.name:
+            merged[count - 1].add_menu_items(restaurant.menu)
+            stats.menus_extended += 1
+        else:
+            merged[count] = restaurant
+            count += 1
+
+    restaurants = ArrayR(count)
+    for i in range(count):
+        restaurants[i] = merged[i]
+    # The names are in order, which would degenerate the tree through add_restaurant.
+    ff.bulk_load(restaurants)
+    stats.restaurants_added += count
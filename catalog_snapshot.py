@@ -0,0 +1,311 @@
+"""
+Compact binary snapshots of a FoodFlight catalog.
+
+A snapshot is one flat little-endian file:
+
+    header          magic, string count, restaurant count, item count, FoodFlight options
+    restaurants     (name id, block number, first item, item count, has location, x, y), sorted by name
+    items           (name id, rating is int, rating), each menu already sorted
+    string offsets  string count + 1 offsets into the string blob
+    string blob     UTF-8 encoded names, each distinct name stored once, in sorted order
+
+Loading memory-maps the file and rebuilds the restaurant tree balanced from the
+sorted restaurant table, without sorting anything. Menus are only materialized
+into MenuItems the first time they are accessed, so cold start is bound by I/O.
+The file stays mapped until every menu has been read, or until the snapshot is closed:
+
+    with CatalogSnapshot(path) as snapshot:
+        ff = snapshot.load()
+"""
+from __future__ import annotations
+
+import mmap
+import struct
+import threading
+
+from algorithms import mergesort
+from data_structures import ArrayR, LinearProbeTable
+from restaurants import FoodFlight, MenuItem, Restaurant
+
+MAGIC = b"FFSNAP03"
+HEADER = struct.Struct("<8sQQQQ")
+# Bits of the options field of the header, recording how the saved FoodFlight was constructed.
+COPY_ON_WRITE = 1
+BALANCED = 2
+RESTAURANT_RECORD = struct.Struct("<IqQI?dd")
+ITEM_RECORD = struct.Struct("<I?d")
+STRING_OFFSET = struct.Struct("<Q")
+STRING_SPAN = struct.Struct("<QQ")
+
+# Serialises the first read of snapshot menus, so that concurrent readers load each menu once.
+_LOAD_LOCK = threading.Lock()
+
+
+class CatalogSnapshot:
+    """
+    A memory-mapped snapshot file, decoding records on demand.
+    The file is unmapped by close(), or as soon as the menu of every restaurant built from it has been read.
+    Unless stated otherwise, all methods have O(1) complexity.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Map the snapshot at `path` into memory and read its header.
+        :raises ValueError: if the file is not a FoodFlight snapshot.
+        """
+        with open(path, "rb") as file:
+            self.__map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.string_count, self.restaurant_count, self.item_count, options = HEADER.unpack_from(self.__map, 0)
+        if magic != MAGIC:
+            self.__map.close()
+            raise ValueError(f"{path} is not a FoodFlight snapshot")
+        self.copy_on_write = bool(options & COPY_ON_WRITE)
+        self.balanced = bool(options & BALANCED)
+
+        self.__restaurants_offset = HEADER.size
+        self.__items_offset = self.__restaurants_offset + self.restaurant_count * RESTAURANT_RECORD.size
+        self.__strings_offset = self.__items_offset + self.item_count * ITEM_RECORD.size
+        self.__blob_offset = self.__strings_offset + (self.string_count + 1) * STRING_OFFSET.size
+        # Decoded strings, so that a name shared by many items is decoded (and stored) once.
+        self.__strings = ArrayR(self.string_count)
+        # Restaurants built so far, by index, and the number of menus not read yet, built or not.
+        self.__restaurants = ArrayR(self.restaurant_count)
+        self.__unread_menus = self.restaurant_count
+
+    def __enter__(self) -> CatalogSnapshot:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def closed(self) -> bool:
+        return self.__map is None
+
+    def close(self) -> None:
+        """
+        Read every menu still on disk into its restaurant, so that restaurants built from the snapshot stay usable,
+        then unmap the file. Closing a closed snapshot does nothing.
+        :complexity: O(n * L) where n is the number of items on unread menus and L the length of the longest item name.
+        """
+        for i in range(self.restaurant_count):
+            if self.__restaurants[i] is not None:
+                self.__restaurants[i].menu
+        with _LOAD_LOCK:
+            self.__unmap()
+
+    def __unmap(self) -> None:
+        if self.__map is not None:
+            self.__map.close()
+            self.__map = None
+
+    def string(self, string_id: int) -> str:
+        """
+        Decode a string of the string table.
+        :complexity: O(L) where L is the length of the string, the first time it is decoded. O(1) afterwards.
+        """
+        string = self.__strings[string_id]
+        if string is None:
+            start, end = STRING_SPAN.unpack_from(self.__map, self.__strings_offset + string_id * STRING_OFFSET.size)
+            string = self.__map[self.__blob_offset + start:self.__blob_offset + end].decode("utf-8")
+            self.__strings[string_id] = string
+        return string
+
+    def restaurant(self, index: int) -> SnapshotRestaurant:
+        """
+        Build the restaurant at `index` of the (name sorted) restaurant table, with its menu left on disk.
+        Later calls return the same restaurant.
+        :raises ValueError: if the snapshot is closed.
+        :complexity: O(L) where L is the length of the restaurant's name.
+        """
+        if self.__restaurants[index] is not None:
+            return self.__restaurants[index]
+        if self.__map is None:
+            raise ValueError("The snapshot is closed")
+
+        name_id, block_number, first_item, item_count, has_location, x, y = RESTAURANT_RECORD.unpack_from(
+            self.__map, self.__restaurants_offset + index * RESTAURANT_RECORD.size
+        )
+        location = (x, y) if has_location else None
+        restaurant = SnapshotRestaurant(self.string(name_id), block_number, self, first_item, item_count, location)
+        self.__restaurants[index] = restaurant
+        return restaurant
+
+    def load(self) -> FoodFlight:
+        """
+        Build a FoodFlight over every restaurant of the snapshot, with the copy_on_write and balanced options
+        of the FoodFlight it was saved from. The restaurant tree is built balanced and no menu is read until it is accessed.
+        :raises ValueError: if the snapshot is closed.
+        :complexity: O(T * L) where T is the number of restaurants and L the length of the longest restaurant name.
+        """
+        if self.__map is None:
+            raise ValueError("The snapshot is closed")
+
+        restaurants = ArrayR(self.restaurant_count)
+        for i in range(self.restaurant_count):
+            restaurant = self.restaurant(i)
+            restaurants[i] = (restaurant.name, restaurant)
+
+        ff = FoodFlight(copy_on_write=self.copy_on_write, balanced=self.balanced)
+        ff.restaurants.load_sorted(restaurants, len(restaurants))
+        return ff
+
+    def menu(self, first_item: int, item_count: int) -> ArrayR[MenuItem]:
+        """
+        Materialize `item_count` items, starting at `first_item`, into a (sorted) menu, for the restaurant
+        whose menu they are. Called once per restaurant, under _LOAD_LOCK. The file is unmapped once
+        every menu has been read.
+        :raises ValueError: if the snapshot is closed.
+        :complexity: O(n * L) where n is item_count and L is the length of the longest item name.
+        """
+        if self.__map is None:
+            raise ValueError("The snapshot is closed")
+
+        menu = ArrayR(item_count)
+        offset = self.__items_offset + first_item * ITEM_RECORD.size
+        for i in range(item_count):
+            name_id, is_int, rating = ITEM_RECORD.unpack_from(self.__map, offset)
+            menu[i] = MenuItem(self.string(name_id), int(rating) if is_int else rating)
+            offset += ITEM_RECORD.size
+
+        self.__unread_menus -= 1
+        if self.__unread_menus == 0:
+            self.__unmap()
+        return menu
+
+
+class SnapshotRestaurant(Restaurant):
+    """
+    A restaurant loaded from a snapshot. Its menu is read from the snapshot on first access;
+    assigning a menu replaces it for good.
+    """
+
+    def __init__(self, name: str, block_number: int, snapshot: CatalogSnapshot, first_item: int, item_count: int,
+                 location: tuple[float, float] | None = None) -> None:
+        """
+        :complexity: O(1)
+        """
+        super().__init__(name, block_number, ArrayR(0), location=location)
+        self.__snapshot = snapshot
+        self.__first_item = first_item
+        self.__item_count = item_count
+
+    @property
+    def menu(self) -> ArrayR[MenuItem]:
+        """
+        :complexity: O(n * L) on first access, where n is the number of items and L the length of the
+            longest item name. Otherwise as Restaurant.menu.
+        """
+        if self.__snapshot is not None:
+            with _LOAD_LOCK:
+                if self.__snapshot is not None:
+                    self.menu = self.__snapshot.menu(self.__first_item, self.__item_count)
+        return Restaurant.menu.fget(self)
+
+    @menu.setter
+    def menu(self, menu: ArrayR[MenuItem]) -> None:
+        Restaurant.menu.fset(self, menu)
+        self.__snapshot = None
+
+
+class NameTable(LinearProbeTable[None]):
+    """
+    A LinearProbeTable of names, hashed with Python's own string hash. It is computed once per string and cached,
+    where LinearProbeTable.hash walks every character of the key on each lookup.
+    """
+
+    def hash(self, key: str) -> int:
+        """
+        :complexity: O(L) where L is len(key) the first time key is hashed, O(1) afterwards.
+        """
+        return hash(key) % self.table_size
+
+
+def string_id(strings: ArrayR[str], name: str) -> int:
+    """
+    Return the id of `name` in the sorted string table `strings`, that is its position, by binary search.
+    :raises KeyError: if name is not in the table.
+    :complexity: O(log D * L) where D is len(strings) and L the length of the longest name.
+    """
+    low = 0
+    high = len(strings)
+    while low < high:
+        mid = (low + high) // 2
+        if strings[mid] < name:
+            low = mid + 1
+        else:
+            high = mid
+    if low == len(strings) or strings[low] != name:
+        raise KeyError(name)
+    return low
+
+
+def save_catalog(ff: FoodFlight, path: str) -> None:
+    """
+    Write every restaurant of `ff`, with its sorted menu, to a snapshot at `path`, along with its copy_on_write
+    and balanced options.
+    :complexity: O((T + n) * log D * L + D log D * L) where T is the number of restaurants, n the total number of
+        menu items, D the number of distinct names and L the length of the longest name, for collecting the distinct
+        names in a hash table, sorting them into the string table and looking up the id of every name there,
+        plus the sorting of any lazily sorted menus.
+    """
+    restaurants = ff.restaurants.values()
+    item_count = 0
+    for i in range(len(restaurants)):
+        restaurants[i].sort_menu()
+        item_count += len(restaurants[i].menu)
+
+    # Distinct names are collected in a table, so that only they are sorted into the string table,
+    # rather than every occurrence of a name shared by many menus. Restaurant names are distinct already.
+    names = NameTable()
+    for i in range(len(restaurants)):
+        names[restaurants[i].name] = None
+        menu = restaurants[i].menu
+        for j in range(len(menu)):
+            if menu[j].name not in names:
+                names[menu[j].name] = None
+    strings = mergesort(names.keys())
+    distinct = len(strings)
+
+    with open(path, "wb") as file:
+        file.write(b"\0" * HEADER.size)
+
+        first_item = 0
+        for i in range(len(restaurants)):
+            restaurant = restaurants[i]
+            x, y = restaurant.location if restaurant.location is not None else (0.0, 0.0)
+            file.write(RESTAURANT_RECORD.pack(
+                string_id(strings, restaurant.name), restaurant.block_number, first_item, len(restaurant.menu),
+                restaurant.location is not None, x, y
+            ))
+            first_item += len(restaurant.menu)
+
+        for i in range(len(restaurants)):
+            menu = restaurants[i].menu
+            for j in range(len(menu)):
+                rating = menu[j].rating
+                file.write(ITEM_RECORD.pack(string_id(strings, menu[j].name), isinstance(rating, int), rating))
+
+        encoded = ArrayR(distinct)
+        offset = 0
+        file.write(STRING_OFFSET.pack(offset))
+        for i in range(distinct):
+            encoded[i] = strings[i].encode("utf-8")
+            offset += len(encoded[i])
+            file.write(STRING_OFFSET.pack(offset))
+        for i in range(distinct):
+            file.write(encoded[i])
+
+        file.seek(0)
+        options = (COPY_ON_WRITE if ff.copy_on_write else 0) | (BALANCED if ff.balanced else 0)
+        file.write(HEADER.pack(MAGIC, distinct, len(restaurants), item_count, options))
+
+
+def load_catalog(path: str) -> FoodFlight:
+    """
+    Load a FoodFlight from the snapshot at `path`, as CatalogSnapshot(path).load().
+    The file stays mapped until every menu has been read; open a CatalogSnapshot to close it earlier.
+    :complexity: O(T * L) where T is the number of restaurants and L the length of the longest restaurant name.
+    """
+    return CatalogSnapshot(path).load()
@@ -1,10 +1,14 @@
 from .array_list import ArrayList, List
 from .array_max_heap import ArrayMaxHeap
+from .array_min_heap import ArrayMinHeap
+from .avl_tree import AVLNode, AVLTree
 from .binary_search_tree import BinarySearchTree
 from .hash_table_double_hashing import DoubleHashingTable
 from .hash_table_linear_probing import LinearProbeTable
 from .hash_table_quadratic_probing import QuadraticProbeTable
 from .hash_table_separate_chaining import HashTableSeparateChaining
+from .kd_tree import KDNode, KDTree
 from .linked_list import LinkedList
+from .loser_tree import LoserTree
 from .node import BinaryNode, Node
 from .referential_array import ArrayR
\ No newline at end of file
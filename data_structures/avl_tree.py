@@ -0,0 +1,118 @@
+""" AVL Tree ADT.
+    Defines a self-balancing Binary Search Tree: the heights of the two subtrees of every node
+    differ by at most one, which keeps the height of the tree below 1.45 log2(N + 2).
+    Every insertion and deletion restores that invariant with at most O(log N) rotations
+    on the way back up from the changed node.
+"""
+
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+from data_structures.binary_search_tree import BinarySearchTree, K, V, node_height, update_height
+from data_structures.node import BinaryNode
+
+
+class AVLNode(BinaryNode[K, V]):
+    """ Binary node of an AVL tree, shown with the height of its subtree. """
+
+    def __str__(self) -> str:
+        return f"AVLNode({self.item}, {self.key}, {self.height}, {'...' if self.left else 'None'}, {'...' if self.right else 'None'})"
+
+
+def rotate_right(node: AVLNode[K, V]) -> AVLNode[K, V]:
+    """ Rotate the subtree of `node` right, returning its new root (the former left child). """
+    root = node.left
+    node.left = root.right
+    root.right = node
+    update_height(node)
+    update_height(root)
+    return root
+
+
+def rotate_left(node: AVLNode[K, V]) -> AVLNode[K, V]:
+    """ Rotate the subtree of `node` left, returning its new root (the former right child). """
+    root = node.right
+    node.right = root.left
+    root.left = node
+    update_height(node)
+    update_height(root)
+    return root
+
+
+def rebalance_node(node: AVLNode[K, V]) -> AVLNode[K, V]:
+    """ Restore the AVL invariant at `node`, whose children are balanced and differ in height
+        by at most two, returning the new root of its subtree.
+        :complexity: O(1)
+    """
+    update_height(node)
+    balance = node_height(node.left) - node_height(node.right)
+    if balance > 1:
+        if node_height(node.left.left) < node_height(node.left.right):
+            node.left = rotate_left(node.left)
+        return rotate_right(node)
+    if balance < -1:
+        if node_height(node.right.right) < node_height(node.right.left):
+            node.right = rotate_right(node.right)
+        return rotate_left(node)
+    return node
+
+
+class AVLTree(BinarySearchTree[K, V]):
+    """ Self-balancing binary search tree.
+        Lookups and iteration are those of BinarySearchTree, on a tree of height O(log N).
+    """
+
+    def __setitem__(self, key: K, item: V) -> None:
+        """
+            Insert `item` at `key`, replacing the item already there, if any.
+            :complexity: O(CompK * log N) where N is the number of nodes in the tree
+                and CompK is the complexity of comparing the keys.
+        """
+        def insert_aux(current: AVLNode[K, V] | None) -> AVLNode[K, V]:
+            if current is None:
+                self.__length += 1
+                return AVLNode(item, key, 1)
+            if key < current.key:
+                current.left = insert_aux(current.left)
+            elif key > current.key:
+                current.right = insert_aux(current.right)
+            else:
+                current.item = item
+                return current
+            return rebalance_node(current)
+
+        self.__root = insert_aux(self.__root)
+
+    def __delitem__(self, key: K) -> None:
+        """
+            Remove `key` and its item from the tree.
+            :raises KeyError: if the key is not in the tree.
+            :complexity: O(CompK * log N) where N is the number of nodes in the tree
+                and CompK is the complexity of comparing the keys.
+        """
+        def delete_aux(current: AVLNode[K, V] | None, key: K) -> AVLNode[K, V] | None:
+            if current is None:
+                raise KeyError('Deleting non-existent item')
+            if key < current.key:
+                current.left = delete_aux(current.left, key)
+            elif key > current.key:
+                current.right = delete_aux(current.right, key)
+            elif current.left is None or current.right is None:
+                self.__length -= 1
+                return current.left if current.left is not None else current.right
+            else:
+                successor = self.__get_successor(current)
+                current.key = successor.key
+                current.item = successor.item
+                current.right = delete_aux(current.right, successor.key)
+            return rebalance_node(current)
+
+        self.__root = delete_aux(self.__root, key)
+
+    def height(self) -> int:
+        """
+            Height of the tree, 0 when empty.
+            :complexity: O(1)
+        """
+        return node_height(self.__root)
@@ -13,7 +13,7 @@ from typing import Tuple
 from data_structures.abstract_binary_search_tree import AbstractBinarySearchTree, K, V
 from data_structures.abstract_hash_table import HashTable
 from data_structures.linked_stack import LinkedStack
-from data_structures.node import BinaryNode, Generic
+from data_structures.node import BinaryNode, Generic, path_push
 from data_structures.referential_array import ArrayR
 
 
@@ -111,8 +111,29 @@ class BSTPostOrderIterator(Generic[K,V]):
                     self.__stack.push((current.left, False))
 
 
+def node_size(node: BinaryNode[K, V] | None) -> int:
+    """ Number of nodes in the subtree of `node`, 0 for an empty one. """
+    return 0 if node is None else node.size
+
+
+def node_height(node: BinaryNode[K, V] | None) -> int:
+    """ Height of the subtree of `node`, 0 for an empty one. """
+    return 0 if node is None else node.height
+
+
+def update_height(node: BinaryNode[K, V]) -> None:
+    """ Recompute the height and the size of `node` from those of its children. """
+    left_height = node_height(node.left)
+    right_height = node_height(node.right)
+    node.height = 1 + (left_height if left_height > right_height else right_height)
+    node.size = 1 + node_size(node.left) + node_size(node.right)
+
+
 class BinarySearchTree(AbstractBinarySearchTree[K,V]):
-    """ Basic binary search tree. """
+    """ Basic binary search tree.
+        Every node stores the number of nodes in its subtree (itself included) in its size,
+        and the number of nodes on the longest path down from it in its height.
+    """
 
     def __init__(self) -> None:
         """
@@ -129,25 +150,50 @@ class BinarySearchTree(AbstractBinarySearchTree[K,V]):
             Creates a binary search tree object from binary node.
             Useful if a bottom up construction of the tree can be done efficiently.
             Length argument is not checked if passed in.
+            The nodes must already store the sizes and heights of their subtrees, which are not checked either.
             :Complexity Analysis:
             ... :best: O(1) when length and search invariant are not checked.
                 :worst: O(N) where N is the number of nodes in the tree
         """
 
         def len_aux(current: BinaryNode | None) -> int:
-            if current is None:
-                return 0
-            return 1 + len_aux(current.left) + len_aux(current.right)
-
-        def check_bst_invariant(node: BinaryNode | None, l=None, r=None) -> bool:
-            if node is None:
-                return True
-            if not l is None:
-                if node.key < l: return False
-            if not r is None:
-                if node.key > r: return False
-            return (check_bst_invariant(node.left, l, node.key) and
-                    check_bst_invariant(node.right, node.key, r))
+            count = 0
+            stack = LinkedStack()
+            if current is not None:
+                stack.push(current)
+            while not stack.is_empty():
+                current = stack.pop()
+                count += 1
+                if current.left is not None:
+                    stack.push(current.left)
+                if current.right is not None:
+                    stack.push(current.right)
+            return count
+
+        def check_bst_invariant(node: BinaryNode | None) -> bool:
+            # Nodes left to check, with the bounds on their keys on parallel stacks, None bounds being unbounded.
+            nodes = LinkedStack()
+            lows = LinkedStack()
+            highs = LinkedStack()
+            if node is not None:
+                nodes.push(node)
+                lows.push(None)
+                highs.push(None)
+            while not nodes.is_empty():
+                node, l, r = nodes.pop(), lows.pop(), highs.pop()
+                if l is not None and node.key < l:
+                    return False
+                if r is not None and node.key > r:
+                    return False
+                if node.left is not None:
+                    nodes.push(node.left)
+                    lows.push(l)
+                    highs.push(node.key)
+                if node.right is not None:
+                    nodes.push(node.right)
+                    lows.push(node.key)
+                    highs.push(r)
+            return True
 
         if not isinstance(node, (BinaryNode, type(None))):
             raise TypeError(f"Cannot instantiate binary tree with node type: {type(node)}")
@@ -204,6 +250,14 @@ class BinarySearchTree(AbstractBinarySearchTree[K,V]):
             current = current.right
         return current
 
+    def update_node(self, node: BinaryNode[K, V]) -> None:
+        """
+            Recompute what `node` stores about its subtree from its children: its size and height.
+            Called on every node whose subtree changed, children first, so subclasses storing more can extend it.
+            :complexity: O(1)
+        """
+        update_height(node)
+
     def is_leaf(self, current: BinaryNode[K, V]) -> bool:
         """ Simple check whether or not the node is a leaf. """
         return current.left is None and current.right is None
@@ -245,96 +299,161 @@ class BinarySearchTree(AbstractBinarySearchTree[K,V]):
         return BSTPreOrderIterator(self.__root)
 
     def __delitem__(self, key: K) -> None:
-        def delete_aux(current: BinaryNode[K, V], key: K) -> BinaryNode[K, V]:
-            """
-                Attempts to delete an item from the tree, it uses the Key to
-                determine the node to delete.
-            """
-
-            if current is None:  # key not found
-                raise KeyError('Deleting non-existent item')
-            elif key < current.key:
-                current.left = delete_aux(current.left, key)
+        """
+            Attempts to delete an item from the tree, it uses the Key to
+            determine the node to delete. A node with two children takes the key and item
+            of its successor, which is unlinked instead.
+            Walks down the tree iteratively, so the depth of the tree is not bound by the recursion limit.
+            :complexity best: O(CompK) deletes the root when it has at most one child.
+            :complexity worst: O(CompK * D) where D is the depth of the tree
+            CompK is the complexity of comparing the keys
+            :raises KeyError: when the key is not in the tree.
+        """
+        path = None
+        current = self.__root
+        while current is not None:
+            if key < current.key:
+                path = path_push(path, current)
+                current = current.left
             elif key > current.key:
-                current.right = delete_aux(current.right, key)
-            else:  # we found our key => do actual deletion
-                if self.is_leaf(current):
-                    self.__length -= 1
-                    return None
-                elif current.left is None:
-                    self.__length -= 1
-                    return current.right
-                elif current.right is None:
-                    self.__length -= 1
-                    return current.left
-
-                # general case => find a successor
-                successor = self.__get_successor(current)
-                current.key = successor.key
-                current.item = successor.item
-                current.right = delete_aux(current.right, successor.key)
-
-            return current
-
-        self.__root = delete_aux(self.__root, key)
+                path = path_push(path, current)
+                current = current.right
+            else:
+                break
+        if current is None:  # key not found
+            raise KeyError('Deleting non-existent item')
+
+        if current.left is not None and current.right is not None:
+            # general case => take the successor's place, and unlink the successor (which has no left child)
+            path = path_push(path, current)
+            successor_parent = current
+            successor = current.right
+            while successor.left is not None:
+                successor_parent = successor
+                path = path_push(path, successor)
+                successor = successor.left
+            current.key = successor.key
+            current.item = successor.item
+            if successor_parent is current:
+                successor_parent.right = successor.right
+            else:
+                successor_parent.left = successor.right
+        else:
+            child = current.left if current.left is not None else current.right
+            parent = path.item if path is not None else None
+            if parent is None:
+                self.__root = child
+            elif parent.left is current:
+                parent.left = child
+            else:
+                parent.right = child
+
+        # The nodes above the unlinked one, bottom up, have lost a node.
+        update_node = self.update_node
+        while path is not None:
+            ancestor, path = path.item, path.link
+            update_node(ancestor)
+        self.__length -= 1
 
     def __getitem__(self, key: K) -> V:
         """
-            Attempts to get an item in the tree, it uses the Key to attempt to find it
+            Attempts to get an item in the tree, it uses the Key to attempt to find it.
+            Walks down the tree iteratively, so the depth of the tree is not bound by the recursion limit.
             :complexity best: O(CompK) finds the item in the root of the tree
             :complexity worst: O(CompK * D) item is not found, where D is the depth of the tree
             CompK is the complexity of comparing the keys
+            :raises KeyError: when the key is not in the tree.
         """
-
-        def get_tree_node_by_key(current: BinaryNode[K, V], key: K) -> BinaryNode[K, V]:
-            if current is None:  # base case: empty
-                raise KeyError(f'Key not found: {key}')
-            elif key == current.key:  # base case: found
-                return current
+        current = self.__root
+        while current is not None:
+            if key == current.key:
+                return current.item
             elif key < current.key:
-                return get_tree_node_by_key(current.left, key)
+                current = current.left
             else:  # key > current.key
-                return get_tree_node_by_key(current.right, key)
-
-        return get_tree_node_by_key(self.__root, key).item
+                current = current.right
+        raise KeyError(f'Key not found: {key}')
 
     def __setitem__(self, key: K, item: V) -> None:
-        def insert_aux(current: BinaryNode[K, V], key: K, item: V, current_depth: int) -> BinaryNode[K, V] | None:
-            """
-                Attempts to insert an item into the tree, it uses the Key to insert it
-                :Complexity Analysis:
+        """
+            Attempts to insert an item into the tree, it uses the Key to insert it.
+            A new key updates the size and height of every node on its path, bottom up.
+            Walks down the tree iteratively, so the depth of the tree is not bound by the recursion limit.
+            :Complexity Analysis:
             ...     :best: O(CompK) inserts the item at the root.
                     :worst: O(CompK * D) inserting at the bottom of the tree
                 where D is the depth of the tree
                 CompK is the complexity of comparing the keys
-            """
-            if current is None:  # base case: at the leaf
-                current = BinaryNode(item, key, current_depth)
-                self.__length += 1
-            elif key < current.key:
-                current.left = insert_aux(current.left, key, item, current_depth + 1)
+        """
+        path = None
+        current = self.__root
+        while current is not None:
+            if key < current.key:
+                path = path_push(path, current)
+                current = current.left
             elif key > current.key:
-                current.right = insert_aux(current.right, key, item, current_depth + 1)
+                path = path_push(path, current)
+                current = current.right
             else:  # key == current.key
                 current.item = item
-            return current
-
-        self.__root = insert_aux(self.__root, key, item, 0)
+                return
+
+        update_node = self.update_node
+        node = BinaryNode(item, key, 1)
+        update_node(node)
+        if path is None:
+            self.__root = node
+        elif key < path.item.key:
+            path.item.left = node
+        else:
+            path.item.right = node
+        while path is not None:
+            ancestor, path = path.item, path.link
+            update_node(ancestor)
+        self.__length += 1
 
     def __len__(self) -> int:
         """ Returns the number of nodes in the tree. """
         return self.__length
 
     def str(self, indent: int) -> str:
-        def str_aux(current: BinaryNode[K, V] | None, indent, depth) -> str:
-            prefix = "\n" + " " * indent * depth if indent > 0 else ""
-            if current is None:
-                return prefix[:-indent] + str(None)
-            return f"{prefix[:-indent]}({prefix}{current.key}, {prefix}{current.item}, {str_aux(current.left, indent, depth + 1)}, {str_aux(current.right, indent, depth + 1)}{prefix[:-indent]})"
-
+        """ Nested (key, item, left, right) representation of the tree, with each level on new lines
+            indented by `indent` more spaces when indent is positive.
+            :complexity: O(N) where N is the number of nodes in the tree.
+        """
         if self.__root is None:
             return f"<BinarySearchTree({self.__root})>"
-        tree_str = str_aux(self.__root, indent = indent, depth = 1)
+
+        # Stack of the pieces left to write, in reverse: strings, or nodes still to expand,
+        # whose depths are on a stack of their own.
+        pieces = ArrayR(4 * len(self) + 1)
+        count = 0
+        stack = LinkedStack()
+        depths = LinkedStack()
+        stack.push(self.__root)
+        depths.push(1)
+        while not stack.is_empty():
+            current = stack.pop()
+            if isinstance(current, str):
+                pieces[count] = current
+                count += 1
+                continue
+            depth = depths.pop()
+            prefix = "\n" + " " * indent * depth if indent > 0 else ""
+            if current is None:
+                pieces[count] = prefix[:-indent] + str(None)
+                count += 1
+                continue
+            pieces[count] = f"{prefix[:-indent]}({prefix}{current.key}, {prefix}{current.item}, "
+            count += 1
+            stack.push(f"{prefix[:-indent]})")
+            stack.push(current.right)
+            depths.push(depth + 1)
+            stack.push(", ")
+            stack.push(current.left)
+            depths.push(depth + 1)
+
+        tree_str = "".join(pieces[i] for i in range(count))
         return f"<BinarySearchTree{tree_str}>"
 
     def __str__(self) -> str:
@@ -0,0 +1,296 @@
+""" K-d Tree ADT.
+    Defines a 2-d tree of items placed at (x, y) points, supporting
+    insertion, deletion and queries for every item within a radius of a point.
+    Levels of the tree alternate between splitting on x and on y.
+    Like a scapegoat tree, it rebuilds any subtree which becomes too lopsided,
+    so that its depth stays O(log n) whatever order items are inserted and deleted in.
+"""
+
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+import math
+from typing import Generic, Iterator, Tuple, TypeVar
+
+from data_structures.linked_stack import LinkedStack
+from data_structures.node import path_push
+from data_structures.referential_array import ArrayR
+
+T = TypeVar('T')
+Point = Tuple[float, float]
+
+
+def _axis_key(point: Point, axis: int) -> Point:
+    """ The order of points on a level splitting on `axis`: by their coordinate on that axis, then on the other one.
+        Breaking ties on the other coordinate keeps points sharing a row or column of the grid balanced.
+    """
+    return (point[axis], point[1 - axis])
+
+
+def _sort_on_axis(entries: ArrayR[Tuple[Point, T]], axis: int) -> ArrayR[Tuple[Point, T]]:
+    """ Return a new array of the (point, item) entries, stably sorted by the _axis_key of their point.
+        A bottom-up mergesort, kept local so that data_structures does not depend on algorithms.
+        :complexity: O(n log n) where n is len(entries).
+    """
+    length = len(entries)
+    source = ArrayR(length)
+    for i in range(length):
+        source[i] = (_axis_key(entries[i][0], axis), entries[i])
+    target = ArrayR(length)
+    width = 1
+    while width < length:
+        for low in range(0, length, 2 * width):
+            mid = min(low + width, length)
+            high = min(low + 2 * width, length)
+            i, j = low, mid
+            for k in range(low, high):
+                # Ties are taken from the left run, which keeps the sort stable.
+                if j < high and (i == mid or source[j][0] < source[i][0]):
+                    target[k] = source[j]
+                    j += 1
+                else:
+                    target[k] = source[i]
+                    i += 1
+        source, target = target, source
+        width *= 2
+
+    for i in range(length):
+        source[i] = source[i][1]
+    return source
+
+
+class KDNode(Generic[T]):
+    """ Node of a k-d tree.
+        Items in the left subtree have a smaller _axis_key on the node's axis (coordinate on that axis,
+        then on the other one), items in the right subtree an equal or greater one.
+        `size` is the number of nodes in its subtree, itself included.
+    """
+
+    def __init__(self, point: Point, item: T, axis: int) -> None:
+        self.point = point
+        self.item = item
+        self.axis = axis
+        self.size = 1
+        self.left: KDNode[T] | None = None
+        self.right: KDNode[T] | None = None
+
+    def __str__(self) -> str:
+        return f"KDNode({self.point}, {self.item}, {self.axis}, {self.size})"
+
+
+class KDTree(Generic[T]):
+    """ 2-d tree of items keyed by their (x, y) point. Several items may share a point.
+
+        A subtree is rebuilt at its medians once an insertion lands deeper than log_(1/alpha) n,
+        starting from the lowest node on the way down with a child holding more than alpha of its nodes,
+        and the whole tree is rebuilt once deletions shrink it below alpha of its largest size since the last rebuild.
+
+        Unless stated otherwise, all methods have O(1) complexity.
+    """
+
+    def __init__(self, alpha: float = 2 / 3) -> None:
+        """
+            :raises ValueError: if alpha is not in [0.5, 1).
+        """
+        if not 0.5 <= alpha < 1:
+            raise ValueError("alpha must be in [0.5, 1)")
+        self.__alpha = alpha
+        self.__root: KDNode[T] | None = None
+        self.__length = 0
+        self.__max_length = 0
+
+    @classmethod
+    def build(cls, entries: ArrayR[Tuple[Point, T]], alpha: float = 2 / 3) -> KDTree[T]:
+        """ Build a balanced tree from (point, item) pairs, splitting every level at the median.
+            :complexity: O(n log^2 n) where n is len(entries), for sorting each level by its axis.
+        """
+        tree = cls(alpha)
+        tree.__root = cls.__build_aux(entries, 0)
+        tree.__length = len(entries)
+        tree.__max_length = len(entries)
+        return tree
+
+    @classmethod
+    def __build_aux(cls, entries: ArrayR[Tuple[Point, T]], axis: int) -> KDNode[T] | None:
+        if len(entries) == 0:
+            return None
+
+        entries = _sort_on_axis(entries, axis)
+        mid = len(entries) // 2
+        # Equal points must all be on the right, so move the split to the first of them.
+        while mid > 0 and entries[mid - 1][0] == entries[mid][0]:
+            mid -= 1
+
+        point, item = entries[mid]
+        node = KDNode(point, item, axis)
+        node.size = len(entries)
+        left = ArrayR(mid)
+        for i in range(mid):
+            left[i] = entries[i]
+        right = ArrayR(len(entries) - mid - 1)
+        for i in range(mid + 1, len(entries)):
+            right[i - mid - 1] = entries[i]
+        node.left = cls.__build_aux(left, 1 - axis)
+        node.right = cls.__build_aux(right, 1 - axis)
+        return node
+
+    def __len__(self) -> int:
+        return self.__length
+
+    def is_empty(self) -> bool:
+        return self.__length == 0
+
+    def insert(self, point: Point, item: T) -> None:
+        """ Add `item` at `point`.
+            :complexity: O(log n) amortised, where n is the size of the tree, plus the occasional rebuild of a subtree
+                of s nodes in O(s log^2 s), which is amortised over the O(s) insertions that unbalanced it.
+        """
+        if self.__root is None:
+            self.__root = KDNode(point, item, 0)
+            self.__length += 1
+            self.__max_length = max(self.__max_length, self.__length)
+            return
+
+        path = LinkedStack()
+        current = self.__root
+        while True:
+            path.push(current)
+            current.size += 1
+            if _axis_key(point, current.axis) < _axis_key(current.point, current.axis):
+                if current.left is None:
+                    current.left = KDNode(point, item, 1 - current.axis)
+                    break
+                current = current.left
+            else:
+                if current.right is None:
+                    current.right = KDNode(point, item, 1 - current.axis)
+                    break
+                current = current.right
+        self.__length += 1
+        self.__max_length = max(self.__max_length, self.__length)
+
+        if len(path) > math.log(self.__length, 1 / self.__alpha):
+            self.__rebuild_scapegoat(path)
+
+    def __rebuild_scapegoat(self, path: LinkedStack[KDNode[T]]) -> None:
+        """ Rebuild the lowest node on `path` (the ancestors of a new leaf, deepest on top) with a child
+            holding more than alpha of its nodes. One exists whenever the leaf is deeper than log_(1/alpha) n.
+            :complexity: O(D + s log^2 s) where D is len(path) and s the size of the rebuilt subtree.
+        """
+        child_size = 1
+        while len(path) > 0:
+            node = path.pop()
+            if child_size > self.__alpha * node.size:
+                self.__rebuild(node, path.peek() if len(path) > 0 else None)
+                return
+            child_size = node.size
+
+    def __rebuild(self, node: KDNode[T], parent: KDNode[T] | None) -> None:
+        """ Replace the subtree of `node`, a child of `parent` (None for the root), by a balanced one.
+            :complexity: O(s log^2 s) where s is the size of the subtree.
+        """
+        entries = ArrayR(node.size)
+        count = 0
+        stack = LinkedStack()
+        stack.push(node)
+        while len(stack) > 0:
+            current = stack.pop()
+            entries[count] = (current.point, current.item)
+            count += 1
+            if current.left is not None:
+                stack.push(current.left)
+            if current.right is not None:
+                stack.push(current.right)
+
+        rebuilt = self.__build_aux(entries, node.axis)
+        if parent is None:
+            self.__root = rebuilt
+        elif parent.left is node:
+            parent.left = rebuilt
+        else:
+            parent.right = rebuilt
+
+    def delete(self, point: Point, item: T) -> None:
+        """ Remove `item` (compared by identity) from `point`.
+            :raises KeyError: if the item is not at that point.
+            :complexity: O(log n * sqrt(n)) worst case, where n is the size of the tree, for finding replacement nodes.
+                O(log n) when the item is a leaf. Rebuilding the whole tree, once it has shrunk below alpha of its
+                largest size, is amortised over the deletions that shrank it.
+        """
+        self.__root = self.__delete_aux(self.__root, point, item)
+        self.__length -= 1
+        if self.__length < self.__alpha * self.__max_length:
+            if self.__root is not None:
+                self.__rebuild(self.__root, None)
+            self.__max_length = self.__length
+
+    def __delete_aux(self, node: KDNode[T] | None, point: Point, item: T) -> KDNode[T] | None:
+        if node is None:
+            raise KeyError(f"{item} is not at {point}")
+
+        if node.item is item and node.point == point:
+            if node.right is not None:
+                replacement = self.__min_node(node.right, node.axis)
+                node.point, node.item = replacement.point, replacement.item
+                node.right = self.__delete_aux(node.right, replacement.point, replacement.item)
+            elif node.left is not None:
+                # The smallest item of the left subtree takes this place; the rest of the
+                # left subtree is equal or greater on this axis, so it becomes the right one.
+                replacement = self.__min_node(node.left, node.axis)
+                node.point, node.item = replacement.point, replacement.item
+                node.right = self.__delete_aux(node.left, replacement.point, replacement.item)
+                node.left = None
+            else:
+                return None
+        elif _axis_key(point, node.axis) < _axis_key(node.point, node.axis):
+            node.left = self.__delete_aux(node.left, point, item)
+        else:
+            node.right = self.__delete_aux(node.right, point, item)
+        node.size -= 1
+        return node
+
+    def __min_node(self, node: KDNode[T], axis: int) -> KDNode[T]:
+        """ Return the node with the smallest _axis_key on `axis` in the subtree of `node`. """
+        if node.axis == axis:
+            if node.left is None:
+                return node
+            return self.__min_node(node.left, axis)
+
+        smallest = node
+        for child in (node.left, node.right):
+            if child is not None:
+                candidate = self.__min_node(child, axis)
+                if _axis_key(candidate.point, axis) < _axis_key(smallest.point, axis):
+                    smallest = candidate
+        return smallest
+
+    def within(self, center: Point, radius: float) -> Iterator[T]:
+        """ Yield every item at a point within (Euclidean) `radius` of `center`, in no particular order.
+            Subtrees lying entirely on the far side of a split line are skipped.
+            :complexity: O(sqrt(n) + R) worst case for a perfectly balanced tree, where n is its size and R the number
+                of items yielded. O(log n + R) when the circle crosses few split lines. Between rebuilds the tree is
+                only alpha-balanced, which keeps its depth O(log n) but loosens the exponent of the worst case.
+            :raises ValueError: if radius is negative.
+        """
+        if radius < 0:
+            raise ValueError(f"radius must not be negative, got {radius}")
+        cx, cy = center
+        limit = radius * radius
+        # A chain of linked nodes rather than a LinkedStack, as every node visited is pushed and popped.
+        stack = path_push(None, self.__root) if self.__root is not None else None
+        while stack is not None:
+            node, stack = stack.item, stack.link
+            x, y = node.point
+            if (x - cx) * (x - cx) + (y - cy) * (y - cy) <= limit:
+                yield node.item
+
+            offset = (cx if node.axis == 0 else cy) - (x if node.axis == 0 else y)
+            # The left subtree may hold points on the split line itself, as ties are broken on the other axis.
+            if node.left is not None and offset - radius <= 0:
+                stack = path_push(stack, node.left)
+            if node.right is not None and offset + radius >= 0:
+                stack = path_push(stack, node.right)
+
+    def __str__(self) -> str:
+        return f"KDTree({self.__length} items)"
@@ -0,0 +1,159 @@
+""" Loser Tree ADT.
+    Defines a tournament (loser) tree used for k-way merging of sorted runs.
+    Each internal node remembers the run that lost the match played there,
+    so producing the next item only replays the path from one leaf to the root.
+"""
+
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+from typing import Callable, Generic, TypeVar
+
+from data_structures.referential_array import ArrayR
+
+T = TypeVar('T')
+
+# Marks the head of a run which has no items left. It loses every match.
+_EXHAUSTED = object()
+
+
+class LoserTree(Generic[T]):
+    """ K-way merge of sorted runs using a tournament (loser) tree.
+
+        Every run must already be sorted in ascending order, either of the items
+        themselves or of `key(item)` when a key function is given.
+        Iterating over the tree yields all items of all runs in ascending order.
+        The key of an item is computed once, when it reaches the head of its run.
+        Items comparing equal are yielded in the order of the runs they come from,
+        which makes the merge stable.
+
+        Unless stated otherwise, all methods have O(1) complexity.
+    """
+
+    def __init__(self, runs: ArrayR[ArrayR[T]], key: Callable[[T], object] | None = None) -> None:
+        """
+            Build the tournament over the given runs.
+            :complexity: O(R * CompT) where R is the number of runs and
+                CompT is the complexity of comparing two items.
+        """
+        run_count = len(runs)
+        self.__runs = runs
+        self.__key = key
+        self.__run_count = run_count
+        self.__positions = ArrayR(run_count)
+        self.__heads = ArrayR(run_count)
+        # Slot 0 holds the overall winner, slots 1..R-1 the loser of each match.
+        self.__tree = ArrayR(max(run_count, 1))
+        self.__remaining = 0
+        self.__last_run = None
+
+        for i in range(run_count):
+            self.__positions[i] = 0
+            self.__remaining += len(runs[i])
+            if len(runs[i]) == 0:
+                self.__heads[i] = _EXHAUSTED
+            else:
+                self.__heads[i] = runs[i][0] if key is None else key(runs[i][0])
+
+        if run_count == 0:
+            self.__tree[0] = None
+            return
+
+        # Play the initial tournament bottom-up. Leaf i sits at position R + i.
+        winners = ArrayR(2 * run_count)
+        for i in range(run_count):
+            winners[run_count + i] = i
+        for node in range(run_count - 1, 0, -1):
+            left = winners[2 * node]
+            right = winners[2 * node + 1]
+            if self.__beats(right, left):
+                winners[node] = right
+                self.__tree[node] = left
+            else:
+                winners[node] = left
+                self.__tree[node] = right
+        self.__tree[0] = winners[1] if run_count > 1 else 0
+
+    def __beats(self, challenger: int, opponent: int) -> bool:
+        """
+            Whether the head of run `challenger` should be yielded before the head of run `opponent`.
+            Exhausted runs lose every match and ties are won by the run with the smaller index.
+            :complexity: O(CompT) where CompT is the complexity of comparing two items.
+        """
+        challenger_head = self.__heads[challenger]
+        opponent_head = self.__heads[opponent]
+        if challenger_head is _EXHAUSTED:
+            return False
+        if opponent_head is _EXHAUSTED:
+            return True
+        if challenger_head < opponent_head:
+            return True
+        return challenger < opponent and not opponent_head < challenger_head
+
+    def __iter__(self) -> LoserTree[T]:
+        """ Standard __iter__() method for iterators. Returns itself. """
+        return self
+
+    def __next__(self) -> T:
+        """ Returns the smallest item not yet yielded.
+            :raises StopIteration: when every run is exhausted.
+            :complexity: O(log R * CompT) where R is the number of runs and
+                CompT is the complexity of comparing two items.
+        """
+        if self.__remaining == 0:
+            raise StopIteration
+
+        tree = self.__tree
+        heads = self.__heads
+        winner = tree[0]
+
+        # Advance the winning run.
+        self.__last_run = winner
+        run = self.__runs[winner]
+        position = self.__positions[winner]
+        item = run[position]
+        position += 1
+        self.__positions[winner] = position
+        if position == len(run):
+            challenger_head = _EXHAUSTED
+        elif self.__key is None:
+            challenger_head = run[position]
+        else:
+            challenger_head = self.__key(run[position])
+        heads[winner] = challenger_head
+        self.__remaining -= 1
+
+        # Replay the matches on the path from the winner's leaf to the root.
+        challenger = winner
+        node = (winner + self.__run_count) // 2
+        while node > 0:
+            opponent = tree[node]
+            opponent_head = heads[opponent]
+            if opponent_head is not _EXHAUSTED and (
+                challenger_head is _EXHAUSTED
+                or opponent_head < challenger_head
+                or (opponent < challenger and not challenger_head < opponent_head)
+            ):
+                tree[node] = challenger
+                challenger = opponent
+                challenger_head = opponent_head
+            node //= 2
+        tree[0] = challenger
+
+        return item
+
+    @property
+    def last_run(self) -> int | None:
+        """ The index of the run the last yielded item came from, or None before the first item. """
+        return self.__last_run
+
+    def __len__(self) -> int:
+        """ Returns the number of items that are yet to be yielded. """
+        return self.__remaining
+
+    def __str__(self) -> str:
+        return f"<LoserTree(runs={self.__run_count}, remaining={self.__remaining})>"
+
+    def __repr__(self) -> str:
+        return str(self)
@@ -1,3 +1,4 @@
+from __future__ import annotations
 from typing import TypeVar, Generic
 T = TypeVar('T')
 K = TypeVar('K')
@@ -18,14 +19,27 @@ class Node(Generic[T]):
 class BinaryNode(Generic[K, T]):
     """ Simple binary node.
     Has two links two more nodes.
-    Has general attribute size which may store depth, number of nodes in subtree or any other metadata.
+    Has general attribute size which may store depth, number of nodes in subtree or any other metadata,
+    and height, the number of nodes on the longest path down from it (1 for a leaf), for trees which keep it.
     """
     def __init__(self, item: T = None, key: K = None, size: int = 0):
         self.item = item
         self.key = key if key is not None else item
         self.size = size
+        self.height = 1
         self.left: BinaryNode[K, T] | None = None
         self.right: BinaryNode[K, T] | None = None
 
     def __str__(self):
         return f"BinaryNode({self.item}, {self.key}, {self.size}, {'...' if self.left else 'None'}, {'...' if self.right else 'None'})"
+
+
+def path_push(path: Node[T] | None, item: T) -> Node[T]:
+    """ Return `path`, a chain of linked nodes from the top down (None when empty), with `item` pushed on top.
+    A light stack for the hot paths of tree walks, where each LinkedStack operation would pay for the
+    DunderProtected attribute lookups. Pop with `item, path = path.item, path.link`.
+    :complexity: O(1)
+    """
+    node = Node(item)
+    node.link = path
+    return node
@@ -1,15 +1,54 @@
-# You're welcome to use this decorator
-# See: https://www.geeksforgeeks.org/python/python-functools-total_ordering/
-from functools import total_ordering
+import asyncio
 import math
+import threading
+from operator import attrgetter
 
-from typing import Iterator
-from data_structures import ArrayR,ArrayMaxHeap
-from better_bst import BetterBinarySearchTree
-from algorithms import mergesort
+from typing import AsyncIterator, Iterator
+from data_structures import ArrayList, ArrayR, KDTree, LinearProbeTable, LoserTree
+from better_bst import AVLBetterBinarySearchTree, BetterBinarySearchTree
+from block_aggregates import BlockRatingTree, RatingSummary
+from algorithms import merge, mergesort
+
+# Key function over MenuItem.sort_key, for sorts and merges of menu items.
+menu_item_key = attrgetter("sort_key")
+# Key function over Restaurant.name, for sorts of restaurants.
+restaurant_name_key = attrgetter("name")
+# Serialises publishing a new menu state with staging items on any restaurant. Sorting itself happens outside it.
+_MENU_LOCK = threading.Lock()
+# The largest code point. Every name starting with a prefix p lies in [p, p + MAX_CHAR], except names continuing
+# with MAX_CHAR itself and then more characters; MAX_CHAR is a Unicode noncharacter, so no real name does.
+MAX_CHAR = chr(0x10FFFF)
+
+
+def check_limit(limit: int | None) -> None:
+    """
+        Check the `limit` on the number of results of a query, shared by every query taking one,
+        so that they all treat it alike: None for no limit, 0 for no results.
+
+        :raises ValueError: if limit is negative.
+        Complexity Analysis: Best and worst case is O(1).
+    """
+    if limit is not None and limit < 0:
+        raise ValueError(f"limit must not be negative, got {limit}")
+
+
+def posting_key(posting):
+    """
+        Key function over the item of a (restaurant, item) posting of the menu item name index.
+    """
+    return posting[1].sort_key
 
-@total_ordering
 class MenuItem:
+    """
+        A dish on a restaurant's menu.
+
+        Items are ordered by decreasing rating, then by name. The ordering is cached in `sort_key`
+        as (-rating, name), which is recomputed whenever the rating is assigned. Since `sort_key`
+        is a plain tuple, hot loops can compare keys directly and stay out of Python-level methods.
+        The name of an item is not expected to change.
+    """
+    __slots__ = ("name", "__rating", "sort_key")
+
     def __init__(self, name: str, rating: float):
         """
             Constructor for Restaurant.
@@ -17,14 +56,30 @@ class MenuItem:
         """
         self.name = name
         self.rating = rating
-        
+
+    @property
+    def rating(self) -> float:
+        return self.__rating
+
+    @rating.setter
+    def rating(self, rating: float) -> None:
+        self.__rating = rating
+        self.sort_key = (-rating, self.name)
+
     def __eq__(self, other):
-        return self.rating == other.rating and self.name == other.name
-    
+        return self.sort_key == other.sort_key
+
     def __lt__(self, other):
-        if self.rating != other.rating:
-            return self.rating > other.rating
-        return self.name < other.name
+        return self.sort_key < other.sort_key
+
+    def __le__(self, other):
+        return self.sort_key <= other.sort_key
+
+    def __gt__(self, other):
+        return self.sort_key > other.sort_key
+
+    def __ge__(self, other):
+        return self.sort_key >= other.sort_key
     
     def __str__(self):
         """
@@ -34,40 +89,315 @@ class MenuItem:
         """
         return f"MenuItem <{self.name}, {self.rating}>"
 
-@total_ordering
-class ComparableMenuItem:
-    """
-    This is a wrapper that reverses the comparison logic so that we can use it correctly with max-heap
-    which typically expects a natural ascending order.
-    """
-    def __init__(self, menu_item):
-        self.menu_item = menu_item
-
-    def __eq__(self, other):
-        return self.menu_item == other.menu_item
-
-    def __lt__(self, other):
-        return self.menu_item > other.menu_item
-        
 
 class Restaurant:
-    def __init__(self, name: str, block_number: int, initial_menu: ArrayR[MenuItem]):
+    def __init__(self, name: str, block_number: int, initial_menu: ArrayR[MenuItem],
+                 location: tuple[float, float] | None = None, lazy_sort: bool = False):
         """
             Constructor for Restaurant.
-            
+
+            `location` optionally places the restaurant at (x, y) coordinates of the city grid,
+            for FoodFlight.meal_suggestions_near.
+
+            With `lazy_sort`, the menu is not sorted until it is first read (through self.menu, as get_menu and
+            meal_suggestions do), not even when the restaurant is registered. Items added by add_menu_items are staged
+            unsorted as well, and merged into the menu by the next read. The read sorts into new arrays and publishes
+            them with a single assignment, so concurrent readers of a registered restaurant never see a half sorted menu.
+
+            :raises ValueError: if two items of initial_menu share a name.
             Complexity Analysis: Best and Worst case is both O(N log N), where N is the len(initial_menu),
             this is the case as regardless of the contents, we are always performing merge_sort on the menu,
             thereby, O(N log N) dominates the complexity. Best and worst case is the same as regardless of whether
             it is already sorted or reverse sorted, the method will perform the same number of operations.
+            With `lazy_sort` the complexity is O(N) (expected), for the copy and for checking that the names are unique.
             ...
         """
         self.name = name
         self.block_number = block_number
-        self.menu = ArrayR(len(initial_menu))
+        self.location = location
+        self.lazy_sort = lazy_sort
+        # Item name -> MenuItem, built by the first lookup of an item by name.
+        self.menu_item_names = None
+        self.__menu_state = (ArrayR(0), None, 0)
+        self.__check_new_names(initial_menu)
 
+        staged = ArrayR(len(initial_menu))
         for i in range(len(initial_menu)):
-            self.menu[i] = initial_menu[i]
-        self.menu = mergesort(self.menu)
+            staged[i] = initial_menu[i]
+        # (sorted menu, staged items, number of staged items), replaced as a whole so that concurrent readers
+        # sorting the same staged items each see a consistent state.
+        self.__menu_state = (ArrayR(0), staged, len(initial_menu))
+        if not lazy_sort:
+            self.sort_menu()
+
+
+    @property
+    def menu(self) -> ArrayR[MenuItem]:
+        """
+            The menu, in decreasing order of rating. Staged items are sorted and merged in first.
+
+            Complexity Analysis: Best case is O(1), when no item is staged.
+            Worst case is O(m log m + n), where m is the number of staged items and n the number of items already sorted.
+        """
+        if not self.menu_sorted:
+            self.sort_menu()
+        return self.__menu_state[0]
+
+
+    @menu.setter
+    def menu(self, menu: ArrayR[MenuItem]) -> None:
+        """
+            Replace the whole menu, staged items included, with `menu`, which must be sorted.
+        """
+        with _MENU_LOCK:
+            self.__menu_state = (menu, None, 0)
+
+
+    @property
+    def menu_sorted(self) -> bool:
+        """
+            Whether the menu is sorted, with no item staged.
+        """
+        return self.__menu_state[2] == 0
+
+
+    def sort_menu(self) -> None:
+        """
+            Sort the staged items, if any, and merge them into the menu.
+            The staged items are sorted into a new menu, which is only published if no item was staged meanwhile;
+            otherwise the sort starts again from the new state, so that items staged concurrently are never dropped.
+
+            Complexity Analysis: Best case is O(1), when no item is staged.
+            Worst case is O(m log m + n), where m is the number of staged items and n the number of items already sorted,
+            for each time items are staged during the sort.
+        """
+        while True:
+            state = self.__menu_state
+            sorted_menu, staged, count = state
+            if count == 0:
+                return
+            exact = ArrayR(count)
+            for i in range(count):
+                exact[i] = staged[i]
+            sorted_staged = mergesort(exact)
+            if len(sorted_menu) > 0:
+                sorted_staged = merge(sorted_menu, sorted_staged, key=menu_item_key)
+            with _MENU_LOCK:
+                if self.__menu_state is state:
+                    self.__menu_state = (sorted_staged, None, 0)
+                    return
+
+
+    def find_menu_item(self, item_name: str) -> MenuItem:
+        """
+            Return the item called `item_name` on the menu.
+            The first call builds a name index over the menu, which add_menu_items keeps up to date afterwards.
+
+            :raises KeyError: if there is no such item.
+            Complexity Analysis: Best case is O(N), where N is len(item_name), when the name index is built
+            and the name hashes to a free slot or straight to the item.
+            Worst case is O(n * N), where n is len(self.menu), on the first call, which builds the name index.
+        """
+        if self.menu_item_names is None:
+            self.menu_item_names = LinearProbeTable()
+            for i in range(len(self.menu)):
+                self.menu_item_names[self.menu[i].name] = self.menu[i]
+        return self.menu_item_names[item_name]
+
+
+    def add_menu_items(self, new_items: ArrayR[MenuItem]) -> None:
+        """
+            Add `new_items` to the menu.
+            Only the new items are sorted; they are then merged into the (already sorted) menu.
+            With lazy_sort, they are only appended to the staged items instead, until the menu is next read.
+
+            :raises ValueError: if two of new_items share a name, or one of them shares a name with an item already
+                on the menu. The menu is left unchanged.
+            Complexity Analysis: Best and worst case is O(m log m + n), where n is len(self.menu) and m is len(new_items),
+            as mergesort always performs the same number of operations regardless of the contents, and the merge
+            visits every item once. Adding a small batch to a long menu is therefore linear rather than O(n log n).
+            Checking that the names are unique adds O(m + n), as expected of hashing.
+            With lazy_sort, it is O(m + n), as every item already on the menu is checked against the new names.
+        """
+        new_count = len(new_items)
+        if self.lazy_sort:
+            self.__check_new_names(new_items)
+            self.__stage(new_items)
+            if self.menu_item_names is not None:
+                for i in range(new_count):
+                    self.menu_item_names[new_items[i].name] = new_items[i]
+            return
+
+        # Read before the check, as subclasses may only load the menu on first read.
+        menu = self.menu
+        self.__check_new_names(new_items)
+        sorted_items = ArrayR(new_count)
+        for i in range(new_count):
+            sorted_items[i] = new_items[i]
+
+        self.menu = merge(menu, mergesort(sorted_items), key=menu_item_key)
+
+        if self.menu_item_names is not None:
+            for i in range(new_count):
+                self.menu_item_names[new_items[i].name] = new_items[i]
+
+
+    def __check_new_names(self, new_items: ArrayR[MenuItem]) -> None:
+        """
+            Raise ValueError if two of `new_items` share a name, or if one of them shares a name with an item already on
+            the menu, staged items included. Names are unique within a menu, as find_menu_item (and so update_item_rating
+            and remove_menu_item) maps each name to a single item.
+            The new names are put in an open addressing array at least half empty, probed linearly from their hash;
+            a LinearProbeTable would do, but its character by character hash costs more than the rest of the update.
+
+            Complexity Analysis: Best case is O(m * N + n * N), where m is len(new_items), n the number of items already
+            on the menu and N the length of the longest name, when every probe finds its slot straight away.
+            Worst case is O(m^2 * N + n * m * N), when every name hashes into the same cluster.
+        """
+        if len(new_items) == 0:
+            return
+        slots = ArrayR(2 * len(new_items) + 1)
+        for i in range(len(new_items)):
+            name = new_items[i].name
+            position = hash(name) % len(slots)
+            while slots[position] is not None:
+                if slots[position] == name:
+                    raise ValueError(f'{name} appears more than once among the new items of {self.name}')
+                position = (position + 1) % len(slots)
+            slots[position] = name
+
+        sorted_menu, staged, count = self.__menu_state
+        for i in range(len(sorted_menu) + count):
+            name = sorted_menu[i].name if i < len(sorted_menu) else staged[i - len(sorted_menu)].name
+            position = hash(name) % len(slots)
+            while slots[position] is not None:
+                if slots[position] == name:
+                    raise ValueError(f'{name} is already on the menu of {self.name}')
+                position = (position + 1) % len(slots)
+
+
+    def __stage(self, new_items: ArrayR[MenuItem]) -> None:
+        # Held throughout, so that a concurrent sort_menu either publishes before the new state or sees it and starts again.
+        # Readers only ever read the first `count` staged items, so writing past them in place is safe.
+        with _MENU_LOCK:
+            sorted_menu, staged, count = self.__menu_state
+            if staged is None or count + len(new_items) > len(staged):
+                grown = ArrayR(max(2 * (count + len(new_items)), 4))
+                for i in range(count):
+                    grown[i] = staged[i]
+                staged = grown
+            for i in range(len(new_items)):
+                staged[count + i] = new_items[i]
+            self.__menu_state = (sorted_menu, staged, count + len(new_items))
+
+
+    def menu_position(self, item: MenuItem) -> int:
+        """
+            Return the position of `item` on the (sorted) menu, found by binary search on its sort key.
+
+            :raises KeyError: if the item is not on the menu.
+            Complexity Analysis: Best and worst case is O(log n), where n is len(self.menu), assuming
+            item names are unique within the menu so that each sort key matches a single item.
+        """
+        low = 0
+        high = len(self.menu)
+        while low < high:
+            mid = (low + high) // 2
+            if self.menu[mid].sort_key < item.sort_key:
+                low = mid + 1
+            else:
+                high = mid
+        while low < len(self.menu) and self.menu[low].sort_key == item.sort_key:
+            if self.menu[low] is item:
+                return low
+            low += 1
+        raise KeyError(f'{item.name} is not on the menu of {self.name}')
+
+
+    def update_item_rating(self, item_name: str, rating: float) -> MenuItem:
+        """
+            Change the rating of the item called `item_name`, moving it to its new place on the menu.
+            Only the block of items between its old and new place is shifted, by one position.
+
+            :raises KeyError: if there is no such item.
+            Complexity Analysis: Best case is O(N + log n), where N is len(item_name) and n is len(self.menu),
+            when the item keeps its place (no shift required).
+            Worst case is O(N + n), when the item moves from one end of the menu to the other and every item in between shifts.
+        """
+        self.sort_menu()
+        item = self.find_menu_item(item_name)
+        position = self.menu_position(item)
+        item.rating = rating
+
+        if position > 0 and item.sort_key < self.menu[position - 1].sort_key:
+            # Moves towards the front: find the first earlier item that sorts after it.
+            low = 0
+            high = position
+            while low < high:
+                mid = (low + high) // 2
+                if item.sort_key < self.menu[mid].sort_key:
+                    high = mid
+                else:
+                    low = mid + 1
+            for i in range(position, low, -1):
+                self.menu[i] = self.menu[i - 1]
+            self.menu[low] = item
+        elif position < len(self.menu) - 1 and self.menu[position + 1].sort_key < item.sort_key:
+            # Moves towards the back: find the first later item that sorts after it.
+            low = position + 1
+            high = len(self.menu)
+            while low < high:
+                mid = (low + high) // 2
+                if item.sort_key < self.menu[mid].sort_key:
+                    high = mid
+                else:
+                    low = mid + 1
+            for i in range(position, low - 1):
+                self.menu[i] = self.menu[i + 1]
+            self.menu[low - 1] = item
+        return item
+
+
+    def remove_menu_item(self, item_name: str) -> MenuItem:
+        """
+            Remove the item called `item_name` from the menu.
+
+            :raises KeyError: if there is no such item.
+            Complexity Analysis: Best and worst case is O(N + n), where N is len(item_name) and n is len(self.menu).
+            The item is found in O(N + log n), but the menu is an exactly sized ArrayR, so the items on either side
+            of it are copied into a new array one shorter.
+        """
+        self.sort_menu()
+        item = self.find_menu_item(item_name)
+        position = self.menu_position(item)
+
+        remaining = ArrayR(len(self.menu) - 1)
+        for i in range(position):
+            remaining[i] = self.menu[i]
+        for i in range(position + 1, len(self.menu)):
+            remaining[i - 1] = self.menu[i]
+        self.menu = remaining
+
+        del self.menu_item_names[item_name]
+        return item
+
+
+    def copy(self) -> "Restaurant":
+        """
+            Return a restaurant with the same name, block number, location and menu items, on a menu of its own,
+            so that it can be changed without affecting this one. The menu items themselves are shared.
+            Staged items are sorted into the menu first.
+
+            Complexity Analysis: Best and worst case is O(n), where n is len(self.menu), for copying the menu,
+            plus sorting the staged items, if any.
+        """
+        menu = self.menu
+        copied = ArrayR(len(menu))
+        for i in range(len(menu)):
+            copied[i] = menu[i]
+        copy = Restaurant(self.name, self.block_number, ArrayR(0), location=self.location, lazy_sort=self.lazy_sort)
+        copy.menu = copied
+        return copy
 
     
     def __str__(self):
@@ -80,22 +410,63 @@ class Restaurant:
         
 
 class FoodFlight:
-    def __init__(self):
+    def __init__(self, copy_on_write: bool = False, balanced: bool = False):
         """
             Constructor for FoodFlight.
 
+            With `balanced`, the restaurant tree (and the menu item name index) is an AVL tree, which keeps its
+            height O(log R) on every insertion whatever order the names arrive in, instead of relying on bulk_load
+            or rebalance to stay balanced. The complexities below assuming a balanced tree then hold by construction.
+
+            With `copy_on_write`, registered restaurants, their menus and items, and the nodes of the restaurant tree
+            are never changed in place once published. Every write builds the restaurants it changes anew, path-copies
+            the tree to them, and publishes the new tree by a single assignment to self.restaurants, under a lock shared by
+            all writers. Readers take no lock: iterating over the restaurants (as meal_suggestions does) keeps reading the
+            version that was current when it started, however many writes happen meanwhile. See also snapshot().
+            Writes cost O(n) in the size of the menu they change, instead of in-place updates.
+            The secondary indexes (menu_item_index, location_index and block_index) are not copied on write: writers
+            update them in place, so they are only ever read under the write lock, and a snapshot builds its own.
+
             Complexity Analysis: Best and Worst case is O(1), this is the case as we are simply performing
             the same constant-time initializing of the BetterBinarySearchTree and does not depend on any input size.
             ...
         """
-        self.restaurants = BetterBinarySearchTree()
+        self.balanced = balanced
+        self.restaurants = self.new_tree()
+        self.copy_on_write = copy_on_write
+        # Serialises writers. Readers of the restaurant tree never take it.
+        self.write_lock = threading.RLock()
+        # Number of writes published so far.
+        self.version = 0
+        # Menu item name -> ArrayList of (restaurant, item) postings, sorted by rating.
+        # Built by the first search_menu_items call, then kept up to date incrementally, in place even with
+        # copy_on_write: like the other indexes below, it is only read under write_lock.
+        self.menu_item_index = None
+        # KDTree of the restaurants with a location, built by the first meal_suggestions_near call,
+        # then kept up to date by add_restaurant.
+        self.location_index = None
+        # BlockRatingTree of every menu item by block number, built by the first block rating query,
+        # then kept up to date incrementally.
+        self.block_index = None
+        # TrendingDishes fed by the suggestion queries and record_order, when set. See trending_dishes().
+        self.trending = None
 
     
         
     
+    def new_tree(self) -> BetterBinarySearchTree:
+        """
+            Return an empty tree of the kind this FoodFlight keeps its restaurants in.
+
+            Complexity Analysis: Best and worst case is O(1).
+        """
+        return AVLBetterBinarySearchTree() if self.balanced else BetterBinarySearchTree()
+
+
     def add_restaurant(self, restaurant: Restaurant):
         """
             Register a `restaurant` in the FoodFlight app.
+            Its menu is sorted already, unless the restaurant has lazy_sort, in which case it is left to be sorted when first read.
 
             Complexity Analysis: Best case is O(log R + M), where R is the number of restaurants registered, and
             M is len(restaurant.name), this is the case when the tree is balanced, requiring O(log R) time for insertion
@@ -106,9 +477,117 @@ class FoodFlight:
             regardless of the order.
             ...
         """
-        self.restaurants[restaurant.name] = restaurant
+        with self.write_lock:
+            # Everything the update needs is read or built first (sorting lazy menus and path-copying the tree
+            # included), so that nothing is left to fail once the indexes start changing. Menus are only read when
+            # an index needs them, so a lazy menu stays unsorted otherwise.
+            replaced = self.restaurants[restaurant.name] if restaurant.name in self.restaurants else None
+            menu = replaced_menu = None
+            if self.menu_item_index is not None or self.block_index is not None:
+                menu = restaurant.menu
+                replaced_menu = replaced.menu if replaced is not None else None
+            restaurant_tree = self.restaurants.with_item(restaurant.name, restaurant) if self.copy_on_write else None
+
+            if self.menu_item_index is not None:
+                if replaced is not None:
+                    self.__unindex_menu_items(replaced, replaced_menu)
+                self.__index_menu_items(restaurant, menu)
+
+            if self.location_index is not None:
+                if replaced is not None and replaced.location is not None:
+                    self.location_index.delete(replaced.location, replaced)
+                if restaurant.location is not None:
+                    self.location_index.insert(restaurant.location, restaurant)
+
+            if self.block_index is not None:
+                if replaced is not None:
+                    self.block_index.remove_items(replaced)
+                self.block_index.add_items(restaurant, menu)
+
+            if self.copy_on_write:
+                self.restaurants = restaurant_tree
+            else:
+                self.restaurants[restaurant.name] = restaurant
+            self.version += 1
+
+
+    def bulk_load(self, restaurants: ArrayR[Restaurant]) -> None:
+        """
+            Register many restaurants at once, leaving the restaurant tree perfectly balanced.
+
+            The restaurants are sorted by name once, merged with the restaurants already registered
+            (a restaurant replaces a registered one, or an earlier one in `restaurants`, with the same name),
+            and the tree is rebuilt from the middle outwards. Unlike repeated add_restaurant calls,
+            names arriving in sorted order cannot degenerate the tree into a stick.
+            Menus of restaurants with lazy_sort are left to be sorted when first read.
+
+            Complexity Analysis: Best and Worst case is O(T log T * M + R * M), where T is len(restaurants),
+            M is the length of the longest restaurant name and R is the number of restaurants registered before the call.
+            Sorting the incoming restaurants by name always takes O(T log T) comparisons of O(M) each, the merge with
+            the registered restaurants compares O(T + R) names, and the balanced rebuild is O(T + R).
+        """
+        with self.write_lock:
+            incoming = mergesort(restaurants, key=restaurant_name_key)
+
+            # Merge the incoming restaurants with the registered ones, keeping the last one of each name.
+            registered = ArrayR(len(self.restaurants))
+            for i, entry in enumerate(self.restaurants):
+                registered[i] = entry
+            merged = ArrayR(len(registered) + len(incoming))
+            registered_count = len(registered)
+            incoming_count = len(incoming)
+            count = 0
+            i = 0
+            j = 0
+            while i < registered_count or j < incoming_count:
+                if j == incoming_count or (i < registered_count and registered[i][0] < incoming[j].name):
+                    merged[count] = registered[i]
+                    count += 1
+                    i += 1
+                    continue
+
+                restaurant = incoming[j]
+                j += 1
+                if j < incoming_count and incoming[j].name == restaurant.name:
+                    continue
+                if i < registered_count and registered[i][0] == restaurant.name:
+                    if self.menu_item_index is not None:
+                        self.__unindex_menu_items(registered[i][1], registered[i][1].menu)
+                    i += 1
+                if self.menu_item_index is not None:
+                    self.__index_menu_items(restaurant, restaurant.menu)
+                merged[count] = (restaurant.name, restaurant)
+                count += 1
+
+            if self.copy_on_write:
+                restaurant_tree = self.new_tree()
+                restaurant_tree.load_sorted(merged, count)
+                self.restaurants = restaurant_tree
+            else:
+                self.restaurants.load_sorted(merged, count)
+            self.version += 1
+            # Rebuilt balanced by the next meal_suggestions_near and block rating calls.
+            self.location_index = None
+            self.block_index = None
         
     
+    def snapshot(self) -> "FoodFlight":
+        """
+            Return a FoodFlight over the catalog as it is now, which later writes to this one do not change
+            (and which can itself be written to without changing this one). Requires copy_on_write.
+
+            :raises ValueError: if this FoodFlight does not copy on write, as its restaurants change in place.
+            Complexity Analysis: Best and worst case is O(1), as the snapshot shares the current restaurant tree,
+            which copy on write never changes in place. Its secondary indexes are built again on first use.
+        """
+        if not self.copy_on_write:
+            raise ValueError("Snapshots require a copy_on_write FoodFlight")
+        snapshot = FoodFlight(copy_on_write=True, balanced=self.balanced)
+        snapshot.restaurants = self.restaurants
+        snapshot.version = self.version
+        return snapshot
+
+
     def get_menu(self, restaurant_name: str):
         """
             Return all menu items for a restaurant in decreasing order of their ratings.
@@ -125,87 +604,486 @@ class FoodFlight:
         return restaurant.menu
         
 
+    def update_rating(self, restaurant_name: str, item_name: str, rating: float) -> None:
+        """
+            Change the rating of the item called `item_name` at the restaurant called `restaurant_name`,
+            keeping the menu sorted without re-sorting it.
+
+            :raises KeyError: if there is no such restaurant or item.
+            Complexity Analysis: Best case is O(log R * M + N + log n), where R is the number of restaurants, M is len(restaurant_name),
+            N is len(item_name) and n is the number of items on the menu, when the item keeps its place on the menu.
+            The restaurant is found in the tree and the item through the restaurant's name index, then binary searched
+            on the menu by its sort key.
+
+            Worst case is O(log R * M + N + n), when the item moves across the whole menu and every item in between shifts by one.
+            If the menu item name index is built, the item's posting is also moved, which adds O(log D * N + p) where D is the number
+            of distinct item names and p is the number of postings sharing the item's name.
+            With copy_on_write, the restaurant is copied with a new item in place of the old one instead, which is O(log R * M + N + n)
+            in both cases, plus re-indexing its whole menu when the name index is built.
+        """
+        with self.write_lock:
+            restaurant = self.restaurants[restaurant_name]
+            if self.copy_on_write:
+                updated = restaurant.copy()
+                item = updated.remove_menu_item(item_name)
+                updated.add_menu_items(ArrayR.from_list((MenuItem(item.name, rating),)))
+                self.add_restaurant(updated)
+                return
+
+            item = restaurant.find_menu_item(item_name)
+            if self.menu_item_index is not None:
+                self.__unindex_menu_items(restaurant, ArrayR.from_list((item,)))
+            if self.block_index is not None:
+                self.block_index.remove_items(restaurant, ArrayR.from_list((item,)))
+            restaurant.update_item_rating(item_name, rating)
+            if self.menu_item_index is not None:
+                self.__index_menu_items(restaurant, ArrayR.from_list((item,)))
+            if self.block_index is not None:
+                self.block_index.add_items(restaurant, ArrayR.from_list((item,)))
+            self.version += 1
+
+
+    def remove_from_menu(self, restaurant_name: str, item_name: str) -> MenuItem:
+        """
+            Remove the item called `item_name` from the menu of the restaurant called `restaurant_name`, and return it.
+
+            :raises KeyError: if there is no such restaurant or item.
+            Complexity Analysis: Best and worst case is O(log R * M + N + n), where R is the number of restaurants, M is len(restaurant_name),
+            N is len(item_name) and n is the number of items on the menu. The item is found in O(log R * M + N + log n), and the
+            items around it are copied into an exactly sized menu one shorter. If the menu item name index is built, removing the item's
+            posting adds O(log D * N + p) where D is the number of distinct item names and p is the number of postings sharing its name.
+            With copy_on_write, the restaurant is copied without the item instead, with the same complexity, plus re-indexing its whole
+            menu when the name index is built.
+        """
+        with self.write_lock:
+            restaurant = self.restaurants[restaurant_name]
+            if self.copy_on_write:
+                updated = restaurant.copy()
+                item = updated.remove_menu_item(item_name)
+                self.add_restaurant(updated)
+                return item
+
+            item = restaurant.remove_menu_item(item_name)
+            if self.menu_item_index is not None:
+                self.__unindex_menu_items(restaurant, ArrayR.from_list((item,)))
+            if self.block_index is not None:
+                self.block_index.remove_items(restaurant, ArrayR.from_list((item,)))
+            self.version += 1
+            return item
+
+
+    def restaurants_with_prefix(self, prefix: str, limit: int | None = None, reverse: bool = False) -> Iterator[Restaurant]:
+        """
+            Yield the restaurants whose name starts with `prefix`, in alphabetical order, or in reverse alphabetical order
+            with `reverse`. At most `limit` restaurants are yielded, when a limit is given.
+
+            :raises ValueError: if limit is negative.
+
+            The names starting with the prefix are those in the range [prefix, prefix + MAX_CHAR],
+            which is walked lazily from one bound, so nothing is materialized and the walk stops after `limit` hits.
+
+            Complexity Analysis (across all __next__ calls): Best case is O(log R * M + L * M), where R is the number of
+            restaurants, M is len(prefix) and L is the number of restaurants yielded. This is the case when the tree is balanced:
+            reaching the starting bound takes O(log R) string comparisons, and each hit costs one more comparison against the other bound.
+
+            Worst case is also O(log R * M + L * M), as we can assume the BST is always magically balanced.
+        """
+        check_limit(limit)
+        if limit == 0:
+            return
+
+        count = 0
+        for _, restaurant in self.restaurants.irange(prefix, prefix + MAX_CHAR, reverse):
+            yield restaurant
+            count += 1
+            if count == limit:
+                return
+
+
     def add_to_menu(self, restaurant_name: str, new_items: ArrayR[MenuItem]):
         """
             Add an ArrayR of MenuItems to a Restaurant's menu.
 
-            Complexity Analysis: Best and worst case is O(N + (n+m) log (n+m)), where N is len(restaurant.name),
+            Complexity Analysis: Best and worst case is O(N + m log m + n), where N is len(restaurant.name),
             n is the number of menu items that the restaurant has prior to adding the new ones and m is the number 
-            of new menu items being added to the restaurant's menu, this is the case as the merge_sort algortihm dominates
-            the complexity, and always performs the same number of operations regardless of the contents. As a result, the best
-            and worst case is the same.
+            of new menu items being added to the restaurant's menu, this is the case as only the new items are merge sorted,
+            which always performs the same number of operations regardless of the contents, before being merged into the
+            sorted menu in a single pass. As a result, the best and worst case is the same.
+            With copy_on_write, the restaurant is copied first, which adds O(n), plus re-indexing its whole menu when
+            the name index is built.
 
             ...
         """
-        restaurant = self.restaurants[restaurant_name]
-        if restaurant is None:
-            raise KeyError(f'Restaurant {restaurant_name} not found')
-        
-        current_count = len(restaurant.menu)
-        new_count = len(new_items)
-        combined = ArrayR(current_count + new_count)
-        
-        for i in range(current_count):
-            combined[i] = restaurant.menu[i]
-        for i in range(new_count):
-            combined[current_count + i] = new_items[i]
+        with self.write_lock:
+            restaurant = self.restaurants[restaurant_name]
+            if restaurant is None:
+                raise KeyError(f'Restaurant {restaurant_name} not found')
+
+            if self.copy_on_write:
+                updated = restaurant.copy()
+                updated.add_menu_items(new_items)
+                self.add_restaurant(updated)
+                return
         
-        restaurant.menu = mergesort(combined)
+            restaurant.add_menu_items(new_items)
+
+            if self.menu_item_index is not None:
+                self.__index_menu_items(restaurant, new_items)
+            if self.block_index is not None:
+                self.block_index.add_items(restaurant, new_items)
+            self.version += 1
+
+
+    def search_menu_items(self, prefix: str, limit: int | None = None) -> ArrayList[tuple[Restaurant, MenuItem]]:
+        """
+            Return the (restaurant, item) pairs of every menu item whose name starts with `prefix`,
+            in decreasing order of rating (ties by item name, then by the order the items were indexed).
+            At most `limit` pairs are returned, when a limit is given.
+
+            The first call builds the index over every menu in the catalog; afterwards it is kept
+            up to date by add_restaurant and add_to_menu.
+
+            :raises ValueError: if limit is negative.
+            Complexity Analysis: Best case is O(log D * P + K log K + L log K), where D is the number of distinct item names,
+            P is len(prefix), K is the number of distinct names starting with the prefix and L is the number of pairs returned.
+            This is the case when the index is already built: the range scan over the name tree costs O(log D * P + K),
+            the postings of each name are already sorted by rating, so they are merged with a loser tree over K runs,
+            stopping after L pairs.
+
+            Worst case is O(n log D + K log K + L log K), where n is the total number of menu items in the catalog.
+            This is the case on the first call, which has to insert every item of every menu into the index.
+        """
+        check_limit(limit)
+        # The index is changed in place by writers, so it is only read under the write lock.
+        with self.write_lock:
+            if self.menu_item_index is None:
+                self.menu_item_index = self.new_tree()
+                for _, restaurant in self.restaurants:
+                    self.__index_menu_items(restaurant, restaurant.menu)
+
+            postings = self.menu_item_index.range_query(prefix, prefix + MAX_CHAR)
+
+            matches = ArrayList()
+            for match in LoserTree(postings, key=posting_key):
+                if limit is not None and len(matches) >= limit:
+                    break
+                matches.append(match)
+            return matches
+
+
+    def rating_summary(self, low_block: int | None = None, high_block: int | None = None) -> RatingSummary:
+        """
+            Return the count, total, maximum and average rating of every menu item at a restaurant whose block number
+            is in [low_block, high_block]. A bound of None leaves that side of the range open.
+
+            Complexity Analysis: Best case is O(log B), where B is the number of distinct block numbers, when the block index
+            is already built: the range is split into O(log B) subtrees of the balanced index, whose aggregates are read directly.
+
+            Worst case is O(n log n), where n is the total number of menu items in the catalog, on the first call, which builds
+            the index by sorting every item by block and rating.
+        """
+        with self.write_lock:
+            return self.__block_index().summary(low_block, high_block)
+
+
+    def block_rating_summaries(self, low_block: int | None = None, high_block: int | None = None) -> ArrayList[tuple[int, RatingSummary]]:
+        """
+            Return (block number, rating summary) for every block in [low_block, high_block] with at least one menu item,
+            in increasing block order.
+
+            Complexity Analysis: Best case is O(log B + K), where B is the number of distinct block numbers and K is the
+            number of blocks in the range, when the block index is already built.
+
+            Worst case is O(n log n + K), where n is the total number of menu items in the catalog, when it is built first.
+        """
+        with self.write_lock:
+            summaries = ArrayList()
+            for entry in self.__block_index().block_summaries(low_block, high_block):
+                summaries.append(entry)
+            return summaries
+
+
+    def top_rated_items(self, k: int, low_block: int | None = None, high_block: int | None = None) -> ArrayList[tuple[Restaurant, MenuItem]]:
+        """
+            Return the (restaurant, item) pairs of the `k` best rated menu items at blocks in [low_block, high_block],
+            in decreasing order of rating (ties by item name).
+
+            Complexity Analysis: Best case is O((log B + k) log(log B + k)), where B is the number of distinct block numbers,
+            when the block index is already built and the best items are at few blocks: subtrees of the index are opened best first
+            on the best rating they hold, so subtrees without any of the k items are never opened.
+
+            Worst case is O(n log n + k log B log(k log B)), where n is the total number of menu items in the catalog, when the index
+            is built first and every item returned opens the O(log B) subtrees above it.
+        """
+        with self.write_lock:
+            return self.__block_index().top_items(k, low_block, high_block)
+
+
+    def record_order(self, restaurant_name: str, item_name: str, quantity: int = 1) -> None:
+        """
+            Record that `quantity` of the item called `item_name` were ordered from the restaurant called `restaurant_name`,
+            as demand at the restaurant's block. Nothing is recorded unless self.trending is set.
+            This is the entry point for the order flow: an Order of orders.py only carries the hunger and location of
+            the customer, not what was ordered, so OrderDispatch cannot record demand itself.
+
+            :raises KeyError: if there is no such restaurant or item.
+            Complexity Analysis: Best and worst case is O(log R * M + N), where R is the number of restaurants, M is len(restaurant_name)
+            and N is len(item_name), for finding the restaurant and item. Recording the demand itself is O(1) in the size of
+            the catalog and of the demand recorded so far, apart from evicting a tracked dish, which is O(capacity).
+        """
+        restaurant = self.restaurants[restaurant_name]
+        item = restaurant.find_menu_item(item_name)
+        if self.trending is not None:
+            self.trending.record(restaurant.block_number, item.name, quantity)
+
+
+    def trending_dishes(self, k: int, low_block: int | None = None, high_block: int | None = None) -> ArrayList[tuple[str, int]]:
+        """
+            Return up to `k` (dish name, estimated demand) pairs of the dishes most demanded at blocks in [low_block, high_block],
+            most demanded first. Demand is counted from the items yielded by meal_suggestions and ameal_suggestions
+            (at the user's block), by meal_suggestions_near and from record_order (at the restaurant's block),
+            approximately and in bounded memory.
+
+            :raises ValueError: if self.trending is not set.
+            Complexity Analysis: Best case is O(C * N + k log C) when the range is unbounded, where C is the number of dishes tracked
+            by self.trending and N is the length of the longest dish name. Worst case is O(C * (N + L + r / 2^(L - 1)) + k log C)
+            for a range of r blocks, where L is the number of levels of self.trending, as the demand of every tracked dish
+            is summed over the aligned intervals the range splits into.
+        """
+        if self.trending is None:
+            raise ValueError("Demand is only tracked once self.trending is set")
+        return self.trending.top(k, low_block, high_block)
+
+
+    def __block_index(self) -> BlockRatingTree:
+        """
+            Return the block index, building it balanced over every registered restaurant if needed. Call under the write lock.
+        """
+        if self.block_index is None:
+            registered = ArrayR(len(self.restaurants))
+            for i, (_, restaurant) in enumerate(self.restaurants):
+                registered[i] = restaurant
+            self.block_index = BlockRatingTree.build(registered)
+        return self.block_index
+
+
+    def __index_menu_items(self, restaurant: Restaurant, items: ArrayR[MenuItem]) -> None:
+        """
+            Add a posting for each of `items` to the menu item name index.
+
+            Complexity Analysis: Best and worst case is O(m (log D * N + log p + p)), where m is len(items),
+            D is the number of distinct item names, N is the length of an item name and p is the number of postings
+            sharing that name. Each item needs a lookup in the name tree, a binary search for its position
+            amongst the postings of that name, and a shuffle to make space for it.
+        """
+        for i in range(len(items)):
+            item = items[i]
+            if item.name in self.menu_item_index:
+                postings = self.menu_item_index[item.name]
+            else:
+                postings = ArrayList()
+                self.menu_item_index[item.name] = postings
+
+            # Insert after every posting that sorts before or equal to the item.
+            low = 0
+            high = len(postings)
+            while low < high:
+                mid = (low + high) // 2
+                if item.sort_key < postings[mid][1].sort_key:
+                    high = mid
+                else:
+                    low = mid + 1
+            postings.insert(low, (restaurant, item))
+
+
+    def __unindex_menu_items(self, restaurant: Restaurant, items: ArrayR[MenuItem]) -> None:
+        """
+            Remove the postings of `items` at `restaurant` from the menu item name index.
+
+            Complexity Analysis: Best and worst case is O(m (log D * N + p)), where m is len(items),
+            D is the number of distinct item names, N is the length of an item name and p is the number of postings
+            sharing that name, as the postings of each name are scanned for the one to remove.
+        """
+        for i in range(len(items)):
+            item = items[i]
+            postings = self.menu_item_index[item.name]
+            for j in range(len(postings)):
+                if postings[j][0] is restaurant and postings[j][1] is item:
+                    postings.delete_at_index(j)
+                    break
+            if len(postings) == 0:
+                del self.menu_item_index[item.name]
     
     
-    def meal_suggestions(self, user_block_number: int, max_walk: int) -> Iterator[MenuItem]:
+    def meal_suggestions(self, user_block_number: int, max_walk: int, limit: int | None = None) -> Iterator[MenuItem]:
         """
             Yield all menu items within max_walk blocks of the user's current block.
+            At most `limit` items are yielded, when a limit is given.
+
+            :raises ValueError: if limit is negative.
 
             Complexity Analysis (across all __next__ calls): Best and Worst case is O(T + n log R), where T is the total
             number of restaurants, R is the number of candidate restaurants within walking distance, and n is the total 
             number of menu items from those R restaurants. This is the case as the function always has to look
             through all the restaurants to find which is within walking distance which takes O(T) time and return all the menus
             from those restaurants and return the best items, which takes O(n log R) time. Thereby, the time complexity is O(T + n log R).
-             
+            The merge uses a loser tree, so each item costs a single leaf-to-root replay of log R comparisons.
+            With a limit K, only O(R + K log R) of the merge is performed.
+            The merge runs in a single process: splitting the candidates into shards merged by worker processes was
+            measured slower, even with each worker returning only the positions of its shard's top K items.
 
             ...
         """
-        candidates = ArrayR(0)
-        count = 0
+        check_limit(limit)
+        candidates = self.__candidate_restaurants(self.__walkable_restaurants(user_block_number, max_walk))
+        yield from self.__merge_suggestions(candidates, limit, user_block_number)
 
-        for _, restaurant in self.restaurants:
-            if abs(restaurant.block_number - user_block_number) <= max_walk:
 
-                if len(restaurant.menu) > 0:
+    async def ameal_suggestions(self, user_block_number: int, max_walk: int, limit: int | None = None,
+                                yield_every: int = 64) -> AsyncIterator[MenuItem]:
+        """
+            Asynchronously yield the same items, in the same order, as meal_suggestions.
+
+            The merge hands control back to the event loop after every `yield_every` items, so that
+            a wide window does not stall other requests while the consumer keeps pulling items.
+            Control is also handed back once the candidate menus are collected, before the merge starts.
+            All of the merge state is local to the generator: when the consuming task is cancelled, or the
+            generator is closed early, the loser tree and the candidate menus are dropped with it.
 
-                    if count == len(candidates):
-                        new_size = max(2 * count, 1)
-                        new_candidates = ArrayR(new_size)
-                        for i in range(count):
-                            new_candidates[i] = candidates[i]
-                        candidates = new_candidates
-                    
-                    candidates[count] = (restaurant.menu, 0)
-                    count += 1
+            :raises ValueError: if limit is negative or yield_every is not positive.
+            Complexity Analysis: same as meal_suggestions, plus one event loop round trip per `yield_every` items.
+        """
+        check_limit(limit)
+        if yield_every < 1:
+            raise ValueError("yield_every must be positive")
 
-        if count == 0:
-            return
+        candidates = self.__candidate_restaurants(self.__walkable_restaurants(user_block_number, max_walk))
+        await asyncio.sleep(0)
+
+        yielded = 0
+        for item in self.__merge_suggestions(candidates, limit, user_block_number):
+            yield item
+            yielded += 1
+            if yielded % yield_every == 0:
+                await asyncio.sleep(0)
+
+
+    def meal_suggestions_near(self, point: tuple[float, float], radius: float, limit: int | None = None) -> Iterator[MenuItem]:
+        """
+            Yield the menu items of every restaurant within (Euclidean) `radius` of `point`, in the same order
+            as meal_suggestions: decreasing rating, then name. Restaurants without a location are never suggested.
+            At most `limit` items are yielded, when a limit is given.
+
+            The candidates are found in a k-d tree of the restaurant locations, which is built balanced
+            by the first call and kept up to date by add_restaurant afterwards. The k-d tree rebuilds any subtree
+            that add_restaurant leaves lopsided, so its depth stays O(log T) under incremental writes as well.
+            Items comparing equal (same name and rating) on different menus are yielded in k-d tree order.
+            When self.trending is set, each item yielded is recorded as demand at the block of its restaurant.
+
+            :raises ValueError: if radius or limit is negative.
+
+            Complexity Analysis (across all __next__ calls): Best case is O(log T + n log R), where T is the number of
+            restaurants with a location, R the number of them within the radius and n the number of items on their menus,
+            when the circle only crosses the split lines along a single path of the k-d tree.
+            Worst case is O(sqrt(T) + n log R), as a circle can cross the split lines of O(sqrt(T)) nodes of a balanced 2-d tree;
+            between rebuilds the k-d tree is only alpha-balanced, which loosens the exponent of this bound.
+            The first call also builds the k-d tree, in O(T log^2 T).
+        """
+        if radius < 0:
+            raise ValueError(f"radius must not be negative, got {radius}")
+        check_limit(limit)
+        # The k-d tree is changed in place by writers, so candidates are collected under the write lock.
+        with self.write_lock:
+            if self.location_index is None:
+                located = ArrayR(len(self.restaurants))
+                count = 0
+                for _, restaurant in self.restaurants:
+                    if restaurant.location is not None:
+                        located[count] = (restaurant.location, restaurant)
+                        count += 1
+                entries = ArrayR(count)
+                for i in range(count):
+                    entries[i] = located[i]
+                self.location_index = KDTree.build(entries)
+
+            candidates = self.__candidate_restaurants(self.location_index.within(point, radius))
+
+        # There is no user block to record demand at, so it is recorded at the block of each item's restaurant.
+        yield from self.__merge_suggestions(candidates, limit, None)
+
+
+    def __candidate_restaurants(self, restaurants: Iterator[Restaurant]) -> ArrayR[Restaurant]:
+        """
+            Return the restaurants with a non-empty menu amongst `restaurants`, in the order they come in.
+
+            Complexity Analysis: Best and Worst case is O(T), where T is the number of restaurants, as every restaurant
+            is checked, and the candidates array doubles in size when full (amortised O(1) per candidate).
+        """
+        candidates = ArrayR(0)
+        count = 0
+
+        for restaurant in restaurants:
+            if len(restaurant.menu) == 0:
+                continue
+            if count == len(candidates):
+                new_size = max(2 * count, 1)
+                new_candidates = ArrayR(new_size)
+                for i in range(count):
+                    new_candidates[i] = candidates[i]
+                candidates = new_candidates
+
+            candidates[count] = restaurant
+            count += 1
 
         exact_candidates = ArrayR(count)
         for i in range(count):
             exact_candidates[i] = candidates[i]
-        candidates = exact_candidates
+        return exact_candidates
 
-        heap = ArrayMaxHeap(count)
 
-        for i in range(count):
-            menu, index = candidates[i]
-            heap.add((ComparableMenuItem(menu[index]), i, index))
+    def __merge_suggestions(self, candidates: ArrayR[Restaurant], limit: int | None, user_block_number: int | None) -> Iterator[MenuItem]:
+        """
+            Yield the items of the (sorted) menus of the candidate restaurants in merged order, stopping after `limit` items
+            when a limit is given. When self.trending is set, each item yielded is recorded as demand at user_block_number,
+            or at the block of its restaurant when user_block_number is None.
+            Shared by meal_suggestions, ameal_suggestions and meal_suggestions_near, so that they all yield their items
+            in the same order.
+
+            Complexity Analysis (across all __next__ calls): Best and Worst case is O(R + K log R), where R is len(candidates)
+            and K the number of items yielded. The menus are already sorted, so a loser tree merges them replaying
+            a single leaf-to-root path of log R comparisons per yielded item.
+        """
+        if len(candidates) == 0:
+            return
 
-        while len(heap) > 0:
-            wrapped_item, rest_i, index_in_menu = heap.extract_max()
-            yield wrapped_item.menu_item
+        menus = ArrayR(len(candidates))
+        for i in range(len(candidates)):
+            menus[i] = candidates[i].menu
 
-            menu, _ = candidates[rest_i]
-            next_index = index_in_menu + 1
-            if next_index < len(menu):
-                heap.add((ComparableMenuItem(menu[next_index]), rest_i, next_index))
+        merge = LoserTree(menus, key=menu_item_key)
+        yielded = 0
+        for item in merge:
+            if yielded == limit:
+                return
+            if self.trending is not None:
+                if user_block_number is None:
+                    self.trending.record(candidates[merge.last_run].block_number, item.name)
+                else:
+                    self.trending.record(user_block_number, item.name)
+            yield item
+            yielded += 1
+
+
+    def __walkable_restaurants(self, user_block_number: int, max_walk: int) -> Iterator[Restaurant]:
+        """
+            Yield the restaurants within max_walk blocks of user_block_number, in name order.
+
+            Complexity Analysis (across all __next__ calls): Best and Worst case is O(T), where T is the total number of
+            restaurants, as every restaurant is checked.
+        """
+        for _, restaurant in self.restaurants:
+            if abs(restaurant.block_number - user_block_number) <= max_walk:
+                yield restaurant
 
 
 if __name__ == "__main__":
@@ -2,10 +2,11 @@ from unittest import TestCase
 import ast
 import inspect
 from data_structures.array_list import ArrayList
+from data_structures.binary_search_tree import BinarySearchTree
 from data_structures.referential_array import ArrayR
 from tests.helper import CollectionsFinder
 
-from better_bst import BetterBinarySearchTree
+from better_bst import AugmentedBetterBinarySearchTree, AVLBetterBinarySearchTree, BetterBinarySearchTree, ScapegoatBetterBinarySearchTree
 
 class TestTask1Setup(TestCase):
     pass
@@ -61,6 +62,281 @@ class TestTask1(TestTask1Setup):
         
         self.assertNotEqual(og_order, new_order, "Rebalancing a maximally unbalanced tree should change the iteration order")
 
+    def test_bst_irange_is_lazy(self):
+        """
+        #name(Test BetterBST irange yields keys in range lazily)
+        """
+        tree = BetterBinarySearchTree()
+        for k in [50, 20, 80, 10, 30, 70, 90, 25, 35]:
+            tree[k] = str(k)
+
+        self.assertEqual([k for k, _ in tree.irange(22, 75)], [25, 30, 35, 50, 70])
+        self.assertEqual(list(tree.irange(91, 100)), [])
+
+        iterator = tree.irange(0, 100)
+        self.assertEqual(next(iterator), (10, "10"))
+        self.assertEqual(next(iterator), (20, "20"))
+
+        self.assertEqual([k for k, _ in tree.irange(22, 75, reverse=True)], [70, 50, 35, 30, 25])
+        self.assertEqual(list(tree.irange(91, 100, reverse=True)), [])
+        iterator = tree.irange(0, 100, reverse=True)
+        self.assertEqual(next(iterator), (90, "90"))
+        self.assertEqual(next(iterator), (80, "80"))
+
+    def test_avl_bst_stays_balanced(self):
+        """
+        #name(Test AVL BetterBST stays balanced on sorted inserts and deletes)
+        """
+        tree = AVLBetterBinarySearchTree()
+        for k in range(1, 128):
+            tree[k] = str(k)
+        self.assertEqual(tree.height(), 7)
+        self.assertEqual(tree.balance_score(), 0)
+
+        for k in range(1, 100):
+            del tree[k]
+        self.assertEqual(len(tree), 28)
+        self.assertLessEqual(tree.height(), 6)
+        self.assertEqual([k for k, _ in tree], list(range(100, 128)))
+        self.assertEqual(list(tree.range_query(120, 200)), [str(k) for k in range(120, 128)])
+        with self.assertRaises(KeyError):
+            del tree[1]
+
+        copy = tree.with_item(99, "99")
+        self.assertEqual(len(copy), 29)
+        self.assertLessEqual(copy.height(), 6)
+        self.assertNotIn(99, tree)
+
+    def test_deep_bst_operations(self):
+        """
+        #name(Test BetterBST operations on a degenerate tree deeper than the recursion limit)
+        """
+        tree = BetterBinarySearchTree()
+        depth = 3000
+        for k in range(depth):
+            tree[k] = str(k)
+        self.assertEqual(len(tree), depth)
+        self.assertEqual(tree[depth - 1], str(depth - 1))
+        self.assertNotIn(depth, tree)
+        self.assertEqual(tree.balance_score(), depth - 1 - (depth.bit_length() - 1))
+
+        copy = tree.with_item(depth, str(depth)).with_item(0, "zero")
+        self.assertEqual(len(copy), depth + 1)
+        self.assertEqual(copy[depth], str(depth))
+        self.assertEqual(copy[0], "zero")
+        self.assertNotIn(depth, tree)
+        self.assertEqual(tree[0], "0")
+
+        # Copying, checking and printing the tree do not recurse either
+        root = tree._BinarySearchTree__root
+        self.assertEqual(len(BinarySearchTree.from_node(root, check_invariant=True)), depth)
+        self.assertTrue(str(tree).startswith("<BinarySearchTree(0, 0, None, (1, 1, None, "))
+        result = ArrayList()
+        tree.recursive_search(root, 10, 12, result)
+        self.assertEqual(list(result), ["10", "11", "12"])
+        self.assertEqual(list(tree.range_query(depth - 5, depth + 5)), [str(k) for k in range(depth - 5, depth)])
+
+        tree[depth - 1] = "last"
+        self.assertEqual(tree[depth - 1], "last")
+        del tree[depth - 1]
+        del tree[0]
+        self.assertEqual(len(tree), depth - 2)
+        self.assertNotIn(depth - 1, tree)
+        self.assertEqual(tree[depth - 2], str(depth - 2))
+        with self.assertRaises(KeyError):
+            del tree[depth - 1]
+        with self.assertRaises(KeyError):
+            tree[depth - 1]
+
+
+    def test_scapegoat_bst_rebalances_itself(self):
+        """
+        #name(Test scapegoat BetterBST keeps its depth logarithmic)
+        """
+        tree = ScapegoatBetterBinarySearchTree()
+        for k in range(1000):
+            tree[k] = str(k)
+        self.assertEqual(len(tree), 1000)
+        self.assertEqual([k for k, _ in tree], list(range(1000)))
+        # Depth at most log N / log(3/2), about 17 for 1000 nodes, against an ideal height of 9.
+        self.assertLessEqual(tree.balance_score(), 8)
+        self.assertEqual(list(tree.range_query(995, 2000)), [str(k) for k in range(995, 1000)])
+
+        copy = tree.with_item(1000, "1000")
+        self.assertEqual(len(copy), 1001)
+        self.assertNotIn(1000, tree)
+        self.assertEqual([k for k, _ in tree], list(range(1000)))
+
+        for k in range(900):
+            del tree[k]
+        self.assertEqual(len(tree), 100)
+        self.assertEqual([k for k, _ in tree], list(range(900, 1000)))
+        self.assertLessEqual(tree.balance_score(), 2)
+        with self.assertRaises(KeyError):
+            del tree[0]
+        with self.assertRaises(ValueError):
+            ScapegoatBetterBinarySearchTree(0.5)
+
+    def test_bst_order_statistics(self):
+        """
+        #name(Test BetterBST select, rank and count_range)
+        """
+        for tree in (BetterBinarySearchTree(), AVLBetterBinarySearchTree(), ScapegoatBetterBinarySearchTree()):
+            for k in [50, 20, 80, 10, 30, 70, 90, 25, 35, 60]:
+                tree[k] = str(k)
+            del tree[20]
+            tree[30] = "thirty"
+            tree = tree.with_item(40, "40")
+            keys = [10, 25, 30, 35, 40, 50, 60, 70, 80, 90]
+            for i, k in enumerate(keys):
+                self.assertEqual(tree.select(i)[0], k)
+                self.assertEqual(tree.rank(k), i)
+            self.assertEqual(tree.select(2), (30, "thirty"))
+            self.assertEqual(tree.rank(0), 0)
+            self.assertEqual(tree.rank(36), 4)
+            self.assertEqual(tree.rank(100), 10)
+            self.assertEqual(tree.count_range(25, 60), 6)
+            self.assertEqual(tree.count_range(26, 59), 4)
+            self.assertEqual(tree.count_range(91, 100), 0)
+            self.assertEqual(tree.count_range(60, 25), 0)
+            with self.assertRaises(IndexError):
+                tree.select(10)
+            tree.rebalance()
+            self.assertEqual(tree.count_range(0, 100), 10)
+            self.assertEqual(tree.select(9), (90, "90"))
+
+    def test_bst_subtree_balance(self):
+        """
+        #name(Test BetterBST stored heights and targeted rebalancing)
+        """
+        tree = BetterBinarySearchTree()
+        self.assertEqual(tree.most_unbalanced_subtree(), None)
+        for k in [40, 20, 60, 10, 30, 50, 70]:
+            tree[k] = str(k)
+        self.assertEqual(tree.balance_score(), 0)
+        for k in range(71, 79):
+            tree[k] = str(k)
+        self.assertEqual(tree.balance_score(), 7)
+        self.assertEqual(tree.subtree_balance_score(70), 5)
+        self.assertEqual(tree.subtree_balance_score(20), 0)
+        self.assertEqual(tree.most_unbalanced_subtree(), 70)
+
+        tree.rebalance_subtree(70)
+        self.assertEqual(tree.subtree_balance_score(60), 1)
+        self.assertEqual(tree.balance_score(), 2)
+        self.assertEqual([k for k, _ in tree], [10, 20, 30, 40, 50, 60] + list(range(70, 79)))
+        for k in [10, 30, 50]:
+            del tree[k]
+        self.assertEqual(tree.balance_score(), 2)
+        self.assertEqual(tree.count_range(0, 100), 12)
+        with self.assertRaises(KeyError):
+            tree.rebalance_subtree(10)
+
+    def test_bst_merge(self):
+        """
+        #name(Test BetterBST merge takes the other tree's items and leaves the result balanced)
+        """
+        tree = BetterBinarySearchTree()
+        for k in range(0, 40, 2):
+            tree[k] = "mine"
+        other = BetterBinarySearchTree()
+        for k in range(30, 60, 3):
+            other[k] = "theirs"
+
+        tree.merge(other)
+        keys = sorted(set(range(0, 40, 2)) | set(range(30, 60, 3)))
+        self.assertEqual([k for k, _ in tree], keys)
+        self.assertEqual(len(tree), len(keys))
+        self.assertEqual(tree[30], "theirs")
+        self.assertEqual(tree[32], "mine")
+        self.assertEqual(tree.balance_score(), 0)
+        self.assertEqual(len(other), 10)
+
+        tree.merge(BetterBinarySearchTree())
+        self.assertEqual(len(tree), len(keys))
+        empty = AVLBetterBinarySearchTree()
+        empty.merge(other)
+        self.assertEqual([k for k, _ in empty], list(range(30, 60, 3)))
+        self.assertEqual(empty.height(), 4)
+
+    def test_bst_rebalance_in_place(self):
+        """
+        #name(Test BetterBST in-place rebalance)
+        """
+        stick_tree = BetterBinarySearchTree()
+        for k in range(100):
+            stick_tree[k] = str(k)
+        og_order = list(stick_tree.pre_iter())
+        stick_tree.rebalance_in_place()
+        self.assertEqual(stick_tree.balance_score(), 0)
+        self.assertEqual([k for k, _ in stick_tree], list(range(100)))
+        self.assertNotEqual(list(stick_tree.pre_iter()), og_order)
+        self.assertEqual(stick_tree.select(42), (42, "42"))
+        self.assertEqual(stick_tree.count_range(10, 19), 10)
+
+        stick_tree[100] = "100"
+        del stick_tree[0]
+        self.assertEqual(len(stick_tree), 100)
+
+        empty = AVLBetterBinarySearchTree()
+        empty.rebalance_in_place()
+        self.assertEqual(len(empty), 0)
+
+    def test_augmented_bst_aggregate_range(self):
+        """
+        #name(Test augmented BetterBST range aggregates)
+        """
+        orders = AugmentedBetterBinarySearchTree(lambda a, b: a + b, identity=0)
+        ratings = AugmentedBetterBinarySearchTree(max)
+        names = AugmentedBetterBinarySearchTree(lambda a, b: a + b, value=lambda key, item: item[0], identity="")
+        for k in [50, 20, 80, 10, 30, 70, 90, 25, 35]:
+            orders[k] = k // 5
+            ratings[k] = k / 20
+            names[k] = f"n{k}"
+
+        self.assertEqual(orders.aggregate_range(20, 70), 4 + 5 + 6 + 7 + 10 + 14)
+        self.assertEqual(orders.aggregate_range(91, 100), 0)
+        self.assertEqual(ratings.aggregate_range(0, 60), 2.5)
+        self.assertEqual(ratings.aggregate_range(51, 69), None)
+        self.assertEqual(names.aggregate_range(0, 100), "n" * 9)
+
+        orders[30] = 100
+        del orders[50]
+        del orders[10]
+        self.assertEqual(orders.aggregate_range(0, 100), 4 + 5 + 100 + 7 + 14 + 16 + 18)
+        orders.rebalance_in_place()
+        self.assertEqual(orders.aggregate_range(21, 89), 5 + 100 + 7 + 14 + 16)
+        copy = orders.with_item(60, 1000)
+        self.assertEqual(copy.aggregate_range(55, 65), 1000)
+        self.assertEqual(orders.aggregate_range(55, 65), 0)
+        copy.rebalance()
+        self.assertEqual(copy.aggregate_range(0, 100), 4 + 5 + 100 + 7 + 1000 + 14 + 16 + 18)
+
+    def test_bst_nearest_key_queries(self):
+        """
+        #name(Test BetterBST floor, ceiling, predecessor, successor and nearest)
+        """
+        tree = BetterBinarySearchTree()
+        self.assertEqual(tree.nearest(5), None)
+        for k in [50, 20, 80, 10, 30, 70, 90]:
+            tree[k] = str(k)
+
+        self.assertEqual(tree.floor(30), (30, "30"))
+        self.assertEqual(tree.floor(34), (30, "30"))
+        self.assertEqual(tree.floor(9), None)
+        self.assertEqual(tree.ceiling(34), (50, "50"))
+        self.assertEqual(tree.ceiling(90), (90, "90"))
+        self.assertEqual(tree.ceiling(91), None)
+        self.assertEqual(tree.predecessor(30), (20, "20"))
+        self.assertEqual(tree.predecessor(10), None)
+        self.assertEqual(tree.successor(30), (50, "50"))
+        self.assertEqual(tree.successor(85), (90, "90"))
+        self.assertEqual(tree.successor(90), None)
+        self.assertEqual(tree.nearest(44), (50, "50"))
+        self.assertEqual(tree.nearest(40), (30, "30"))
+        self.assertEqual(tree.nearest(70), (70, "70"))
+        self.assertEqual(tree.nearest(-5), (10, "10"))
+        self.assertEqual(tree.nearest(1000), (90, "90"))
 
 class TestTask1Approach(TestTask1Setup):
     def test_python_built_ins_not_used(self):
@@ -1,16 +1,25 @@
 from unittest import TestCase
 import ast
+import asyncio
 import inspect
+import os
+import tempfile
 from data_structures.abstract_list import List
 from data_structures.binary_search_tree import BinarySearchTree
 from data_structures.hash_table_double_hashing import DoubleHashingTable
 from data_structures.hash_table_linear_probing import LinearProbeTable
 from data_structures.hash_table_quadratic_probing import QuadraticProbeTable
 from data_structures.hash_table_separate_chaining import HashTableSeparateChaining
+from data_structures.kd_tree import KDTree
 from data_structures.referential_array import ArrayR
 from tests.helper import CollectionsFinder
 
+import restaurants
+from better_bst import AVLBetterBinarySearchTree
 from restaurants import FoodFlight, MenuItem, Restaurant
+from catalog_snapshot import CatalogSnapshot, load_catalog, save_catalog
+from catalog_import import import_catalog
+from trending import TrendingDishes
 
 TEST_RESTAURANT_NAME = "Testaurant"
 
@@ -80,7 +89,519 @@ class TestTask2(TestTask2Setup):
         suggestions_obj = ff.meal_suggestions(0, 1)
         
         self.assertTrue(hasattr(suggestions_obj, "__next__"), f"Suggestions method should always return an Iterator, but the returned object of type '{type(suggestions_obj)}' didn't have a __next__ method defined.")
-    
+
+    def test_foodflight_suggestion_order(self):
+        """
+        #name(Test FoodFlight suggestions merge menus in rating order)
+        """
+        ff = FoodFlight()
+        for i in range(5):
+            ff.add_restaurant(Restaurant(f"Place {i}", i, ArrayR.from_list([
+                MenuItem(f"Dish {j}", (i * 7 + j * 3) % 11) for j in range(i + 1)
+            ])))
+        ff.add_restaurant(Restaurant("Far Away", 50, ArrayR.from_list([MenuItem("Far Dish", 10)])))
+
+        suggestions = list(ff.meal_suggestions(2, 2))
+
+        self.assertEqual(len(suggestions), 15, "Suggestions should include every item of every restaurant in walking distance")
+        for before, after in zip(suggestions, suggestions[1:]):
+            self.assertFalse(after < before, f"{after} was suggested after {before}")
+
+    def test_foodflight_limits(self):
+        """
+        #name(Test FoodFlight queries treat limits alike and reject negative ones)
+        """
+        ff = FoodFlight()
+        for i in range(3):
+            ff.add_restaurant(Restaurant(f"Place {i}", i, ArrayR.from_list([
+                MenuItem(f"Dish {j}", j) for j in range(4)
+            ]), location=(i, 0)))
+
+        async def collect(limit):
+            return [item async for item in ff.ameal_suggestions(1, 1, limit)]
+
+        for limit in [0, 2]:
+            self.assertEqual(len(list(ff.meal_suggestions(1, 1, limit))), limit)
+            self.assertEqual(len(asyncio.run(collect(limit))), limit)
+            self.assertEqual(len(list(ff.meal_suggestions_near((1, 0), 1, limit))), limit)
+            self.assertEqual(len(list(ff.restaurants_with_prefix("Place", limit))), limit)
+            self.assertEqual(len(ff.search_menu_items("Dish", limit)), limit)
+
+        with self.assertRaises(ValueError):
+            list(ff.meal_suggestions(1, 1, -1))
+        with self.assertRaises(ValueError):
+            asyncio.run(collect(-1))
+        with self.assertRaises(ValueError):
+            list(ff.meal_suggestions_near((1, 0), 1, -1))
+        with self.assertRaises(ValueError):
+            list(ff.restaurants_with_prefix("Place", -1))
+        with self.assertRaises(ValueError):
+            ff.search_menu_items("Dish", -1)
+
+    def test_foodflight_async_suggestions(self):
+        """
+        #name(Test FoodFlight async suggestions match the sequential order and can be cancelled)
+        """
+        ff = FoodFlight()
+        for i in range(6):
+            ff.add_restaurant(Restaurant(f"Place {i}", i, ArrayR.from_list([
+                MenuItem(f"Dish {j}", (i * 5 + j) % 7) for j in range(20)
+            ])))
+
+        async def collect(limit):
+            return [item async for item in ff.ameal_suggestions(2, 2, limit, yield_every=3)]
+
+        self.assertEqual(asyncio.run(collect(None)), list(ff.meal_suggestions(2, 2)))
+        self.assertEqual(asyncio.run(collect(7)), list(ff.meal_suggestions(2, 2, 7)))
+
+        async def cancel_mid_merge():
+            consumed = []
+            started = asyncio.Event()
+
+            async def consume():
+                async for item in ff.ameal_suggestions(2, 2, yield_every=1):
+                    consumed.append(item)
+                    started.set()
+
+            task = asyncio.create_task(consume())
+            await started.wait()
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            return consumed
+
+        consumed = asyncio.run(cancel_mid_merge())
+        self.assertLess(len(consumed), 100, "The merge should stop once its task is cancelled")
+
+    def test_foodflight_suggestions_near(self):
+        """
+        #name(Test FoodFlight suggestions within a radius of a point)
+        """
+        ff = FoodFlight()
+        ff.add_restaurant(Restaurant("Origin", 0, ArrayR.from_list([MenuItem("Soup", 2), MenuItem("Stew", 4)]), location=(0, 0)))
+        ff.add_restaurant(Restaurant("Corner", 0, ArrayR.from_list([MenuItem("Salad", 3)]), location=(3, 4)))
+        ff.add_restaurant(Restaurant("Far", 0, ArrayR.from_list([MenuItem("Steak", 5)]), location=(6, 6)))
+        ff.add_restaurant(Restaurant("Nowhere", 0, ArrayR.from_list([MenuItem("Pie", 5)])))
+
+        self.assertEqual([item.name for item in ff.meal_suggestions_near((0, 0), 5)], ["Stew", "Salad", "Soup"])
+        self.assertEqual([item.name for item in ff.meal_suggestions_near((0, 0), 4.9)], ["Stew", "Soup"])
+
+        # Registered after the index is built, and moved by replacing the restaurant
+        ff.add_restaurant(Restaurant("Cart", 0, ArrayR.from_list([MenuItem("Hot Dog", 1)]), location=(1, 1)))
+        ff.add_restaurant(Restaurant("Far", 0, ArrayR.from_list([MenuItem("Steak", 5)]), location=(0, 1)))
+        self.assertEqual([item.name for item in ff.meal_suggestions_near((0, 0), 2)], ["Steak", "Stew", "Soup", "Hot Dog"])
+        self.assertEqual([item.name for item in ff.meal_suggestions_near((6, 6), 1)], [])
+        self.assertEqual([item.name for item in ff.meal_suggestions_near((0, 0), 2, limit=2)], ["Steak", "Stew"])
+        self.assertEqual([item.name for item in ff.meal_suggestions_near((1, 1), 0)], ["Hot Dog"])
+        with self.assertRaises(ValueError):
+            list(ff.meal_suggestions_near((0, 0), -1))
+        with self.assertRaises(ValueError):
+            list(KDTree.build(ArrayR.from_list([((0, 0), "Origin")])).within((0, 0), -0.5))
+
+        # Demand from radius queries is recorded at the block of each item's restaurant
+        ff.trending = TrendingDishes(capacity=16)
+        ff.add_restaurant(Restaurant("Kiosk", 7, ArrayR.from_list([MenuItem("Pretzel", 1)]), location=(20, 20)))
+        list(ff.meal_suggestions_near((20, 20), 1))
+        self.assertEqual(ff.trending.estimate("Pretzel", 7, 7), 1)
+        self.assertEqual(ff.trending.estimate("Pretzel", 0, 6), 0)
+
+    def test_foodflight_suggestions_near_incremental(self):
+        """
+        #name(Test FoodFlight radius suggestions stay correct and shallow under incremental writes)
+        """
+        ff = FoodFlight()
+        ff.add_restaurant(Restaurant("Seed", 0, ArrayR.from_list([MenuItem("Tea", 1)]), location=(0, 0)))
+        list(ff.meal_suggestions_near((0, 0), 1))
+
+        # Sorted inserts along a single grid line would make a stick of an unbalanced k-d tree
+        locations = {}
+        for i in range(3000):
+            name = f"Stall {i:04d}"
+            locations[name] = (i % 3, i)
+            ff.add_restaurant(Restaurant(name, 0, ArrayR.from_list([MenuItem(name, 1)]), location=locations[name]))
+        for i in range(0, 3000, 2):
+            name = f"Stall {i:04d}"
+            locations[name] = (i % 3, -i)
+            ff.add_restaurant(Restaurant(name, 0, ArrayR.from_list([MenuItem(name, 1)]), location=locations[name]))
+
+        for center, radius in [((1, 1500), 40), ((0, -1000), 25.5), ((2, 2999), 3)]:
+            expected = sorted(
+                name for name, (x, y) in locations.items()
+                if (x - center[0]) ** 2 + (y - center[1]) ** 2 <= radius ** 2
+            )
+            self.assertEqual(sorted(item.name for item in ff.meal_suggestions_near(center, radius)), expected)
+
+    def test_foodflight_block_rating_aggregates(self):
+        """
+        #name(Test FoodFlight rating aggregates and top items over block ranges)
+        """
+        ff = FoodFlight()
+        ff.add_restaurant(Restaurant("Diner", 1, ArrayR.from_list([MenuItem("Pie", 4), MenuItem("Eggs", 2)])))
+        ff.add_restaurant(Restaurant("Cafe", 3, ArrayR.from_list([MenuItem("Latte", 3)])))
+        ff.add_restaurant(Restaurant("Grill", 5, ArrayR.from_list([MenuItem("Steak", 5), MenuItem("Salad", 1)])))
+
+        summary = ff.rating_summary(1, 3)
+        self.assertEqual((summary.count, summary.total, summary.maximum, summary.average), (3, 9, 4, 3))
+        self.assertEqual(ff.rating_summary(6, 9).average, None)
+        self.assertEqual([block for block, _ in ff.block_rating_summaries(2)], [3, 5])
+        top = ff.top_rated_items(2)
+        self.assertEqual([(restaurant.name, item.name) for restaurant, item in top], [("Grill", "Steak"), ("Diner", "Pie")])
+
+        # Kept up to date after the index is built
+        ff.add_to_menu("Cafe", ArrayR.from_list([MenuItem("Mocha", 6)]))
+        ff.update_rating("Diner", "Eggs", 4.5)
+        ff.add_restaurant(Restaurant("Grill", 2, ArrayR.from_list([MenuItem("Ribs", 2)])))
+        summary = ff.rating_summary(None, 3)
+        self.assertEqual((summary.count, summary.total, summary.maximum), (5, 19.5, 6))
+        self.assertEqual(ff.rating_summary(5).count, 0)
+        top = ff.top_rated_items(3, 1, 2)
+        self.assertEqual([item.name for _, item in top], ["Eggs", "Pie", "Ribs"])
+
+        # Blocks first seen in increasing order are inserted balanced, and walked without recursion
+        ff = FoodFlight()
+        ff.add_restaurant(Restaurant("Seed", 0, ArrayR.from_list([MenuItem("Tea", 1)])))
+        ff.rating_summary()
+        ratings = {0: [1]}
+        for block in range(1, 3000):
+            rating = (block * 7) % 10
+            ff.add_restaurant(Restaurant(f"Stall {block:04d}", block, ArrayR.from_list([MenuItem(f"Dish {block:04d}", rating)])))
+            ratings[block] = [rating]
+        ff.add_to_menu("Stall 1500", ArrayR.from_list([MenuItem("Special", 9.5)]))
+        ratings[1500].append(9.5)
+        ff.remove_from_menu("Stall 0009", "Dish 0009")
+        ratings[9] = []
+        summary = ff.rating_summary(5, 2500)
+        in_range = [r for block in range(5, 2501) for r in ratings[block]]
+        self.assertEqual((summary.count, summary.total, summary.maximum), (len(in_range), sum(in_range), max(in_range)))
+        self.assertEqual([item.name for _, item in ff.top_rated_items(3, 1000, 1100)], ["Dish 1007", "Dish 1017", "Dish 1027"])
+        self.assertEqual(ff.top_rated_items(1)[0][1].name, "Special")
+
+        # Re-adding a restaurant whose earlier menu was empty: the index was built without its block
+        ff = FoodFlight()
+        ff.add_restaurant(Restaurant("Diner", 1, ArrayR.from_list([MenuItem("Pie", 4)])))
+        ff.add_restaurant(Restaurant("A", 5, ArrayR(0)))
+        ff.rating_summary()
+        ff.search_menu_items("P")
+        ff.add_restaurant(Restaurant("A", 5, ArrayR.from_list([MenuItem("Soup", 3)])))
+        summary = ff.rating_summary(5, 5)
+        self.assertEqual((summary.count, summary.total), (1, 3))
+        self.assertEqual([(restaurant.name, item.name) for restaurant, item in ff.search_menu_items("S")], [("A", "Soup")])
+        self.assertEqual([item.name for item in ff.get_menu("A")], ["Soup"])
+
+    def test_foodflight_trending_dishes(self):
+        """
+        #name(Test FoodFlight trending dishes from suggestions and orders)
+        """
+        ff = FoodFlight()
+        ff.add_restaurant(Restaurant("Diner", 1, ArrayR.from_list([MenuItem("Pie", 4), MenuItem("Eggs", 2)])))
+        ff.add_restaurant(Restaurant("Cafe", 5, ArrayR.from_list([MenuItem("Latte", 3)])))
+        with self.assertRaises(ValueError):
+            ff.trending_dishes(3)
+
+        ff.trending = TrendingDishes(capacity=16)
+        self.assertEqual(next(ff.meal_suggestions(1, 0)).name, "Pie")
+        list(ff.meal_suggestions(1, 0))
+        ff.record_order("Cafe", "Latte", 5)
+        ff.record_order("Diner", "Eggs")
+        with self.assertRaises(KeyError):
+            ff.record_order("Diner", "Latte")
+
+        self.assertEqual(list(ff.trending_dishes(2)), [("Latte", 5), ("Pie", 2)])
+        self.assertCountEqual(list(ff.trending_dishes(5, 0, 2)), [("Pie", 2), ("Eggs", 2)])
+        self.assertEqual(list(ff.trending_dishes(5, 6)), [])
+
+        # Ranges wider than the coarsest level are summed over several intervals of it
+        trending = TrendingDishes(capacity=4, levels=2)
+        for block in range(40):
+            trending.record(block, "Soup", block % 3)
+        self.assertEqual(trending.estimate("Soup", 5, 33), sum(block % 3 for block in range(5, 34)))
+        self.assertEqual(trending.estimate("Soup"), sum(block % 3 for block in range(40)))
+
+    def test_foodflight_lazy_menu_sort(self):
+        """
+        #name(Test FoodFlight lazily sorted menus)
+        """
+        for copy_on_write in (False, True):
+            ff = FoodFlight(copy_on_write=copy_on_write)
+            diner = Restaurant("Diner", 0, ArrayR.from_list([MenuItem("Eggs", 2), MenuItem("Pie", 4)]), lazy_sort=True)
+            cafe = Restaurant("Cafe", 1, ArrayR.from_list([MenuItem("Tea", 1), MenuItem("Latte", 3)]), lazy_sort=True)
+            ff.add_restaurant(diner)
+            ff.bulk_load(ArrayR.from_list([cafe]))
+            self.assertFalse(diner.menu_sorted)
+            self.assertFalse(cafe.menu_sorted)
+
+            ff.add_to_menu("Diner", ArrayR.from_list([MenuItem("Toast", 1), MenuItem("Waffle", 5)]))
+            self.assertEqual([item.name for item in ff.get_menu("Diner")], ["Waffle", "Pie", "Eggs", "Toast"])
+            self.assertTrue(ff.restaurants["Diner"].menu_sorted)
+            self.assertFalse(cafe.menu_sorted)
+
+            ff.add_to_menu("Diner", ArrayR.from_list([MenuItem("Bagel", 3)]))
+            ff.update_rating("Diner", "Toast", 6)
+            self.assertEqual([item.name for item in ff.meal_suggestions(0, 1)], ["Toast", "Waffle", "Pie", "Bagel", "Latte", "Eggs", "Tea"])
+
+        # A read racing the staging of an item publishes nothing, and sorts again from the new state
+        stall = Restaurant("Stall", 0, ArrayR.from_list([MenuItem("Tea", 1)]), lazy_sort=True)
+        merge_staged = restaurants.merge
+
+        def stage_during_merge(*args, **kwargs):
+            restaurants.merge = merge_staged
+            stall.add_menu_items(ArrayR.from_list([MenuItem("Soup", 2)]))
+            return merge_staged(*args, **kwargs)
+
+        stall.menu = ArrayR.from_list([MenuItem("Pie", 4)])
+        stall.add_menu_items(ArrayR.from_list([MenuItem("Cake", 3)]))
+        restaurants.merge = stage_during_merge
+        try:
+            self.assertEqual([item.name for item in stall.menu], ["Pie", "Cake", "Soup"])
+        finally:
+            restaurants.merge = merge_staged
+
+    def test_foodflight_copy_on_write(self):
+        """
+        #name(Test FoodFlight copy on write keeps readers on their version)
+        """
+        ff = FoodFlight(copy_on_write=True)
+        ff.add_restaurant(Restaurant("Diner", 0, ArrayR.from_list([MenuItem("Pie", 4), MenuItem("Eggs", 3), MenuItem("Toast", 1)])))
+        ff.add_restaurant(Restaurant("Cafe", 1, ArrayR.from_list([MenuItem("Latte", 2)])))
+        before = [(item.name, item.rating) for item in ff.meal_suggestions(0, 1)]
+        snapshot = ff.snapshot()
+
+        suggestions = ff.meal_suggestions(0, 1)
+        first = next(suggestions)
+        ff.update_rating("Diner", "Toast", 5)
+        ff.add_to_menu("Cafe", ArrayR.from_list([MenuItem("Mocha", 6)]))
+        ff.remove_from_menu("Diner", "Eggs")
+        ff.add_restaurant(Restaurant("Bar", 0, ArrayR.from_list([MenuItem("Chips", 9)])))
+
+        self.assertEqual([(item.name, item.rating) for item in [first] + list(suggestions)], before)
+        self.assertEqual([(item.name, item.rating) for item in snapshot.meal_suggestions(0, 1)], before)
+        self.assertEqual(
+            [(item.name, item.rating) for item in ff.meal_suggestions(0, 1)],
+            [("Chips", 9), ("Mocha", 6), ("Toast", 5), ("Pie", 4), ("Latte", 2)],
+        )
+        self.assertEqual(ff.version, snapshot.version + 4)
+
+        with self.assertRaises(ValueError):
+            FoodFlight().snapshot()
+
+        # Path copying walks the tree iteratively, so names added in sorted order do not exhaust the stack
+        ff = FoodFlight(copy_on_write=True)
+        for i in range(1200):
+            ff.add_restaurant(Restaurant(f"Stall {i:04d}", 0, ArrayR.from_list([MenuItem(f"Dish {i}", 1)])))
+        self.assertEqual(len(ff.restaurants), 1200)
+        self.assertEqual(ff.search_menu_items("Dish 1199")[0][0].name, "Stall 1199")
+
+    def test_menu_item_sort_key(self):
+        """
+        #name(Test MenuItem sort key follows its rating)
+        """
+        soup = MenuItem("Soup", 3)
+        stew = MenuItem("Stew", 3)
+        self.assertTrue(soup < stew, "Items with equal ratings should be ordered by name")
+
+        stew.rating = 4
+        self.assertEqual(stew.sort_key, (-4, "Stew"))
+        self.assertTrue(stew < soup, "Higher rated items should come first")
+
+    def test_foodflight_search_menu_items(self):
+        """
+        #name(Test FoodFlight menu item prefix search)
+        """
+        ff = FoodFlight()
+        ff.add_restaurant(Restaurant("Noodle Bar", 1, ArrayR.from_list([
+            MenuItem("Noodles", 5),
+            MenuItem("Nood Bowl", 7),
+            MenuItem("Rice", 9),
+        ])))
+        self.assertEqual([item.name for _, item in ff.search_menu_items("Nood")], ["Nood Bowl", "Noodles"])
+
+        # Updates after the first search are picked up incrementally
+        ff.add_restaurant(Restaurant("Wok", 2, ArrayR.from_list([MenuItem("Noodles", 6)])))
+        ff.add_to_menu("Noodle Bar", ArrayR.from_list([MenuItem("Noodle Soup", 8)]))
+
+        matches = ff.search_menu_items("Nood", 3)
+        self.assertEqual(
+            [(restaurant.name, item.name) for restaurant, item in matches],
+            [("Noodle Bar", "Noodle Soup"), ("Noodle Bar", "Nood Bowl"), ("Wok", "Noodles")],
+        )
+        self.assertEqual(len(ff.search_menu_items("Soup")), 0)
+
+        # Characters above U+FFFF right after the prefix are still matched
+        ff.add_to_menu("Wok", ArrayR.from_list([MenuItem("Nood\U0001F35C", 1)]))
+        self.assertEqual(ff.search_menu_items("Nood")[4][1].name, "Nood\U0001F35C")
+
+    def test_foodflight_restaurants_with_prefix(self):
+        """
+        #name(Test FoodFlight restaurant name autocomplete)
+        """
+        ff = FoodFlight()
+        for name in ["Pizzeria", "Pasta Place", "Pizza Hut", "Zen", "Pi", "Pizza Palace", "Pizz\U0001F355"]:
+            ff.add_restaurant(Restaurant(name, 1, ArrayR(0)))
+
+        self.assertEqual([r.name for r in ff.restaurants_with_prefix("Pizz")], ["Pizza Hut", "Pizza Palace", "Pizzeria", "Pizz\U0001F355"])
+        self.assertEqual([r.name for r in ff.restaurants_with_prefix("P", 2)], ["Pasta Place", "Pi"])
+        self.assertEqual([r.name for r in ff.restaurants_with_prefix("Q")], [])
+        self.assertEqual([r.name for r in ff.restaurants_with_prefix("Pizz", reverse=True)], ["Pizz\U0001F355", "Pizzeria", "Pizza Palace", "Pizza Hut"])
+        self.assertEqual([r.name for r in ff.restaurants_with_prefix("P", 2, reverse=True)], ["Pizz\U0001F355", "Pizzeria"])
+
+    def test_foodflight_bulk_load(self):
+        """
+        #name(Test FoodFlight bulk load builds a balanced tree)
+        """
+        ff = FoodFlight()
+        ff.add_restaurant(Restaurant("Already Here", 0, ArrayR(0)))
+
+        restaurants = ArrayR.from_list([
+            Restaurant(f"Restaurant {i:03d}", i, ArrayR.from_list([
+                MenuItem("Chips", i % 5),
+                MenuItem("Burger", 3),
+            ]), lazy_sort=True)
+            for i in range(100)
+        ] + [Restaurant("Restaurant 007", 7, ArrayR.from_list([MenuItem("Replacement", 1)]))])
+        ff.bulk_load(restaurants)
+
+        self.assertEqual(len(ff.restaurants), 101)
+        self.assertEqual(ff.restaurants.balance_score(), 0)
+        self.assertEqual(len(ff.get_menu("Already Here")), 0)
+        self.assertEqual([item.name for item in ff.get_menu("Restaurant 004")], ["Chips", "Burger"])
+        self.assertEqual([item.name for item in ff.get_menu("Restaurant 007")], ["Replacement"])
+
+    def test_foodflight_update_rating_and_remove(self):
+        """
+        #name(Test FoodFlight menu rating updates and removals keep the menu sorted)
+        """
+        ff = FoodFlight()
+        ff.add_restaurant(Restaurant(TEST_RESTAURANT_NAME, 1, ArrayR.from_list([
+            MenuItem("Pancakes", 3),
+            MenuItem("Waffles", 5),
+            MenuItem("Toast", 1),
+            MenuItem("Eggs", 4),
+        ])))
+
+        ff.update_rating(TEST_RESTAURANT_NAME, "Toast", 6)
+        self.assertEqual([item.name for item in ff.get_menu(TEST_RESTAURANT_NAME)], ["Toast", "Waffles", "Eggs", "Pancakes"])
+
+        ff.update_rating(TEST_RESTAURANT_NAME, "Waffles", 2)
+        self.assertEqual([item.name for item in ff.get_menu(TEST_RESTAURANT_NAME)], ["Toast", "Eggs", "Pancakes", "Waffles"])
+
+        removed = ff.remove_from_menu(TEST_RESTAURANT_NAME, "Eggs")
+        self.assertEqual(removed.name, "Eggs")
+        self.assertEqual([item.name for item in ff.get_menu(TEST_RESTAURANT_NAME)], ["Toast", "Pancakes", "Waffles"])
+
+        with self.assertRaises(KeyError):
+            ff.update_rating(TEST_RESTAURANT_NAME, "Eggs", 5)
+
+        # Item names are unique within a menu, so each name refers to a single item
+        ff.search_menu_items("")
+        with self.assertRaises(ValueError):
+            ff.add_to_menu(TEST_RESTAURANT_NAME, ArrayR.from_list([MenuItem("Toast", 2)]))
+        with self.assertRaises(ValueError):
+            ff.add_to_menu(TEST_RESTAURANT_NAME, ArrayR.from_list([MenuItem("Eggs", 2), MenuItem("Eggs", 3)]))
+        self.assertEqual([item.name for item in ff.get_menu(TEST_RESTAURANT_NAME)], ["Toast", "Pancakes", "Waffles"])
+        self.assertEqual([item.name for _, item in ff.search_menu_items("")], ["Toast", "Pancakes", "Waffles"])
+        ff.add_to_menu(TEST_RESTAURANT_NAME, ArrayR.from_list([MenuItem("Eggs", 2)]))
+        ff.update_rating(TEST_RESTAURANT_NAME, "Eggs", 7)
+        self.assertEqual(ff.get_menu(TEST_RESTAURANT_NAME)[0].name, "Eggs")
+        with self.assertRaises(ValueError):
+            Restaurant("Twice", 0, ArrayR.from_list([MenuItem("Tea", 1), MenuItem("Tea", 2)]))
+        lazy = Restaurant("Lazy", 0, ArrayR.from_list([MenuItem("Tea", 1)]), lazy_sort=True)
+        lazy.add_menu_items(ArrayR.from_list([MenuItem("Scone", 2)]))
+        with self.assertRaises(ValueError):
+            lazy.add_menu_items(ArrayR.from_list([MenuItem("Scone", 3)]))
+        self.assertEqual([item.name for item in lazy.menu], ["Scone", "Tea"])
+
+    def test_foodflight_snapshot_round_trip(self):
+        """
+        #name(Test FoodFlight catalog snapshot save and load)
+        """
+        ff = FoodFlight()
+        ff.add_restaurant(Restaurant("Soup Shop", 4, ArrayR.from_list([MenuItem("Soup", 3), MenuItem("Café Latte", 4.5)]), location=(1.5, -2)))
+        ff.add_restaurant(Restaurant("Bakery", -2, ArrayR.from_list([MenuItem("Soup", 5)])))
+        ff.add_restaurant(Restaurant("Empty", 0, ArrayR(0)))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "catalog.snapshot")
+            save_catalog(ff, path)
+            loaded = load_catalog(path)
+            # Menus not read yet are checked for item names as well
+            with self.assertRaises(ValueError):
+                loaded.restaurants["Bakery"].add_menu_items(ArrayR.from_list([MenuItem("Soup", 1)]))
+
+            self.assertEqual(len(loaded.restaurants), 3)
+            self.assertEqual(loaded.restaurants["Bakery"].block_number, -2)
+            self.assertEqual(loaded.restaurants["Soup Shop"].location, (1.5, -2))
+            self.assertIsNone(loaded.restaurants["Bakery"].location)
+            for name in ["Soup Shop", "Bakery", "Empty"]:
+                self.assertEqual(
+                    [(item.name, item.rating) for item in loaded.get_menu(name)],
+                    [(item.name, item.rating) for item in ff.get_menu(name)],
+                )
+            self.assertEqual([item.name for item in loaded.meal_suggestions(0, 5)], ["Soup", "Café Latte", "Soup"])
+
+            # Closing the snapshot reads in the menus not read yet, and reading every menu unmaps the file
+            with CatalogSnapshot(path) as snapshot:
+                loaded = snapshot.load()
+                self.assertEqual(len(loaded.get_menu("Bakery")), 1)
+            self.assertTrue(snapshot.closed)
+            self.assertEqual([item.name for item in loaded.get_menu("Soup Shop")], ["Café Latte", "Soup"])
+            with self.assertRaises(ValueError):
+                snapshot.load()
+
+            snapshot = CatalogSnapshot(path)
+            loaded = snapshot.load()
+            for name in ["Soup Shop", "Bakery"]:
+                loaded.get_menu(name)
+            self.assertFalse(snapshot.closed)
+            loaded.get_menu("Empty")
+            self.assertTrue(snapshot.closed)
+            self.assertFalse(loaded.copy_on_write or loaded.balanced)
+
+            # The copy_on_write and balanced options are saved with the catalog
+            ff = FoodFlight(copy_on_write=True, balanced=True)
+            for name in ["A", "B", "C", "D"]:
+                ff.add_restaurant(Restaurant(name, 0, ArrayR.from_list([MenuItem(name.lower(), 1)])))
+            save_catalog(ff, path)
+            loaded = load_catalog(path)
+            self.assertTrue(loaded.copy_on_write)
+            self.assertTrue(loaded.balanced)
+            self.assertIsInstance(loaded.restaurants, AVLBetterBinarySearchTree)
+            before = loaded.restaurants
+            for name in ["E", "F", "G", "H"]:
+                loaded.add_restaurant(Restaurant(name, 0, ArrayR.from_list([MenuItem(name.lower(), 2)])))
+            self.assertEqual(len(before), 4)
+            self.assertEqual([name for name, _ in loaded.restaurants], ["A", "B", "C", "D", "E", "F", "G", "H"])
+            self.assertLessEqual(loaded.restaurants.height(), 4)
+
+    def test_foodflight_streaming_import(self):
+        """
+        #name(Test FoodFlight streaming CSV and JSON-lines feed import)
+        """
+        ff = FoodFlight()
+        ff.add_restaurant(Restaurant("Diner", 1, ArrayR.from_list([MenuItem("Coffee", 2)])))
+
+        with tempfile.TemporaryDirectory() as directory:
+            csv_path = os.path.join(directory, "feed.csv")
+            with open(csv_path, "w", encoding="utf-8") as file:
+                file.write("item,rating,restaurant,block\nPie,4.5,Diner,9\nRamen,5,Noodle Bar,3\nEggs,3,Diner,1\nGyoza,4,Noodle Bar,3\n")
+            stats = import_catalog(ff, csv_path, chunk_size=3)
+
+            self.assertEqual((stats.records, stats.chunks, stats.restaurants_added, stats.menus_extended), (4, 2, 1, 2))
+            self.assertEqual([item.name for item in ff.get_menu("Diner")], ["Pie", "Eggs", "Coffee"])
+            self.assertEqual([item.rating for item in ff.get_menu("Noodle Bar")], [5, 4])
+            self.assertEqual(ff.restaurants["Diner"].block_number, 1)
+
+            jsonl_path = os.path.join(directory, "feed.jsonl")
+            with open(jsonl_path, "w", encoding="utf-8") as file:
+                file.write('{"restaurant": "Taqueria", "block": 2, "item": "Tacos", "rating": 6}\n\n')
+                file.write('{"restaurant": "Taqueria", "block": 2, "item": "Nachos", "rating": 7}\n')
+            import_catalog(ff, jsonl_path)
+            self.assertEqual([item.name for item in ff.get_menu("Taqueria")], ["Nachos", "Tacos"])
+
+            with open(jsonl_path, "a", encoding="utf-8") as file:
+                file.write('{"restaurant": "Taqueria", "item": "Salsa", "rating": 1}\n')
+            with self.assertRaises(ValueError):
+                import_catalog(ff, jsonl_path)
+
     
             
 
@@ -0,0 +1,267 @@
+"""
+Approximate tracking of the most demanded dishes, in bounded memory.
+
+Demand events are (block number, dish name) pairs, such as the items yielded by
+FoodFlight.meal_suggestions or the dishes reported through FoodFlight.record_order. Their counts
+are estimated by count-min sketches, whose memory does not grow with the number of events, dishes or blocks.
+Each event is counted once for its dish overall, and, in one sketch per level, once for the aligned
+interval of 2^level blocks containing its block, so that the demand over a block range is the sum
+of the estimates of the O(levels + range / 2^(levels - 1)) intervals it splits into.
+Only the `capacity` dishes with the highest overall estimates are remembered by name;
+queries rank those dishes by their demand in the range asked for.
+"""
+from __future__ import annotations
+
+import threading
+from array import array
+from typing import Hashable, Iterator, Tuple
+
+from data_structures import ArrayList, ArrayMaxHeap, ArrayR
+
+_HASH_MASK = (1 << 32) - 1
+
+
+class CountMinSketch:
+    """
+    Count-min sketch over hashable keys.
+    Estimates never undercount, and overcount by at most 2 * total / width with probability 1 - 2^-depth.
+    The memory used is width * depth 8-byte counters, whatever the number of distinct keys.
+    Keys are hashed with Python's hash(), so estimates are only meaningful within one process.
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4) -> None:
+        """
+        :raises ValueError: if width or depth is not positive.
+        :complexity: O(width * depth)
+        """
+        if width < 1 or depth < 1:
+            raise ValueError("The width and depth of a sketch must be positive")
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        # A typed array rather than an ArrayR: the counters are plain machine integers, which an ArrayR
+        # would box one by one, at several times the memory and access time.
+        self.__counters = array('q', bytes(8 * width * depth))
+
+    def add(self, key: Hashable, count: int = 1) -> int:
+        """
+        Count `key` `count` more times, and return its new estimate.
+        :complexity: O(depth + hash(key))
+        """
+        return self.add_hash(hash(key), count)
+
+    def add_hash(self, key_hash: int, count: int = 1) -> int:
+        """
+        Count the key hashing to `key_hash` `count` more times, and return its new estimate.
+        Conservative update: each counter only grows as far as the new estimate, which tightens later estimates.
+        :complexity: O(depth)
+        """
+        # Row i uses h1 + i * h2, from the two halves of the hash of the key.
+        h1 = key_hash & _HASH_MASK
+        h2 = ((key_hash >> 32) & _HASH_MASK) | 1
+        width = self.width
+        counters = self.__counters
+        smallest = None
+        for i in range(self.depth):
+            value = counters[i * width + (h1 + i * h2) % width]
+            if smallest is None or value < smallest:
+                smallest = value
+        estimate = smallest + count
+        for i in range(self.depth):
+            cell = i * width + (h1 + i * h2) % width
+            if counters[cell] < estimate:
+                counters[cell] = estimate
+        self.total += count
+        return estimate
+
+    def estimate(self, key: Hashable) -> int:
+        """
+        Return an upper bound on the number of times `key` was counted.
+        :complexity: O(depth + hash(key))
+        """
+        return self.estimate_hash(hash(key))
+
+    def estimate_hash(self, key_hash: int) -> int:
+        """
+        Return an upper bound on the number of times the key hashing to `key_hash` was counted.
+        :complexity: O(depth)
+        """
+        h1 = key_hash & _HASH_MASK
+        h2 = ((key_hash >> 32) & _HASH_MASK) | 1
+        width = self.width
+        counters = self.__counters
+        smallest = None
+        for i in range(self.depth):
+            value = counters[i * width + (h1 + i * h2) % width]
+            if smallest is None or value < smallest:
+                smallest = value
+        return smallest
+
+
+def block_intervals(low: int, high: int, levels: int) -> Iterator[Tuple[int, int]]:
+    """
+    Split the blocks [low, high] into aligned intervals, yielded as (level, index) for the blocks
+    [index * 2^level, (index + 1) * 2^level - 1], with level < levels.
+    :complexity: O(levels + (high - low) / 2^(levels - 1)) intervals.
+    """
+    while low <= high:
+        level = 0
+        while level + 1 < levels and low % (2 << level) == 0 and low + (2 << level) - 1 <= high:
+            level += 1
+        yield level, low >> level
+        low += 1 << level
+
+
+class TrendingDishes:
+    """
+    Streaming heavy hitters over (block number, dish name) demand events.
+    Memory is bounded by the sketch and by `capacity` tracked dishes; safe to record to from several threads.
+    """
+
+    def __init__(self, capacity: int = 256, width: int = 2048, depth: int = 3, levels: int = 4) -> None:
+        """
+        :raises ValueError: if capacity, width, depth or levels is not positive.
+        :complexity: O(levels * width * depth + capacity)
+        """
+        if capacity < 1 or levels < 1:
+            raise ValueError("The capacity and levels must be positive")
+        self.capacity = capacity
+        self.levels = levels
+        # Overall demand per dish, and demand per dish and aligned interval of 2^level blocks for each level.
+        # Fewer levels make each event cheaper to record, and range queries longer, by range / 2^(levels - 1) intervals.
+        self.sketch = CountMinSketch(width, depth)
+        self.level_sketches = ArrayR(levels)
+        for level in range(levels):
+            self.level_sketches[level] = CountMinSketch(width, depth)
+        self.lock = threading.Lock()
+        self.min_block: int | None = None
+        self.max_block: int | None = None
+
+        # Tracked dishes and their overall estimates, in an open addressing table at most half full.
+        self.__names = ArrayR(2 * capacity + 1)
+        self.__estimates = ArrayR(2 * capacity + 1)
+        self.__tracked_count = 0
+        # One (-estimate, name) entry per tracked dish, so the root is the least demanded one.
+        # Estimates only grow, so an entry is never above the current estimate of its dish:
+        # entries are only refreshed when they reach the root, and updates leave the heap alone.
+        self.__smallest = ArrayMaxHeap(capacity)
+        # Estimate at the root of self.__smallest.
+        self.__floor = 0
+
+    def __position(self, dish_name: str) -> int:
+        """ Position of `dish_name` in the table, or of the empty cell where it belongs. """
+        size = len(self.__names)
+        position = hash(dish_name) % size
+        while self.__names[position] is not None and self.__names[position] != dish_name:
+            position = (position + 1) % size
+        return position
+
+    def __untrack(self, position: int) -> None:
+        """ Empty `position`, shifting back later entries of its cluster which belong before it. """
+        size = len(self.__names)
+        self.__names[position] = None
+        self.__tracked_count -= 1
+        current = position
+        while True:
+            current = (current + 1) % size
+            if self.__names[current] is None:
+                return
+            home = hash(self.__names[current]) % size
+            if (position < current and position < home <= current) or (position > current and (home > position or home <= current)):
+                continue
+            self.__names[position] = self.__names[current]
+            self.__estimates[position] = self.__estimates[current]
+            self.__names[current] = None
+            position = current
+
+    def record(self, block_number: int, dish_name: str, count: int = 1) -> None:
+        """
+        Record `count` demand events for the dish called `dish_name` at `block_number`.
+        :complexity: O(levels * depth) for a tracked dish. Otherwise O(levels * depth + log capacity) amortised,
+            to compare it with the least demanded tracked dish. Independent of the number of events, dishes and blocks.
+        """
+        with self.lock:
+            # The dish name is hashed once; interval keys combine its hash with the index of the interval.
+            dish_hash = hash(dish_name)
+            estimate = self.sketch.add_hash(dish_hash, count)
+            for level in range(self.levels):
+                self.level_sketches[level].add_hash(hash((block_number >> level, dish_hash)), count)
+            if self.min_block is None or block_number < self.min_block:
+                self.min_block = block_number
+            if self.max_block is None or block_number > self.max_block:
+                self.max_block = block_number
+
+            position = self.__position(dish_name)
+            if self.__names[position] is not None:
+                self.__estimates[position] = estimate
+                return
+
+            if self.__tracked_count == self.capacity:
+                # Evict the least demanded tracked dish if this one is now estimated above it.
+                # The root is never above the smallest current estimate, so most dishes are turned away at once.
+                if estimate <= self.__floor:
+                    return
+                while True:
+                    smallest, smallest_name = self.__smallest.peek()
+                    if estimate <= -smallest:
+                        return
+                    smallest_position = self.__position(smallest_name)
+                    if self.__estimates[smallest_position] == -smallest:
+                        break
+                    self.__smallest.extract_max()
+                    self.__smallest.add((-self.__estimates[smallest_position], smallest_name))
+                    self.__floor = -self.__smallest.peek()[0]
+                self.__smallest.extract_max()
+                self.__untrack(smallest_position)
+                position = self.__position(dish_name)
+
+            self.__names[position] = dish_name
+            self.__estimates[position] = estimate
+            self.__tracked_count += 1
+            self.__smallest.add((-estimate, dish_name))
+            self.__floor = -self.__smallest.peek()[0]
+
+    def estimate(self, dish_name: str, low_block: int | None = None, high_block: int | None = None) -> int:
+        """
+        Return an upper bound on the demand recorded for the dish called `dish_name` at blocks in [low_block, high_block].
+        None bounds are unbounded.
+        :complexity: O((levels + r / 2^(levels - 1)) * depth) for a range of r blocks. O(depth) when unbounded.
+        """
+        with self.lock:
+            return self.__estimate(dish_name, low_block, high_block)
+
+    def __estimate(self, dish_name: str, low_block: int | None, high_block: int | None) -> int:
+        if low_block is None and high_block is None:
+            return self.sketch.estimate(dish_name)
+        if self.min_block is None:
+            return 0
+        low = self.min_block if low_block is None else max(low_block, self.min_block)
+        high = self.max_block if high_block is None else min(high_block, self.max_block)
+        dish_hash = hash(dish_name)
+        total = 0
+        for level, index in block_intervals(low, high, self.levels):
+            total += self.level_sketches[level].estimate_hash(hash((index, dish_hash)))
+        return total
+
+    def top(self, k: int, low_block: int | None = None, high_block: int | None = None) -> ArrayList[Tuple[str, int]]:
+        """
+        Return up to `k` (dish name, estimated demand) pairs of the tracked dishes with the highest demand recorded
+        at blocks in [low_block, high_block], most demanded first (ties in no particular order). None bounds are unbounded.
+        :complexity: O(capacity * (levels + r / 2^(levels - 1)) * depth + k log capacity) for a range of r blocks.
+        """
+        with self.lock:
+            demand = ArrayR(self.__tracked_count)
+            count = 0
+            for i in range(len(self.__names)):
+                if self.__names[i] is not None:
+                    estimate = self.__estimate(self.__names[i], low_block, high_block)
+                    if estimate > 0:
+                        demand[count] = (estimate, self.__names[i])
+                        count += 1
+
+        heap = ArrayMaxHeap.heapify(tuple(demand[i] for i in range(count)))
+        result = ArrayList()
+        while len(result) < k and len(heap) > 0:
+            estimate, dish_name = heap.extract_max()
+            result.append((dish_name, estimate))
+        return result